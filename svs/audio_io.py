@@ -0,0 +1,24 @@
+import wave
+import numpy as np
+
+
+def read_wav_mono(path):
+    # Returns the samples as float32 in [-1, 1] and the sample rate
+    with wave.open(path, "rb") as wf:
+        channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        rate = wf.getframerate()
+        data = wf.readframes(wf.getnframes())
+
+    if sample_width == 1:
+        audio = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        audio = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768
+    elif sample_width == 4:
+        audio = np.frombuffer(data, dtype=np.int32).astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width * 8} bit")
+
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+    return audio, rate
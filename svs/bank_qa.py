@@ -0,0 +1,175 @@
+import os
+import json
+import struct
+from concurrent.futures import as_completed
+import numpy as np
+from process_pool import process_pool
+
+# Quality checks for a samples folder. The PCM data is memory mapped straight
+# from the WAV, so a check pages in the file once and every measurement is a
+# numpy reduction over it. Results are cached per file by size and mtime in
+# .qa.json, so a rescan only opens samples that changed.
+QA_FILENAME = ".qa.json"
+EXPECTED_RATE = 44100
+EXPECTED_BITS = 16
+MIN_DURATION = 0.3
+CLIP_LEVEL = 0.999
+MAX_CLIPPED = 3
+MAX_DC_OFFSET = 0.01
+MIN_SNR_DB = 30.0
+FRAME = 1024
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+PCM_DTYPES = {1: np.uint8, 2: "<i2", 4: "<i4"}
+
+
+def wav_layout(path):
+    # (channels, sample width, rate, data offset, data size) from the RIFF chunks
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError("Not a RIFF WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("No data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(size - 16 + (size & 1), 1)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("Data chunk before fmt chunk")
+                offset = f.tell()
+                size = min(size, os.path.getsize(path) - offset)
+                format_tag, channels, rate, _, _, bits = fmt
+                if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE):
+                    raise ValueError(f"Unsupported WAV format {format_tag}")
+                return channels, bits // 8, rate, offset, size
+            else:
+                f.seek(size + (size & 1), 1)
+
+
+def frame_levels_db(mono):
+    n_frames = len(mono) // FRAME
+    if not n_frames:
+        return np.array([20 * np.log10(np.sqrt(np.mean(mono ** 2)) + 1e-10)])
+    frames = mono[:n_frames * FRAME].reshape(n_frames, FRAME)
+    return 20 * np.log10(np.sqrt(np.einsum("ij,ij->i", frames, frames) / FRAME) + 1e-10)
+
+
+def check_file(path, expected_rate=EXPECTED_RATE):
+    channels, sample_width, rate, offset, size = wav_layout(path)
+    result = {"rate": rate, "channels": channels, "bits": sample_width * 8}
+    issues = []
+    if rate != expected_rate:
+        issues.append("sample rate")
+    if channels != 1:
+        issues.append("stereo" if channels == 2 else "multichannel")
+    if sample_width * 8 != EXPECTED_BITS:
+        issues.append("bit depth")
+    if sample_width not in PCM_DTYPES:
+        result["issues"] = issues + ["unsupported sample width"]
+        return result
+
+    n_samples = size // sample_width // channels * channels
+    result["duration"] = n_samples / channels / rate if rate else 0.0
+    if result["duration"] < MIN_DURATION:
+        issues.append("too short")
+    if not n_samples:
+        result["issues"] = issues
+        return result
+
+    data = np.memmap(path, dtype=PCM_DTYPES[sample_width], mode="r", offset=offset, shape=(n_samples,))
+    if sample_width == 1:
+        audio = (data.astype(np.float32) - 128) / 128
+    else:
+        audio = data.astype(np.float32) / float(2 ** (sample_width * 8 - 1))
+    del data
+    audio = audio.reshape(-1, channels)
+
+    peak = float(np.abs(audio).max())
+    clipped = int(np.count_nonzero(np.abs(audio) >= CLIP_LEVEL))
+    means = audio.mean(axis=0)
+    dc_offset = float(np.abs(means).max())
+    # Levels are taken without the offset, or it would pass for a noise floor
+    levels = frame_levels_db(audio.mean(axis=1) - means.mean())
+    # Noise floor from the quietest frames, signal from the loudest
+    noise_db, signal_db = np.percentile(levels, [10, 95])
+    result.update({
+        "peak_db": round(20 * np.log10(peak + 1e-10), 2),
+        "clipped": clipped,
+        "dc_offset": round(dc_offset, 5),
+        "snr_db": round(float(signal_db - noise_db), 2),
+    })
+    if clipped >= MAX_CLIPPED:
+        issues.append("clipping")
+    if dc_offset > MAX_DC_OFFSET:
+        issues.append("DC offset")
+    if result["snr_db"] < MIN_SNR_DB:
+        issues.append("low SNR")
+    result["issues"] = issues
+    return result
+
+
+class QAIndex:
+    def __init__(self, samples_path, expected_rate=EXPECTED_RATE):
+        self.samples_path = samples_path
+        self.expected_rate = expected_rate
+        self.path = os.path.join(samples_path, QA_FILENAME)
+        self.entries = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    d = json.load(f)
+                if d.get("expected_rate") == expected_rate:
+                    self.entries = d.get("entries", {})
+            except (OSError, ValueError, AttributeError):
+                self.entries = {}
+
+    def update(self, workers=None, progress=None, force=False):
+        current = {}
+        for entry in os.scandir(self.samples_path):
+            if entry.is_file() and entry.name.lower().endswith(".wav"):
+                stat = entry.stat()
+                current[entry.name] = [stat.st_size, stat.st_mtime]
+
+        self.entries = {name: value for name, value in self.entries.items() if name in current}
+        pending = [name for name in current
+                   if force or name not in self.entries or self.entries[name][:2] != current[name]]
+
+        if pending:
+            with process_pool(workers) as executor:
+                futures = {executor.submit(check_file, os.path.join(self.samples_path, name), self.expected_rate): name for name in pending}
+                try:
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        name = futures[future]
+                        try:
+                            result = future.result()
+                        except (OSError, ValueError, struct.error) as e:
+                            result = {"issues": [f"unreadable: {e}"]}
+                        self.entries[name] = [*current[name], result]
+                        if progress:
+                            progress(done, len(pending))
+                except BaseException:
+                    executor.shutdown(cancel_futures=True)
+                    raise
+        self.save()
+        return len(pending)
+
+    def report(self):
+        return [{"file": name, **entry[2]} for name, entry in sorted(self.entries.items())]
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"expected_rate": self.expected_rate, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def scan_bank_quality(samples_path, progress=None, force=False):
+    index = QAIndex(samples_path)
+    scanned = index.update(progress=progress, force=force)
+    return scanned, index.report()
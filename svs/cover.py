@@ -0,0 +1,89 @@
+import os
+import hashlib
+import threading
+from PyQt6.QtCore import QSize, QRect
+from PyQt6.QtGui import QImage, QImageReader
+
+# Voicebank cover images. UTAU shows the cover as a 100x100 BMP icon, so
+# whatever the user picks is decoded, center cropped, scaled and saved as a
+# 24 bit BMP. QImageReader decodes straight to the target size, which lets
+# JPEGs skip most of the work. Results are cached by a hash of the source
+# bytes, so picking the same photo again or browsing banks is a file lookup.
+COVER_SIZE = 100
+COVER_CACHE_DIRNAME = "covers"
+COVER_EXTENSIONS = (".bmp", ".jpg", ".jpeg", ".png")
+HASH_CHUNK = 1024 * 1024
+
+# (path, size, mtime) -> content hash, so unchanged files are hashed once
+_hashes = {}
+_hashes_lock = threading.Lock()
+
+
+class CoverError(Exception):
+    pass
+
+
+def content_hash(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _hashes_lock:
+        digest = _hashes.get(key)
+    if digest is None:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with _hashes_lock:
+            _hashes[key] = digest
+    return digest
+
+
+def decode_cover(path, size=COVER_SIZE):
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source = reader.size()
+    if not source.isValid() or source.isEmpty():
+        raise CoverError(f"Could not read image: {reader.errorString()}")
+
+    # Scale so the short side fits, then crop the middle square
+    scale = size / min(source.width(), source.height())
+    scaled = QSize(max(size, round(source.width() * scale)), max(size, round(source.height() * scale)))
+    reader.setScaledSize(scaled)
+    image = reader.read()
+    if image.isNull():
+        raise CoverError(f"Could not decode image: {reader.errorString()}")
+    left = (image.width() - size) // 2
+    top = (image.height() - size) // 2
+    return image.copy(QRect(left, top, size, size)).convertToFormat(QImage.Format.Format_RGB888)
+
+
+def make_cover(path, cache_dir, size=COVER_SIZE):
+    cached_path = os.path.join(cache_dir, f"{content_hash(path)}_{size}.bmp")
+    if os.path.isfile(cached_path):
+        return cached_path
+
+    image = decode_cover(path, size)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+    if not image.save(tmp_path, "BMP"):
+        raise CoverError(f"Could not write {cached_path}")
+    os.replace(tmp_path, cached_path)
+    return cached_path
+
+
+def cover_filename(path):
+    return os.path.splitext(os.path.basename(path))[0] + ".bmp"
+
+
+def make_covers(paths, cache_dir, size=COVER_SIZE, progress=None):
+    # Thumbnails for a list of banks, unreadable covers are left out
+    covers = {}
+    for done, path in enumerate(paths, start=1):
+        try:
+            covers[path] = make_cover(path, cache_dir, size)
+        except (OSError, CoverError):
+            pass
+        if progress:
+            progress(done, len(paths))
+    return covers
@@ -0,0 +1,167 @@
+import sys
+import pyaudio
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from workers import run_task
+
+# Audio device enumeration. PortAudio only looks for devices when it is
+# initialized, so the list is read once and kept; picking up a device that
+# was plugged in later means terminating and initializing PortAudio again,
+# which happens on a worker while no stream is open. Formats are probed once
+# per device when it is chosen and remembered, never when a stream opens.
+PROBE_RATES = (44100, 48000, 22050, 96000)
+HOTPLUG_POLL_MS = 3000
+ASOUND_CARDS = "/proc/asound/cards"
+
+
+class AudioDevice:
+    def __init__(self, info, host_api):
+        self.index = info["index"]
+        self.name = info["name"]
+        self.host_api = host_api
+        self.max_input_channels = int(info["maxInputChannels"])
+        self.max_output_channels = int(info["maxOutputChannels"])
+        self.default_rate = int(info["defaultSampleRate"])
+
+    @property
+    def key(self):
+        # Indexes change between scans, the host API and name don't
+        return f"{self.host_api}: {self.name}"
+
+
+def enumerate_devices(pa):
+    devices = []
+    for index in range(pa.get_device_count()):
+        info = pa.get_device_info_by_index(index)
+        try:
+            host_api = pa.get_host_api_info_by_index(info["hostApi"])["name"]
+        except (OSError, ValueError):
+            host_api = str(info["hostApi"])
+        devices.append(AudioDevice(info, host_api))
+    return devices
+
+
+def probe_formats(pa, device, is_input, channels=1, sample_format=pyaudio.paInt16, rates=PROBE_RATES):
+    supported = []
+    for rate in rates:
+        if is_input:
+            kwargs = {"input_device": device.index, "input_channels": channels, "input_format": sample_format}
+        else:
+            kwargs = {"output_device": device.index, "output_channels": channels, "output_format": sample_format}
+        try:
+            if pa.is_format_supported(rate, **kwargs):
+                supported.append(rate)
+        except ValueError:
+            pass
+    return supported
+
+
+def reinitialize(pa):
+    # PortAudio counts initializations and only enumerates again once the last
+    # instance is terminated, so the new instance can't be opened first
+    if pa is not None:
+        pa.terminate()
+    try:
+        pa = pyaudio.PyAudio()
+    except Exception:
+        # A second attempt, so a failed rescan still ends with a live instance
+        pa = pyaudio.PyAudio()
+    return pa, enumerate_devices(pa)
+
+
+def hotplug_signature():
+    # Cheap to read and changes when a card comes or goes; elsewhere there is
+    # no portable equivalent and rescans happen on request
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        with open(ASOUND_CARDS, "r") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class DeviceManager(QObject):
+    devices_changed = pyqtSignal()
+    # Emitted before PortAudio is terminated, so owners can close their streams
+    about_to_rescan = pyqtSignal()
+    reinitialized = pyqtSignal(object)
+
+    def __init__(self, pa, busy=None):
+        super().__init__()
+        self.pa = pa
+        self.busy = busy
+        self.devices = enumerate_devices(pa)
+        self.task = None
+        self.signature = hotplug_signature()
+        self.timer = QTimer()
+        self.timer.setInterval(HOTPLUG_POLL_MS)
+        self.timer.timeout.connect(self.check_hotplug)
+        if self.signature is not None:
+            self.timer.start()
+
+    @property
+    def ready(self):
+        return self.task is None and self.pa is not None
+
+    def inputs(self):
+        return [device for device in self.devices if device.max_input_channels > 0]
+
+    def outputs(self):
+        return [device for device in self.devices if device.max_output_channels > 0]
+
+    def find(self, key, is_input):
+        for device in self.inputs() if is_input else self.outputs():
+            if device.key == key:
+                return device
+        return None
+
+    def device_index(self, key, is_input):
+        # None opens PortAudio's default, also when the remembered device is gone
+        device = self.find(key, is_input) if key else None
+        return device.index if device else None
+
+    def check_hotplug(self):
+        signature = hotplug_signature()
+        if signature != self.signature:
+            self.rescan()
+
+    def rescan(self):
+        if self.task or (self.busy and self.busy()):
+            return False
+        self.about_to_rescan.emit()
+        signature = hotplug_signature()
+        self.task = run_task(reinitialize, self.pa,
+                             on_result=lambda result: self.rescanned(result, signature),
+                             on_error=lambda message: self.rescan_failed(message, signature),
+                             on_finished=self.rescan_finished)
+        return True
+
+    def rescan_failed(self, message, signature):
+        print(f"Audio device rescan failed: {message}", file=sys.stderr)
+        # The old instance is terminated by now, owners must not keep using it
+        try:
+            pa = pyaudio.PyAudio()
+            devices = enumerate_devices(pa)
+        except Exception as e:
+            # No devices until a later rescan succeeds; the hotplug poll keeps trying
+            print(f"Could not reinitialize audio: {e}", file=sys.stderr)
+            self.pa = None
+            self.devices = []
+            self.devices_changed.emit()
+            return
+        self.rescanned((pa, devices), signature)
+
+    def rescanned(self, result, signature):
+        self.pa, self.devices = result
+        self.signature = signature
+        self.reinitialized.emit(self.pa)
+        self.devices_changed.emit()
+
+    def rescan_finished(self):
+        self.task = None
+
+    def probe(self, key, is_input, channels=1, sample_format=pyaudio.paInt16, on_result=None):
+        device = self.find(key, is_input)
+        if device is None or not self.ready:
+            return None
+        return run_task(probe_formats, self.pa, device, is_input, channels, sample_format, on_result=on_result)
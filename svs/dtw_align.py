@@ -0,0 +1,273 @@
+import os
+from concurrent.futures import as_completed
+from functools import lru_cache
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from edl import read_edited_mono
+from kana import tokenize
+from oto import OtoIni
+from vcv_segment import FRAME_MS, HOP_MS, segment_audio, write_entries
+from process_pool import process_pool
+
+# oto estimation by alignment. Every alias of a reference voicebank becomes a
+# template: the MFCC frames around its oto region plus the frames its offset,
+# overlap, preutterance and consonant fall on. The energy segmentation of
+# vcv_segment gives a rough position for each alias of a new sample; the
+# template is then aligned to that part of the sample with a banded
+# subsequence DTW, and the template's marks are carried over along the
+# warping path. Alignments are batched per chunk of files and the DTW runs
+# one anti-diagonal at a time, so the only Python loop is over frames.
+N_MELS = 26
+N_MFCC = 13
+CONTEXT_MS = 50
+SEARCH_MS = 100
+MIN_CONFIDENCE = 0.2
+CHUNK_FILES = 16
+
+# Templates the workers align against, set once per process by the pool initializer
+_templates = {}
+
+
+class OtoTemplate:
+    def __init__(self, features, marks):
+        self.features = features
+        # Template frames of offset, overlap, preutterance and consonant end
+        self.marks = marks
+
+
+@lru_cache(maxsize=8)
+def mel_dct(rate, frame):
+    # Triangular mel filters over the rfft bins, and the DCT-II that turns log mel energies into cepstra
+    n_bins = frame // 2 + 1
+    mel_max = 2595 * np.log10(1 + (rate / 2) / 700)
+    hz = 700 * (10 ** (np.linspace(0, mel_max, N_MELS + 2) / 2595) - 1)
+    bins = hz * frame / rate
+    k = np.arange(n_bins)
+    lower, center, upper = bins[:-2, None], bins[1:-1, None], bins[2:, None]
+    filters = np.maximum(0, np.minimum((k - lower) / (center - lower), (upper - k) / (upper - center)))
+    n = np.arange(N_MELS)
+    dct = np.cos(np.pi / N_MELS * (n + 0.5)[None, :] * np.arange(N_MFCC)[:, None])
+    return filters.astype(np.float32), dct.astype(np.float32)
+
+
+def mfcc(audio, rate):
+    frame = int(rate * FRAME_MS / 1000)
+    hop = int(rate * HOP_MS / 1000)
+    if len(audio) < frame:
+        audio = np.pad(audio, (0, frame - len(audio)))
+    frames = sliding_window_view(audio, frame)[::hop] * np.hanning(frame).astype(np.float32)
+    filters, dct = mel_dct(rate, frame)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    cepstra = np.log(power @ filters.T + 1e-10) @ dct.T
+    # Mean normalized per file, so mic and level differences between banks cancel out
+    return (cepstra - cepstra.mean(axis=0)).astype(np.float32)
+
+
+def alias_key(alias):
+    # "a か" and "- か" both fall back to "か" when no template has the exact alias
+    return alias.split()[-1] if alias.split() else alias
+
+
+def extract_templates(path, entries):
+    audio, rate = read_edited_mono(path)
+    features = mfcc(audio, rate)
+    templates = []
+    for entry in entries:
+        start_ms = max(0.0, entry["offset"] - CONTEXT_MS)
+        end_ms = entry["offset"] + max(entry["preutter"], entry["consonant"], entry["overlap"]) + CONTEXT_MS
+        start, end = int(start_ms // HOP_MS), min(len(features), int(np.ceil(end_ms / HOP_MS)))
+        if end - start < 2:
+            continue
+        points = entry["offset"] + np.array([0, entry["overlap"], entry["preutter"], entry["consonant"]])
+        marks = np.clip(np.round((points - start_ms) / HOP_MS).astype(int), 0, end - start - 1)
+        templates.append((entry["alias"], OtoTemplate(features[start:end], marks)))
+    return templates
+
+
+def build_templates(reference_path, workers=None, progress=None):
+    oto = OtoIni.load_folder(reference_path)
+    by_file = {}
+    entries_in_order = []
+    for row in oto.rows():
+        entry = oto.entry(row)
+        entry["alias"] = oto.alias_key(row)
+        if os.path.isfile(os.path.join(reference_path, entry["file"])):
+            by_file.setdefault(entry["file"], []).append(entry)
+            entries_in_order.append(entry)
+
+    extracted = {}
+    with process_pool(workers) as executor:
+        futures = {executor.submit(extract_templates, os.path.join(reference_path, filename), entries): filename for filename, entries in by_file.items()}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    file_templates = extracted.setdefault(futures[future], {})
+                    for alias, template in future.result():
+                        file_templates.setdefault(alias, template)
+                except Exception:
+                    pass
+                if progress:
+                    progress(done, len(futures))
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    # Registered in oto order, so the first definition of an alias wins as in
+    # UTAU, and a fallback key goes to the first alias that ends in it
+    templates = {}
+    for entry in entries_in_order:
+        template = extracted.get(entry["file"], {}).get(entry["alias"])
+        if template is not None:
+            templates.setdefault(entry["alias"], template)
+            templates.setdefault(alias_key(entry["alias"]), template)
+    return templates
+
+
+def banded_dtw(templates, targets, expected, band):
+    # Subsequence DTW for a batch: each template must be used from its first
+    # to its last frame, but may start and end anywhere in its target, as long
+    # as frame i stays within band of target frame expected + i.
+    B = len(templates)
+    n = np.array([len(t) for t in templates])
+    m = np.array([len(x) for x in targets])
+    N, M, dim = n.max(), m.max(), templates[0].shape[1]
+    T = np.zeros((B, N, dim), dtype=np.float32)
+    X = np.zeros((B, M, dim), dtype=np.float32)
+    for b in range(B):
+        T[b, :n[b]] = templates[b]
+        X[b, :m[b]] = targets[b]
+
+    sq = (T ** 2).sum(-1)[:, :, None] + (X ** 2).sum(-1)[:, None, :] - 2 * np.einsum("bid,bjd->bij", T, X)
+    cost = np.sqrt(np.maximum(sq, 0))
+    i = np.arange(N)[None, :, None]
+    j = np.arange(M)[None, None, :]
+    valid = (i < n[:, None, None]) & (j < m[:, None, None]) & (np.abs(j - i - expected[:, None, None]) <= band[:, None, None])
+    cost[~valid] = np.inf
+
+    # acc is padded by one row and column; a free first row is the open start
+    acc = np.full((B, N + 1, M + 1), np.inf, dtype=np.float32)
+    acc[:, 0, :] = 0
+    for k in range(N + M - 1):
+        di = np.arange(max(0, k - M + 1), min(N - 1, k) + 1)
+        dj = k - di
+        acc[:, di + 1, dj + 1] = cost[:, di, dj] + np.minimum(np.minimum(acc[:, di, dj + 1], acc[:, di + 1, dj]), acc[:, di, dj])
+
+    rows = acc[np.arange(B), n, 1:]
+    rows[j[0] >= m[:, None]] = np.inf
+    end = rows.argmin(axis=1)
+    total = rows[np.arange(B), end]
+
+    # Walk all paths back together, noting the target frame of every template frame
+    bi, bj = n.copy(), end + 1
+    path = np.zeros((B, N), dtype=int)
+    steps = np.zeros(B)
+    active = np.isfinite(total)
+    batch = np.arange(B)
+    while active.any():
+        path[batch[active], bi[active] - 1] = bj[active] - 1
+        steps += active
+        active &= bi > 1
+        moves = np.stack((acc[batch, bi - 1, bj - 1], acc[batch, bi - 1, bj], acc[batch, bi, bj - 1])).argmin(axis=0)
+        bi = np.where(active & (moves < 2), bi - 1, bi)
+        bj = np.where(active & (moves != 1), bj - 1, bj)
+    return path, np.where(steps > 0, total / np.maximum(steps, 1), np.inf)
+
+
+def confidence(template, target, mean_cost):
+    # How much better the aligned template fits than its average frame does
+    baseline = np.linalg.norm(target - template.mean(axis=0), axis=1).mean()
+    if not np.isfinite(mean_cost) or baseline <= 0:
+        return 0.0
+    return float(np.clip(1 - mean_cost / baseline, 0, 1))
+
+
+def set_templates(templates):
+    global _templates
+    _templates = templates
+
+
+def align_chunk(paths, kana_map):
+    results = {}
+    failed = []
+    jobs = []
+    for path in paths:
+        filename = os.path.basename(path)
+        try:
+            tokens = tokenize(os.path.splitext(filename)[0], kana_map)
+            if not tokens:
+                results[filename] = []
+                continue
+            audio, rate = read_edited_mono(path)
+            entries = segment_audio(filename, tokens, audio, rate, kana_map)
+            features = mfcc(audio, rate)
+        except Exception:
+            failed.append(filename)
+            continue
+        results[filename] = [(*entry, 0.0) for entry in entries]
+        for index, entry in enumerate(entries):
+            alias, offset = entry[0], entry[1]
+            template = _templates.get(alias) or _templates.get(alias_key(alias))
+            if template is None:
+                continue
+            n = len(template.features)
+            search = SEARCH_MS // HOP_MS
+            start = int(offset // HOP_MS) - template.marks[0]
+            window_start = max(0, start - search)
+            window_end = min(len(features), start + n + search + n // 4)
+            if window_end - window_start < 2:
+                continue
+            jobs.append((filename, index, template, window_start, start - window_start, search + n // 4, features[window_start:window_end]))
+
+    if jobs:
+        path, mean_cost = banded_dtw([job[2].features for job in jobs], [job[6] for job in jobs],
+                                     np.array([job[4] for job in jobs]), np.array([job[5] for job in jobs]))
+        for k, (filename, index, template, window_start, _, _, target) in enumerate(jobs):
+            score = confidence(template.features, target, mean_cost[k])
+            if score < MIN_CONFIDENCE:
+                continue
+            alias, offset, consonant, cutoff, preutter, overlap, _ = results[filename][index]
+            end_ms = offset - cutoff
+            points = (path[k, template.marks] + window_start) * HOP_MS
+            offset = float(points[0])
+            overlap, preutter, consonant = (float(point - offset) for point in points[1:])
+            cutoff = -(max(end_ms, offset + consonant + HOP_MS) - offset)
+            results[filename][index] = (alias, offset, consonant, cutoff, preutter, overlap, round(score, 3))
+    return results, failed
+
+
+def align_oto(samples_path, reference_path, kana_map, workers=None, progress=None):
+    wav_files = sorted(name for name in os.listdir(samples_path) if name.lower().endswith(".wav"))
+    oto = OtoIni.load_folder(samples_path)
+
+    # The reference bank counts as the first half of the progress
+    def template_progress(done, total):
+        if progress:
+            progress(done, 2 * total)
+
+    templates = build_templates(reference_path, workers, template_progress)
+    chunks = [wav_files[i:i + CHUNK_FILES] for i in range(0, len(wav_files), CHUNK_FILES)]
+
+    results = {}
+    failed = []
+    with process_pool(workers, initializer=set_templates, initargs=(templates,)) as executor:
+        futures = {executor.submit(align_chunk, [os.path.join(samples_path, name) for name in chunk], kana_map): chunk for chunk in chunks}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    chunk_results, chunk_failed = future.result()
+                    results.update(chunk_results)
+                    failed += chunk_failed
+                except Exception:
+                    failed += futures[future]
+                if progress:
+                    progress(len(chunks) + done, 2 * len(chunks))
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    confidences = {}
+    for filename in wav_files:
+        for entry in results.get(filename, []):
+            confidences.setdefault(entry[0], entry[6])
+    n_aliases = write_entries(oto, wav_files, {filename: [entry[:6] for entry in entries] for filename, entries in results.items()})
+    return oto, len(wav_files), n_aliases, failed, confidences
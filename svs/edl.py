@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import wave
+import hashlib
+import threading
+import numpy as np
+from audio_io import read_wav_mono
+
+# Non-destructive sample edits. Each samples folder keeps an edits.json that
+# maps a WAV filename to its trim, gain and fades; the WAVs themselves are
+# never rewritten. Readers apply the edit when they load a sample, and
+# packaging renders the edited files in one streaming pass. Times are stored
+# in seconds so an edit doesn't depend on the sample rate. An edit remembers
+# the sha256 of the WAV it was made on, the name the take store keeps that
+# take under, so it can be dropped once another take is published.
+EDITS_FILENAME = "edits.json"
+RENDER_BLOCK_FRAMES = 65536
+
+SAMPLE_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+class SampleEdit:
+    def __init__(self, trim_start=0.0, trim_end=0.0, gain_db=0.0, fade_in=0.0, fade_out=0.0, mtime=0.0, source=""):
+        self.trim_start = trim_start
+        self.trim_end = trim_end
+        self.gain_db = gain_db
+        self.fade_in = fade_in
+        self.fade_out = fade_out
+        self.mtime = mtime
+        self.source = source
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(float(d.get("trim_start", 0.0)), float(d.get("trim_end", 0.0)), float(d.get("gain_db", 0.0)),
+                   float(d.get("fade_in", 0.0)), float(d.get("fade_out", 0.0)), float(d.get("mtime", 0.0)),
+                   str(d.get("source", "")))
+
+    def to_dict(self):
+        return {"trim_start": self.trim_start, "trim_end": self.trim_end, "gain_db": self.gain_db,
+                "fade_in": self.fade_in, "fade_out": self.fade_out, "mtime": self.mtime, "source": self.source}
+
+    def is_identity(self):
+        return not (self.trim_start or self.trim_end or self.gain_db or self.fade_in or self.fade_out)
+
+    def frame_range(self, n_frames, rate):
+        # trim_end is what is cut off the end, not a position
+        start = min(n_frames, max(0, round(self.trim_start * rate)))
+        end = max(start, n_frames - max(0, round(self.trim_end * rate)))
+        return start, end
+
+    def envelope(self, offset, count, total, rate):
+        # Gain for output frames offset..offset+count of a total-frame result
+        gain = 10 ** (self.gain_db / 20)
+        index = np.arange(offset, offset + count, dtype=np.float32)
+        env = np.full(count, gain, dtype=np.float32)
+        fade_in = round(self.fade_in * rate)
+        fade_out = round(self.fade_out * rate)
+        if fade_in > 0:
+            env *= np.clip(index / fade_in, 0.0, 1.0)
+        if fade_out > 0:
+            env *= np.clip((total - index) / fade_out, 0.0, 1.0)
+        return env
+
+    def apply(self, audio, rate):
+        start, end = self.frame_range(len(audio), rate)
+        segment = audio[start:end]
+        env = self.envelope(0, len(segment), len(segment), rate)
+        if segment.ndim > 1:
+            env = env[:, None]
+        if np.issubdtype(segment.dtype, np.floating):
+            return np.clip(segment * env, -1.0, 1.0).astype(segment.dtype)
+        limits = np.iinfo(segment.dtype)
+        return np.clip(np.rint(segment * env), limits.min, limits.max).astype(segment.dtype)
+
+
+class EditList:
+    def __init__(self, samples_path):
+        self.samples_path = samples_path
+        self.path = os.path.join(samples_path, EDITS_FILENAME)
+        self.edits = {}
+        # Edits are set from the GUI while a take finalizer may be publishing
+        self._lock = threading.RLock()
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.edits = {name: SampleEdit.from_dict(d) for name, d in json.load(f).items()}
+            except (OSError, ValueError, AttributeError):
+                self.edits = {}
+
+    def get(self, filename):
+        return self.edits.get(filename)
+
+    def set(self, filename, edit):
+        if edit.is_identity():
+            self.remove(filename)
+            return
+        edit.mtime = time.time()
+        edit.source = file_digest(os.path.join(self.samples_path, filename))
+        with self._lock:
+            self.edits[filename] = edit
+            self.save()
+
+    def remove(self, filename):
+        with self._lock:
+            if self.edits.pop(filename, None) is not None:
+                self.save()
+
+    def drop_stale(self, filename, digest):
+        # Called when digest becomes the audio of filename
+        with self._lock:
+            edit = self.edits.get(filename)
+            if edit is not None and edit.source != digest:
+                self.remove(filename)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({name: edit.to_dict() for name, edit in self.edits.items()}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# samples_path -> (mtime_ns, EditList), shared by every reader in the process
+_edit_lists = {}
+_edit_lists_lock = threading.Lock()
+
+
+def load_edits(samples_path):
+    path = os.path.join(samples_path, EDITS_FILENAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = 0
+    with _edit_lists_lock:
+        cached = _edit_lists.get(samples_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    edit_list = EditList(samples_path)
+    with _edit_lists_lock:
+        _edit_lists[samples_path] = (mtime, edit_list)
+    return edit_list
+
+
+def sample_edit(wav_path):
+    return load_edits(os.path.dirname(wav_path)).get(os.path.basename(wav_path))
+
+
+def read_edited_mono(path):
+    audio, rate = read_wav_mono(path)
+    edit = sample_edit(path)
+    if edit:
+        audio = edit.apply(audio, rate)
+    return audio, rate
+
+
+def render_edited_wav(path, edit_dict, output_path, block_frames=RENDER_BLOCK_FRAMES):
+    # Streams the source in blocks straight to output_path, so only one block
+    # of a long recording is ever in memory
+    edit = SampleEdit.from_dict(edit_dict)
+    with wave.open(path, "rb") as src, wave.open(output_path, "wb") as dst:
+        channels = src.getnchannels()
+        sample_width = src.getsampwidth()
+        rate = src.getframerate()
+        if sample_width not in SAMPLE_DTYPES:
+            raise ValueError(f"Unsupported sample width: {sample_width * 8} bit")
+        dtype = SAMPLE_DTYPES[sample_width]
+        dst.setnchannels(channels)
+        dst.setsampwidth(sample_width)
+        dst.setframerate(rate)
+
+        start, end = edit.frame_range(src.getnframes(), rate)
+        total = end - start
+        src.setpos(start)
+        done = 0
+        while done < total:
+            count = min(block_frames, total - done)
+            block = np.frombuffer(src.readframes(count), dtype=dtype).reshape(-1, channels).astype(np.float32)
+            if dtype is np.uint8:
+                block -= 128
+            block *= edit.envelope(done, len(block), total, rate)[:, None]
+            if dtype is np.uint8:
+                block = np.clip(np.rint(block) + 128, 0, 255)
+            else:
+                limits = np.iinfo(dtype)
+                block = np.clip(np.rint(block), limits.min, limits.max)
+            dst.writeframes(block.astype(dtype).tobytes())
+            done += count
+            if len(block) < count:
+                break
+    return output_path
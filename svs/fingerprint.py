@@ -0,0 +1,143 @@
+import os
+import json
+from concurrent.futures import as_completed
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from audio_io import read_wav_mono
+from process_pool import process_pool
+
+# 128 bit SimHash per sample: a grid of log band energies over time is
+# projected onto fixed random hyperplanes, so the Hamming distance between
+# two hashes follows the angle between their spectral envelopes. Near
+# duplicates are found by bucketing 16 bit slices of the hash, so only
+# samples that share a slice are ever compared.
+FINGERPRINT_FILENAME = ".fingerprints.json"
+N_FFT = 2048
+HOP = 512
+N_BANDS = 16
+N_SEGMENTS = 16
+HASH_BITS = 128
+LSH_BANDS = 8
+LSH_BITS = 16
+DUPLICATE_DISTANCE = 8
+NEIGHBOR_DISTANCE = 12
+HYPERPLANES = np.random.default_rng(0x5115).standard_normal((HASH_BITS, N_SEGMENTS * N_BANDS)).astype(np.float32)
+
+
+def band_matrix(rate, n_fft=N_FFT, low=100.0, high=8000.0):
+    edges = np.geomspace(low, min(high, rate / 2), N_BANDS + 1)
+    freqs = np.fft.rfftfreq(n_fft, 1 / rate)
+    return ((freqs[None, :] >= edges[:-1, None]) & (freqs[None, :] < edges[1:, None])).astype(np.float32)
+
+
+def fingerprint_audio(audio, rate):
+    if len(audio) < N_FFT:
+        audio = np.pad(audio, (0, N_FFT - len(audio)))
+    frames = sliding_window_view(audio, N_FFT)[::HOP] * np.hanning(N_FFT).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    bands = np.log10(power @ band_matrix(rate).T + 1e-10)
+
+    # Only look at the part that is actually sung
+    loudness = bands.max(axis=1)
+    voiced = np.flatnonzero(loudness > loudness.max() - 4)
+    bands = bands[voiced[0]:voiced[-1] + 1]
+
+    segments = np.array_split(np.arange(len(bands)), N_SEGMENTS)
+    grid = np.stack([bands[idx].mean(axis=0) if len(idx) else bands.mean(axis=0) for idx in segments])
+    features = (grid - grid.mean()).ravel()
+    features /= np.linalg.norm(features) + 1e-10
+
+    bits = HYPERPLANES @ features > 0
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def fingerprint_file(path):
+    audio, rate = read_wav_mono(path)
+    return fingerprint_audio(audio, rate)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class FingerprintIndex:
+    def __init__(self, samples_path):
+        self.samples_path = samples_path
+        self.path = os.path.join(samples_path, FINGERPRINT_FILENAME)
+        self.entries = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def fingerprint(self, filename):
+        entry = self.entries.get(filename)
+        return int(entry[2], 16) if entry else None
+
+    def update(self, workers=None, progress=None):
+        current = {}
+        for entry in os.scandir(self.samples_path):
+            if entry.is_file() and entry.name.lower().endswith(".wav"):
+                stat = entry.stat()
+                current[entry.name] = (stat.st_size, stat.st_mtime)
+
+        self.entries = {name: value for name, value in self.entries.items() if name in current}
+        pending = [name for name, (size, mtime) in current.items()
+                   if name not in self.entries or self.entries[name][:2] != [size, mtime]]
+
+        failed = []
+        if pending:
+            with process_pool(workers) as executor:
+                futures = {executor.submit(fingerprint_file, os.path.join(self.samples_path, name)): name for name in pending}
+                try:
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        name = futures[future]
+                        try:
+                            self.entries[name] = [*current[name], format(future.result(), "032x")]
+                        except Exception:
+                            failed.append(name)
+                        if progress:
+                            progress(done, len(pending))
+                except BaseException:
+                    executor.shutdown(cancel_futures=True)
+                    raise
+        self.save()
+        return len(pending) - len(failed), failed
+
+    def near_duplicates(self, max_distance=DUPLICATE_DISTANCE):
+        buckets = {}
+        hashes = {name: int(entry[2], 16) for name, entry in self.entries.items()}
+        mask = (1 << LSH_BITS) - 1
+        for name, value in hashes.items():
+            for band in range(LSH_BANDS):
+                buckets.setdefault((band, (value >> (band * LSH_BITS)) & mask), []).append(name)
+
+        pairs = {}
+        for names in buckets.values():
+            for i, a in enumerate(names):
+                for b in names[i + 1:]:
+                    key = (a, b) if a < b else (b, a)
+                    if key not in pairs:
+                        pairs[key] = hamming(hashes[a], hashes[b])
+        return sorted((a, b, distance) for (a, b), distance in pairs.items() if distance <= max_distance)
+
+    def neighbor_mismatches(self, reclist_lines, max_distance=NEIGHBOR_DISTANCE):
+        # A take that sounds like the line before or after it was most likely
+        # recorded into the wrong slot
+        flagged = []
+        hashes = [self.fingerprint(f"{line}.wav") for line in reclist_lines]
+        for i in range(len(hashes) - 1):
+            if hashes[i] is None or hashes[i + 1] is None:
+                continue
+            distance = hamming(hashes[i], hashes[i + 1])
+            if distance <= max_distance:
+                flagged.append((reclist_lines[i], reclist_lines[i + 1], distance))
+        return flagged
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
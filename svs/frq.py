@@ -0,0 +1,126 @@
+import os
+import struct
+from concurrent.futures import as_completed
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from edl import read_edited_mono, sample_edit
+from process_pool import process_pool
+
+# UTAU frequency maps: "FREQ0003", samples per frame, average f0, 16 reserved
+# bytes, frame count, then one (f0, amplitude) pair of doubles per frame.
+FRQ_HEADER = b"FREQ0003"
+FRQ_HOP = 256
+WINDOW = 2048
+F0_MIN = 60.0
+F0_MAX = 1100.0
+YIN_THRESHOLD = 0.15
+
+
+def frq_path(wav_path):
+    return os.path.splitext(wav_path)[0] + "_wav.frq"
+
+
+def estimate_f0(audio, rate, hop=FRQ_HOP):
+    # YIN over all frames at once, with the autocorrelation done through the FFT
+    padded = np.pad(audio, (WINDOW // 2, WINDOW // 2 + hop))
+    frames = sliding_window_view(padded, WINDOW)[::hop][:len(audio) // hop + 1]
+    frames = frames - frames.mean(axis=1, keepdims=True)
+
+    tau_min = max(2, int(rate / F0_MAX))
+    tau_max = min(WINDOW // 2, int(rate / F0_MIN))
+    spectrum = np.fft.rfft(frames, n=2 * WINDOW, axis=1)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), axis=1)[:, :tau_max + 1]
+    diff = 2 * (acf[:, :1] - acf)
+    cumulative = np.cumsum(diff[:, 1:], axis=1)
+    cmnd = np.ones_like(diff)
+    cmnd[:, 1:] = diff[:, 1:] * np.arange(1, tau_max + 1) / np.maximum(cumulative, 1e-10)
+
+    search = cmnd[:, tau_min:tau_max]
+    below = search < YIN_THRESHOLD
+    voiced = below.any(axis=1)
+    first = np.where(voiced, below.argmax(axis=1), search.argmin(axis=1))
+
+    # Walk down to the local minimum after the first threshold crossing
+    window = np.arange(32)
+    idx = np.minimum(first[:, None] + window, search.shape[1] - 1)
+    local = np.take_along_axis(search, idx, axis=1)
+    tau = first + local.argmin(axis=1) + tau_min
+
+    # Parabolic interpolation around the minimum
+    left = cmnd[np.arange(len(tau)), np.maximum(tau - 1, 1)]
+    center = cmnd[np.arange(len(tau)), tau]
+    right = cmnd[np.arange(len(tau)), np.minimum(tau + 1, tau_max)]
+    denominator = left - 2 * center + right
+    shift = np.where(np.abs(denominator) > 1e-10, 0.5 * (left - right) / np.where(denominator == 0, 1, denominator), 0)
+    f0 = rate / (tau + np.clip(shift, -1, 1))
+
+    amplitude = np.sqrt(np.mean(frames ** 2, axis=1)) * 32768
+    silent = amplitude < amplitude.max() * 0.02
+    f0 = np.where(voiced & ~silent, f0, 0.0)
+    return f0, amplitude
+
+
+def write_frq(path, f0, amplitude, hop=FRQ_HOP):
+    voiced = f0[f0 > 0]
+    average = float(np.median(voiced)) if len(voiced) else 0.0
+    body = np.empty((len(f0), 2), dtype="<f8")
+    body[:, 0] = f0
+    body[:, 1] = amplitude
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(FRQ_HEADER)
+        f.write(struct.pack("<id", hop, average))
+        f.write(bytes(16))
+        f.write(struct.pack("<i", len(f0)))
+        f.write(body.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_frq(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != FRQ_HEADER:
+        raise ValueError(f"Not a frequency map: {path}")
+    hop, average = struct.unpack_from("<id", data, 8)
+    (count,) = struct.unpack_from("<i", data, 36)
+    body = np.frombuffer(data, dtype="<f8", count=count * 2, offset=40).reshape(-1, 2)
+    return hop, average, body[:, 0], body[:, 1]
+
+
+def is_frq_current(wav_path):
+    path = frq_path(wav_path)
+    if not os.path.exists(path):
+        return False
+    # The map follows the edited sample, so a newer edit makes it stale too
+    edit = sample_edit(wav_path)
+    return os.path.getmtime(path) >= max(os.path.getmtime(wav_path), edit.mtime if edit else 0.0)
+
+
+def generate_frq_file(wav_path):
+    audio, rate = read_edited_mono(wav_path)
+    f0, amplitude = estimate_f0(audio, rate)
+    write_frq(frq_path(wav_path), f0, amplitude)
+    return wav_path
+
+
+def generate_frq(samples_path, workers=None, progress=None, force=False):
+    wav_paths = sorted(os.path.join(samples_path, name) for name in os.listdir(samples_path) if name.lower().endswith(".wav"))
+    pending = [path for path in wav_paths if force or not is_frq_current(path)]
+
+    failed = []
+    if pending:
+        with process_pool(workers) as executor:
+            futures = {executor.submit(generate_frq_file, path): path for path in pending}
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    try:
+                        future.result()
+                    except Exception:
+                        failed.append(os.path.basename(futures[future]))
+                    if progress:
+                        progress(done, len(pending))
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+    return len(pending) - len(failed), len(wav_paths) - len(pending), failed
@@ -0,0 +1,175 @@
+import os
+import time
+import zlib
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Voicebank zip installer. Most banks are zipped on Japanese Windows, where
+# filenames are stored as CP932 without the UTF-8 flag and zipfile decodes
+# them as CP437. The raw bytes are recovered and the encoding is picked for
+# the whole archive. Entries are extracted on a thread pool, each thread with
+# its own handle on the zip, streamed in chunks and checked against their CRC.
+UTF8_FLAG = 0x800
+CHUNK_SIZE = 1024 * 1024
+CHARACTER_FILENAME = "character.txt"
+
+
+def raw_filename(info):
+    if info.flag_bits & UTF8_FLAG:
+        return info.filename.encode("utf-8")
+    return info.filename.encode("cp437")
+
+
+def detect_filename_encoding(infos):
+    raw_names = [raw_filename(info) for info in infos if not info.flag_bits & UTF8_FLAG]
+    if all(name.isascii() for name in raw_names):
+        return "ascii"
+    for encoding in ("utf-8", "cp932"):
+        try:
+            for name in raw_names:
+                name.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "cp437"
+
+
+def decode_filename(info, encoding):
+    if info.flag_bits & UTF8_FLAG or encoding == "ascii":
+        return info.filename
+    return raw_filename(info).decode(encoding, errors="replace")
+
+
+def safe_parts(name):
+    # Refuse anything that would land outside the destination folder
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or ":" in parts[0]:
+        return None
+    return parts
+
+
+class ZipEntry:
+    def __init__(self, info, parts):
+        self.info = info
+        self.parts = parts
+
+
+def plan_install(zip_path, dest_root):
+    with zipfile.ZipFile(zip_path) as zf:
+        infos = zf.infolist()
+    encoding = detect_filename_encoding(infos)
+
+    entries = []
+    skipped = []
+    for info in infos:
+        name = decode_filename(info, encoding)
+        parts = safe_parts(name)
+        if parts is None:
+            skipped.append(name)
+        elif not info.is_dir() and parts[0] != "__MACOSX":
+            entries.append(ZipEntry(info, parts))
+
+    # Banks zipped as a single top folder keep it, loose files get a folder
+    # named after the zip
+    top_levels = {entry.parts[0] for entry in entries}
+    if len(top_levels) == 1 and all(len(entry.parts) > 1 for entry in entries):
+        bank_path = os.path.join(dest_root, top_levels.pop())
+        target_root = dest_root
+    else:
+        bank_path = os.path.join(dest_root, os.path.splitext(os.path.basename(zip_path))[0])
+        target_root = bank_path
+    return encoding, bank_path, target_root, entries, skipped
+
+
+class ZipHandles:
+    # One ZipFile per extraction thread, so reads never share a file position
+    def __init__(self, zip_path):
+        self.zip_path = zip_path
+        self.local = threading.local()
+        self.opened = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        zf = getattr(self.local, "zf", None)
+        if zf is None:
+            zf = self.local.zf = zipfile.ZipFile(self.zip_path)
+            with self._lock:
+                self.opened.append(zf)
+        return zf
+
+    def close(self):
+        for zf in self.opened:
+            zf.close()
+        self.opened.clear()
+
+
+def extract_entry(handles, entry, target_root):
+    zf = handles.get()
+
+    dest_path = os.path.join(target_root, *entry.parts)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = dest_path + ".part"
+    crc = 0
+    try:
+        with zf.open(entry.info) as src, open(tmp_path, "wb") as dst:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                dst.write(chunk)
+        if crc != entry.info.CRC:
+            raise zipfile.BadZipFile(f"CRC mismatch in {'/'.join(entry.parts)}")
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    mtime = time.mktime(entry.info.date_time + (0, 0, -1))
+    os.utime(dest_path, (mtime, mtime))
+    return entry.info.file_size
+
+
+def find_samples_folder(bank_path):
+    # The folder with the most WAVs, the bank root or one of its pitch folders
+    best, best_count = bank_path, -1
+    for root, dirs, files in os.walk(bank_path):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        count = sum(1 for name in files if name.lower().endswith(".wav"))
+        if count > best_count:
+            best, best_count = root, count
+    return best
+
+
+def install_voicebank(zip_path, dest_root, workers=None, progress=None):
+    encoding, bank_path, target_root, entries, skipped = plan_install(zip_path, dest_root)
+    handles = ZipHandles(zip_path)
+    failed = []
+    # Largest first so a few big WAVs don't end up alone at the tail
+    entries.sort(key=lambda entry: entry.info.file_size, reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2)) as executor:
+            futures = {executor.submit(extract_entry, handles, entry, target_root): entry for entry in entries}
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    try:
+                        future.result()
+                    except (OSError, zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError):
+                        failed.append("/".join(futures[future].parts))
+                    if progress:
+                        progress(done, len(entries))
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+    finally:
+        handles.close()
+    return {
+        "bank_path": bank_path,
+        "samples_path": find_samples_folder(bank_path),
+        "encoding": encoding,
+        "files": len(entries) - len(failed),
+        "failed": failed,
+        "skipped": skipped,
+        "has_character": os.path.isfile(os.path.join(bank_path, CHARACTER_FILENAME)),
+    }
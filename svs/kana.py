@@ -0,0 +1,40 @@
+import csv
+import re
+
+HIR_ROMAJ_PATH = "hiragana-romaji.csv"
+VOWELS = ("a", "i", "u", "e", "o")
+
+_patterns = {}
+
+
+def load_kana_map(path=HIR_ROMAJ_PATH):
+    with open(path, mode='r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        return {row['hiragana']: row['romaji'] for row in reader}
+
+
+def kana_pattern(kana_map):
+    cached = _patterns.get(id(kana_map))
+    if cached is None or cached[0] is not kana_map:
+        alternatives = sorted(kana_map, key=len, reverse=True)
+        cached = (kana_map, re.compile("|".join(re.escape(kana) for kana in alternatives)))
+        _patterns[id(kana_map)] = cached
+    return cached[1]
+
+
+def tokenize(text, kana_map):
+    # Longest match first, so きゃ wins over き + ゃ. Anything that is not in
+    # the table (the leading "_" of VCV lines, spaces, dashes) is skipped.
+    return kana_pattern(kana_map).findall(text)
+
+
+def vowel_of(romaji):
+    if romaji == "n":
+        return "n"
+    return romaji[-1] if romaji and romaji[-1] in VOWELS else ""
+
+
+def consonant_of(romaji):
+    if romaji == "n":
+        return "n"
+    return romaji[:-1] if romaji and romaji[-1] in VOWELS else romaji
@@ -3,6 +3,17 @@ import sys
 import pyaudio
 import wave
 import shutil
+import json
+from kana import load_kana_map
+from vcv_segment import generate_oto
+from dtw_align import align_oto, MIN_CONFIDENCE
+from frq import generate_frq
+from reclist_coverage import analyze_reclist, read_reclist, STYLES
+from reclist_gen import generate_reclist, write_reclist
+from workspace_catalog import WorkspaceCatalog, CATALOG_FILENAME, register_bank
+from installer import install_voicebank
+from packaging import zip_voicebank
+from bank_qa import scan_bank_quality
 
 # Define constants
 VALID_VB_PITCHES = ("A3", "A4", "A5")
@@ -33,6 +44,12 @@ h: Display this help info
 3: Record from reclist
 4: Configure oto.ini automatically
 5: Package voicebank
+6: Generate .frq files
+7: Analyze reclist coverage
+8: Generate reclist
+9: Workspace overview
+10: Install voicebank zip
+11: Sample quality report
 """)
     
 def settings_menu():
@@ -163,6 +180,167 @@ def record_from_reclist():
     
     print("Recording session completed.\n")
 
+def configure_oto():
+    print("\n"+("*"*5)+" Configure oto.ini "+("*"*5))
+
+    while True:
+        samples_dir = input("Enter the voicebank samples directory: ").strip()
+        if os.path.isdir(samples_dir):
+            break
+        else:
+            print("The specified directory does not exist. Please try again.")
+
+    while True:
+        reference_dir = input("Reference voicebank directory for alignment (optional): ").strip()
+        if not reference_dir or os.path.isfile(os.path.join(reference_dir, "oto.ini")):
+            break
+        else:
+            print("The specified directory has no oto.ini. Please try again.")
+
+    def progress(done, total):
+        print(f"\rSegmenting samples... {done}/{total}", end="", flush=True)
+
+    if reference_dir:
+        oto, n_files, n_aliases, failed, confidences = align_oto(samples_dir, reference_dir, load_kana_map(), progress=progress)
+    else:
+        oto, n_files, n_aliases, failed = generate_oto(samples_dir, load_kana_map(), progress=progress)
+        confidences = {}
+    print(f"\nWrote {n_aliases} aliases for {n_files} samples to: {oto.path}")
+    for alias, score in sorted(confidences.items(), key=lambda item: item[1]):
+        if score < MIN_CONFIDENCE:
+            print(f"Not aligned, placed by energy only: {alias}")
+    for name in failed:
+        print(f"Warning: could not read {name}")
+    print()
+
+def generate_frq_files():
+    print("\n"+("*"*5)+" Generate .frq files "+("*"*5))
+
+    while True:
+        samples_dir = input("Enter the voicebank samples directory: ").strip()
+        if os.path.isdir(samples_dir):
+            break
+        else:
+            print("The specified directory does not exist. Please try again.")
+
+    def progress(done, total):
+        print(f"\rAnalyzing pitch... {done}/{total}", end="", flush=True)
+
+    written, skipped, failed = generate_frq(samples_dir, progress=progress)
+    print(f"\nWrote {written} .frq files, {skipped} already up to date.")
+    for name in failed:
+        print(f"Warning: could not read {name}")
+    print()
+
+def analyze_coverage():
+    print("\n"+("*"*5)+" Analyze reclist coverage "+("*"*5))
+
+    reclist_path = input("Enter the path to the reclist file: ").strip()
+    if not os.path.isfile(reclist_path):
+        print("The specified reclist file does not exist.")
+        return
+
+    while True:
+        style = input(f"Reclist style {STYLES}: ").strip().upper() or "VCV"
+        if style in STYLES:
+            break
+        print(f"Invalid style. Please choose from {STYLES}.")
+
+    lines = read_reclist(reclist_path)
+    report = analyze_reclist(lines, load_kana_map(), style)
+    print(report.summary())
+    if report.missing:
+        print("Missing: " + ", ".join(report.missing))
+    for i in report.redundant_lines + report.duplicate_lines:
+        print(f"Redundant: {lines[i]}")
+    print()
+
+def generate_reclist_file():
+    print("\n"+("*"*5)+" Generate reclist "+("*"*5))
+
+    while True:
+        style = input(f"Reclist style {STYLES}: ").strip().upper() or "VCV"
+        if style in STYLES:
+            break
+        print(f"Invalid style. Please choose from {STYLES}.")
+
+    output_path = input(f"Output file (default reclist_{style.lower()}.txt): ").strip() or f"reclist_{style.lower()}.txt"
+    lines, missing = generate_reclist(load_kana_map(), style)
+    write_reclist(output_path, lines)
+    print(f"Wrote {len(lines)} lines to: {output_path}")
+    if missing:
+        print("Could not cover: " + ", ".join(missing))
+    print()
+
+def workspace_overview():
+    print("\n"+("*"*5)+" Workspace overview "+("*"*5))
+
+    workspace_path = input("Enter the path to the workspace folder: ").strip()
+    if not os.path.isdir(workspace_path):
+        print("The specified folder does not exist.")
+        return
+
+    catalog = WorkspaceCatalog(os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", CATALOG_FILENAME))
+    try:
+        n_banks, rescanned = catalog.scan(workspace_path)
+        query = input("Search (leave empty to list all banks): ").strip()
+        for bank in catalog.banks(workspace_path, query):
+            print(f"{bank.name} [{bank.pitches}] by {bank.author or '-'}: {bank.sample_count} samples, {bank.duration / 60:.1f} min, {bank.status}")
+    finally:
+        catalog.close()
+    print(f"{n_banks} banks, {rescanned} folders rescanned\n")
+
+def install_voicebank_zip():
+    print("\n"+("*"*5)+" Install voicebank zip "+("*"*5))
+
+    zip_path = input("Enter the path to the voicebank zip: ").strip()
+    if not os.path.isfile(zip_path):
+        print("The specified file does not exist.")
+        return
+    dest_root = input("Enter the folder to install into: ").strip()
+    if not os.path.isdir(dest_root):
+        print("The specified folder does not exist.")
+        return
+
+    def progress(done, total):
+        print(f"\rExtracting {done}/{total}", end="", flush=True)
+
+    result = install_voicebank(zip_path, dest_root, progress=progress)
+    print()
+    if result["has_character"]:
+        register_bank(os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", CATALOG_FILENAME), dest_root, result["bank_path"])
+    print(f"Installed {result['files']} files to {result['bank_path']} (filenames: {result['encoding']})")
+    for name in result["failed"]:
+        print(f"Failed: {name}")
+    for name in result["skipped"]:
+        print(f"Skipped unsafe path: {name}")
+    print(f"Samples folder: {result['samples_path']}\n")
+
+def quality_report():
+    print("\n"+("*"*5)+" Sample quality report "+("*"*5))
+
+    while True:
+        samples_dir = input("Enter the voicebank samples directory: ").strip()
+        if os.path.isdir(samples_dir):
+            break
+        else:
+            print("The specified directory does not exist. Please try again.")
+    output_path = input("Output JSON file (leave empty to print): ").strip()
+
+    def progress(done, total):
+        print(f"\rChecking samples... {done}/{total}", end="", flush=True, file=sys.stderr)
+
+    scanned, report = scan_bank_quality(samples_dir, progress=progress)
+    print(file=sys.stderr)
+    flagged = [entry for entry in report if entry["issues"]]
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"Wrote report for {len(report)} samples to: {output_path}")
+    else:
+        print(json.dumps(report, indent=4, ensure_ascii=False))
+    print(f"{len(flagged)} of {len(report)} samples have issues, {scanned} checked since the last scan.\n")
+
 def package_vb_folder():
     print("\n"+("*"*5)+" Package voicebank folder "+("*"*5))
 
@@ -173,9 +351,12 @@ def package_vb_folder():
         else:
             print("The specified directory does not exist. Please try again.")
     
-    output_zip = f"{vb_folder}.zip"
-    shutil.make_archive(vb_folder, 'zip', vb_folder)
-    print(f"Voicebank folder packaged into: {output_zip}\n")
+    def progress(done, total):
+        print(f"\rPackaging... {done}/{total}", end="", flush=True)
+
+    vb_folder = vb_folder.rstrip("/\\")
+    output_zip = zip_voicebank(vb_folder, f"{vb_folder}.zip", progress=progress)
+    print(f"\nVoicebank folder packaged into: {output_zip}\n")
 
 
 def main():
@@ -202,9 +383,21 @@ def main():
             elif userinput == "3":
                 record_from_reclist()
             elif userinput == "4":
-                print("Configure oto.ini automatically - Feature not implemented yet.")
+                configure_oto()
             elif userinput == "5":
                 package_vb_folder()
+            elif userinput == "6":
+                generate_frq_files()
+            elif userinput == "7":
+                analyze_coverage()
+            elif userinput == "8":
+                generate_reclist_file()
+            elif userinput == "9":
+                workspace_overview()
+            elif userinput == "10":
+                install_voicebank_zip()
+            elif userinput == "11":
+                quality_report()
             else:
                 print("Please enter a valid option.")
 
@@ -21,12 +21,19 @@ from PyQt6.QtWidgets import (
     QDialogButtonBox,
     QSizePolicy,
     QProgressBar,
-    QAbstractItemView
+    QAbstractItemView,
+    QListWidget,
+    QListWidgetItem,
+    QSpinBox,
+    QDoubleSpinBox,
+    QCheckBox,
+    QProgressDialog
 )
 from PyQt6.QtCore import Qt, QSize, pyqtSignal
 from PyQt6.QtGui import QPixmap, QIcon, QAction
 from pathlib import Path
 import shutil
+import copy
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtWidgets, QtCore
 import numpy as np
@@ -34,8 +41,35 @@ import pyaudio
 import webbrowser
 import wave
 import queue
-import json
-import csv
+import threading
+from session_journal import SessionJournal
+from take_store import TakeStore
+from take_finalizer import TakeFinalizer
+from vad import VoiceActivityDetector, VAD_START, VAD_STOP
+from metrics import METRICS, timed
+from memstats import MEMORY, MB, nbytes, trim_lru
+from playback import PlaybackEngine
+from devices import DeviceManager
+from preroll import PreRollBuffer
+from spectrogram import IncrementalSTFT, SpectrogramTileCache, HOP, FLOOR_DB, CEIL_DB
+from oto import OtoIni, OTO_FILENAME, PARAM_NAMES
+from waveform_tiles import WaveformTileCache
+from edl import SampleEdit, load_edits, sample_edit, read_edited_mono
+from collections import OrderedDict
+from kana import load_kana_map
+from vcv_segment import generate_oto
+from dtw_align import align_oto, MIN_CONFIDENCE
+from frq import generate_frq
+from fingerprint import FingerprintIndex
+from bank_qa import scan_bank_quality
+from reclist_coverage import analyze_reclist, read_reclist, STYLES
+from reclist_gen import generate_reclist, write_reclist
+from workspace_catalog import WorkspaceCatalog, CATALOG_FILENAME, scan_workspace, register_bank
+from workers import run_task
+from packaging import zip_voicebank
+from installer import install_voicebank
+from settings import Settings
+from cover import make_cover, make_covers, cover_filename, COVER_CACHE_DIRNAME, COVER_EXTENSIONS
 
 # Define Constants
 WINDOW_MINWIDTH, WINDOW_MINHEIGHT = 640, 480
@@ -43,35 +77,15 @@ WINDOW_MAXWIDTH, WINDOW_MAXHEIGHT = 960, 720
 VERSION_NUMBER = "0.1.0 Alpha"
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 HIR_ROMAJ_PATH = "hiragana-romaji.csv"
+COVER_CACHE_DIR = os.path.join(SCRIPT_DIR, "config", COVER_CACHE_DIRNAME)
 
 # Load hiragana to romaji csv file
-with open(HIR_ROMAJ_PATH, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        HIRAGANA_ROMAJI_MAP =  {row['hiragana']: row['romaji'] for row in reader}
+HIRAGANA_ROMAJI_MAP = load_kana_map(HIR_ROMAJ_PATH)
 
 # Load Settings JSON
 settings_path = os.path.join(SCRIPT_DIR, "config", "settings.json")
-default_settings = {
-    "default_reclist_path":"",
-    "default_guidebgm_path":"",
-    "default_vb_pitch":"A4",
-}
-
-default_reclist_path = ""
-default_guidebgm_path = ""
-default_vb_pitch = "A4"
-
-if os.path.exists(settings_path):
-    with open(settings_path, "r") as f:
-        d = json.load(f)
-        if d["default_reclist_path"] or d["default_guidebgm_path"] or d["default_vb_pitch"]:
-            default_reclist_path = d["default_reclist_path"]
-            default_guidebgm_path = d["default_guidebgm_path"]
-            default_vb_pitch = d["default_vb_pitch"]
-else:
-    os.makedirs(os.path.dirname(settings_path), exist_ok=True)
-    with open(settings_path, "w") as f:
-        json.dump(default_settings, f, indent=4)
+SETTINGS = Settings(settings_path)
+SETTINGS.load()
 
 class VoicebankInfo:
     def __init__(self, name="", folder_path="", samples_path="", author="", voice="", pitch="A4", version="1.0", website="", cover_path=""):
@@ -124,7 +138,8 @@ class CreateBaseFolderWidget(QWidget):
         self.voicebank_pitch_input = QComboBox()
         pitches = [f"{note}{octave}" for octave in range(2, 6) for note in ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']]
         self.voicebank_pitch_input.addItems(pitches)
-        self.voicebank_pitch_input.setCurrentText(default_vb_pitch)
+        self.voicebank_pitch_input.setCurrentText(SETTINGS.get("default_vb_pitch"))
+        SETTINGS.subscribe("default_vb_pitch", self.voicebank_pitch_input.setCurrentText)
         content_layout.addRow("Voicebank Pitch:", self.voicebank_pitch_input)
 
         self.voicebank_cover_path_btn = QPushButton("Select Cover Image (optional)...")
@@ -132,9 +147,9 @@ class CreateBaseFolderWidget(QWidget):
         self.voicebank_cover_path_btn.setFixedWidth(300)
         content_layout.addRow("Voicebank Cover Image:", self.voicebank_cover_path_btn)
 
-        create_button = QPushButton("Create Base Folder")
-        create_button.clicked.connect(self.create_base_folder)
-        button_box.addWidget(create_button)
+        self.create_button = QPushButton("Create Base Folder")
+        self.create_button.clicked.connect(self.create_base_folder)
+        button_box.addWidget(self.create_button)
 
         self.setLayout(base_folder_layout)
     
@@ -146,15 +161,32 @@ class CreateBaseFolderWidget(QWidget):
             self.vbinfo.folder_path = self.voicebank_folder_path
 
     def select_cover_image(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Cover Image", os.path.expanduser("~"), "Cover Images (*.bmp *.jpg)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Cover Image", os.path.expanduser("~"), "Cover Images (*.bmp *.jpg *.jpeg *.png)")
         self.cover_image_path = file_path
 
         if not self.cover_image_path:
             self.error_dialog("No image selected. Please select a valid image file.")
-        elif not self.cover_image_path.lower().endswith(('.bmp', '.jpg')):
-            self.error_dialog("Invalid image format. Please select a BMP or JPG image file.")
+        elif not self.cover_image_path.lower().endswith(COVER_EXTENSIONS):
+            self.error_dialog("Invalid image format. Please select a BMP, JPG or PNG image file.")
         else:
             self.vbinfo.cover_path = self.cover_image_path
+            # Converted in the background, creating the folder then only copies the cached icon
+            run_task(make_cover, self.cover_image_path, COVER_CACHE_DIR,
+                     on_result=lambda icon_path: self.cover_ready(file_path, icon_path),
+                     on_error=lambda message: self.cover_failed(file_path, message))
+
+    def cover_ready(self, file_path, icon_path):
+        if file_path != self.vbinfo.cover_path:
+            return
+        self.voicebank_cover_path_btn.setIcon(QIcon(icon_path))
+        self.voicebank_cover_path_btn.setIconSize(QSize(32, 32))
+        self.voicebank_cover_path_btn.setText(os.path.basename(file_path))
+
+    def cover_failed(self, file_path, message):
+        if file_path != self.vbinfo.cover_path:
+            return
+        self.vbinfo.cover_path = ""
+        self.error_dialog(f"Could not convert cover image: {message}")
         
     def create_base_folder(self):
         self.vbinfo.name = self.voicebank_name_input.text().strip()
@@ -170,34 +202,42 @@ class CreateBaseFolderWidget(QWidget):
             self.error_dialog("Voicebank folder path is not set. Please select a valid folder path.")
             return
         
-        try:
-            self.vbinfo.folder_path = os.path.join(self.voicebank_folder_path, self.vbinfo.name)
-            os.makedirs(self.vbinfo.folder_path, exist_ok=True)
-            samples_folder_path = os.path.join(self.vbinfo.folder_path, self.vbinfo.pitch)
-            os.makedirs(samples_folder_path, exist_ok=True)
-
-            character_txt_path = os.path.join(self.vbinfo.folder_path, "character.txt")
-            with open(character_txt_path, "w", encoding="utf-8") as f:
-                f.write(f"name: {self.vbinfo.name}\n")
-                f.write(f"author: {self.vbinfo.author}\n")
-                f.write(f"voice: {self.vbinfo.voice}\n")
-                f.write(f"version: {self.vbinfo.version}\n")
-                if self.vbinfo.cover_path:
-                    f.write(f"cover: {os.path.basename(self.vbinfo.cover_path)}\n")
-                    cover_dest_path = os.path.join(self.vbinfo.folder_path, os.path.basename(self.vbinfo.cover_path))
-                    shutil.copy2(self.vbinfo.cover_path, cover_dest_path)
-
-            self.voicebank_name_input.clear()
-            self.voicebank_author_input.clear()
-            self.voicebank_voice_input.clear()
-            self.voicebank_version_input.clear()
-            self.voicebank_pitch_input.setCurrentText("A4")
-            self.vbinfo.cover_path = ""
-
-            self.back_to_main_menu.emit()
-            self.info_dialog(f"Successfully created voicebank folder at {self.voicebank_folder_path}")
-        except Exception as e:
-            self.error_dialog(f"Error creating base voicebank folder: {str(e)}")
+        self.vbinfo.folder_path = os.path.join(self.voicebank_folder_path, self.vbinfo.name)
+        self.create_button.setEnabled(False)
+        run_task(self.write_base_folder, copy.copy(self.vbinfo),
+                 on_result=self.base_folder_created,
+                 on_error=lambda message: self.error_dialog(f"Error creating base voicebank folder: {message}"),
+                 on_finished=lambda: self.create_button.setEnabled(True))
+
+    def write_base_folder(self, vbinfo):
+        os.makedirs(vbinfo.folder_path, exist_ok=True)
+        samples_folder_path = os.path.join(vbinfo.folder_path, vbinfo.pitch)
+        os.makedirs(samples_folder_path, exist_ok=True)
+
+        character_txt_path = os.path.join(vbinfo.folder_path, "character.txt")
+        with open(character_txt_path, "w", encoding="utf-8") as f:
+            f.write(f"name: {vbinfo.name}\n")
+            f.write(f"author: {vbinfo.author}\n")
+            f.write(f"voice: {vbinfo.voice}\n")
+            f.write(f"version: {vbinfo.version}\n")
+            if vbinfo.cover_path:
+                f.write(f"cover: {cover_filename(vbinfo.cover_path)}\n")
+                icon_path = make_cover(vbinfo.cover_path, COVER_CACHE_DIR)
+                shutil.copyfile(icon_path, os.path.join(vbinfo.folder_path, cover_filename(vbinfo.cover_path)))
+        return vbinfo.folder_path
+
+    def base_folder_created(self, folder_path):
+        self.voicebank_name_input.clear()
+        self.voicebank_author_input.clear()
+        self.voicebank_voice_input.clear()
+        self.voicebank_version_input.clear()
+        self.voicebank_pitch_input.setCurrentText(SETTINGS.get("default_vb_pitch"))
+        self.vbinfo.cover_path = ""
+        self.voicebank_cover_path_btn.setIcon(QIcon())
+        self.voicebank_cover_path_btn.setText("Select Cover Image (optional)...")
+
+        self.back_to_main_menu.emit()
+        self.info_dialog(f"Successfully created voicebank folder at {os.path.dirname(folder_path)}")
 
     def error_dialog(self, message):
         dlg = QMessageBox(self)
@@ -219,6 +259,8 @@ class CreateBaseFolderWidget(QWidget):
 
 class RecordWidget(QWidget):
     back_to_main_menu = pyqtSignal()
+    handsfree_take_started = pyqtSignal()
+    handsfree_take_captured = pyqtSignal(bytes)
 
     CHUNK = 1024
     FORMAT = pyaudio.paInt16
@@ -232,12 +274,58 @@ class RecordWidget(QWidget):
         self.current_loaded_reclist = []
         self.guidebgm_path = ""
         self.currently_recording = False
+        self.current_reclist_path = ""
+        self.journal = None
+        self.take_store = None
+        self.load_generation = 0
+        self.reclist_generation = 0
+        self.check_task = None
+        self.quality_task = None
+        self.take_levels = {}
+        self.vad = None
 
         self.p = pyaudio.PyAudio()
         self.stream = None
         self.data_queue = queue.Queue()
         self.frames = []
         self.plot_data = np.array([])
+        # While armed the input stream stays open and fills the pre-roll ring
+        # between takes; capture_lock hands the callback over to self.frames
+        self.capturing = False
+        self.capture_lock = threading.Lock()
+        self.pre_roll = PreRollBuffer(self.RATE, SETTINGS.get("pre_roll_ms"), self.CHANNELS)
+        self.devices = DeviceManager(self.p, busy=lambda: self.currently_recording or self.vad is not None or self.playback.is_playing())
+        self.playback = PlaybackEngine(self.p, rate=self.RATE, channels=self.CHANNELS,
+                                       device_index=self.device_index("output_device", False))
+        self.devices.about_to_rescan.connect(self.devices_rescanning)
+        self.devices.reinitialized.connect(self.audio_reinitialized)
+        SETTINGS.subscribe("armed_input", lambda armed: self.arm_input() if armed else self.disarm_input())
+        SETTINGS.subscribe("pre_roll_ms", lambda pre_roll_ms: self.rearm_input())
+        SETTINGS.subscribe("input_device", lambda key: self.rearm_input())
+        SETTINGS.subscribe("output_device", lambda key: self.update_output_device())
+        SETTINGS.subscribe("device_formats", lambda formats: self.update_output_device())
+        self.finalizer = TakeFinalizer(self.CHANNELS, self.p.get_sample_size(self.FORMAT), self.RATE)
+        self.finalizer.finalized.connect(self.take_finalized)
+        self.finalizer.failed.connect(self.take_failed)
+
+        self.loaded_audio = None
+        self.play_region = None
+        self.playhead = None
+        self.live_stft = IncrementalSTFT(max_frames=int(6 * self.RATE / HOP))
+        self.spectrogram_tiles = SpectrogramTileCache()
+        self.spectrogram_lut = pg.colormap.get("viridis").getLookupTable(nPts=256)
+        self.spectrogram_image = None
+
+        MEMORY.register("record.frames", lambda: nbytes(self.frames))
+        MEMORY.register("record.capture_queue", lambda: self.data_queue.qsize() * self.CHUNK * 2)
+        MEMORY.register("record.vad_take", lambda: nbytes(self.vad.take) if self.vad else 0)
+        MEMORY.register("record.pre_roll", lambda: self.pre_roll.nbytes())
+        MEMORY.register("record.plot_data", lambda: self.plot_data.nbytes, 32 * MB, self.trim_plot_data)
+        MEMORY.register("record.loaded_audio", lambda: nbytes(self.loaded_audio))
+        MEMORY.register("record.live_stft", self.live_stft.nbytes)
+        MEMORY.register("record.spectrogram_tiles", self.spectrogram_tiles.nbytes, 64 * MB, self.spectrogram_tiles.trim)
+        MEMORY.register("record.take_cache", lambda: self.take_store.nbytes() if self.take_store else 0, 64 * MB,
+                        lambda max_bytes: self.take_store and self.take_store.trim(max_bytes))
 
         record_layout = QVBoxLayout()
         main_layout = QGridLayout()
@@ -269,6 +357,23 @@ class RecordWidget(QWidget):
         import_guidebgm_btn.clicked.connect(self.open_guidebgm_dialog)
         toolbar_layout.addWidget(import_guidebgm_btn)
 
+        check_takes_btn = QPushButton("Check Takes...")
+        check_takes_btn.clicked.connect(self.check_takes)
+        toolbar_layout.addWidget(check_takes_btn)
+
+        check_quality_btn = QPushButton("Check Quality...")
+        check_quality_btn.setToolTip("Scan the samples for clipping, DC offset, noise and format problems")
+        check_quality_btn.clicked.connect(self.check_quality)
+        toolbar_layout.addWidget(check_quality_btn)
+
+        self.handsfree_btn = QPushButton("Hands-free")
+        self.handsfree_btn.setCheckable(True)
+        self.handsfree_btn.setToolTip("Start and stop takes by voice and move on to the next unrecorded line")
+        self.handsfree_btn.toggled.connect(self.handsfree_toggled)
+        toolbar_layout.addWidget(self.handsfree_btn)
+        self.handsfree_take_started.connect(self.handsfree_started)
+        self.handsfree_take_captured.connect(self.handsfree_captured)
+
         self.current_reclist_line = QLabel("N/A")
         self.current_reclist_line.setAlignment(Qt.AlignmentFlag.AlignLeft)
         self.current_reclist_line.setStyleSheet("font-size: 30px; padding: 10px;")
@@ -297,6 +402,24 @@ class RecordWidget(QWidget):
         self.audio_visualizer.getViewBox().setMouseEnabled(x=False, y=False)
         main_layout.addWidget(self.audio_visualizer, 4, 1)
 
+        take_layout = QHBoxLayout()
+        take_layout.addWidget(QLabel("View:"))
+        self.view_mode_select = QComboBox()
+        self.view_mode_select.addItems(["Waveform", "Spectrogram"])
+        self.view_mode_select.currentIndexChanged.connect(self.view_mode_changed)
+        take_layout.addWidget(self.view_mode_select)
+        edit_sample_btn = QPushButton("Edit sample...")
+        edit_sample_btn.setToolTip("Trim, gain and fades, kept as edits and applied when packaging")
+        edit_sample_btn.clicked.connect(self.show_sample_edit_dialog)
+        take_layout.addWidget(edit_sample_btn)
+        take_layout.addStretch(1)
+        take_layout.addWidget(QLabel("Take:"))
+        self.take_select = QComboBox()
+        self.take_select.setMinimumWidth(200)
+        self.take_select.currentIndexChanged.connect(self.take_selected)
+        take_layout.addWidget(self.take_select)
+        main_layout.addLayout(take_layout, 5, 1)
+
         button_control_layout.addStretch(1)
 
         previous_line_btn = QPushButton()
@@ -320,25 +443,46 @@ class RecordWidget(QWidget):
         next_line_btn.clicked.connect(self.next_line_btn)
         button_control_layout.addWidget(next_line_btn)
 
+        self.play_btn = QPushButton()
+        self.play_btn.setIcon(QIcon("assets/ui/play.svg"))
+        self.play_btn.setIconSize(QSize(40,40))
+        self.play_btn.setFixedSize(50,50)
+        self.play_btn.clicked.connect(self.play_toggle)
+        button_control_layout.addWidget(self.play_btn)
+
         button_control_layout.addStretch(1)
 
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update_graph)
         self.timer.setInterval(25) 
 
+        self.playhead_timer = QtCore.QTimer()
+        self.playhead_timer.timeout.connect(self.update_playhead)
+        self.playhead_timer.setInterval(25)
+
         self.setLayout(record_layout)
 
+    @timed("record.update_phoneme_table")
     def update_phoneme_table(self):
         self.reclist_list.setRowCount(len(self.current_loaded_reclist))
         for row, (phoneme, recorded) in enumerate(self.current_loaded_reclist):
             recorded_item = QTableWidgetItem(recorded)
             phoneme_item = QTableWidgetItem(phoneme)
             recorded_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            if phoneme in self.take_levels:
+                recorded_item.setToolTip(self.take_levels[phoneme])
             self.reclist_list.setItem(row, 0, recorded_item)
             self.reclist_list.setItem(row, 1, phoneme_item)
     
     def load_default_reclist_dialog(self):
-        if self.current_loaded_reclist or default_reclist_path == "":
+        if self.current_loaded_reclist:
+            return
+        last_session_path = SETTINGS.get("last_session_path")
+        if last_session_path and SessionJournal.exists(last_session_path):
+            if self.question_dialog("Resume last session", "Would you like to resume your last recording session?"):
+                self.resume_session(last_session_path)
+                return
+        if not SETTINGS.get("default_reclist_path"):
             return
 
         dlg = QMessageBox(self)
@@ -348,13 +492,14 @@ class RecordWidget(QWidget):
         dlg.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
 
         if dlg.exec() == QMessageBox.StandardButton.Yes:
-            self.load_reclist(default_reclist_path)
+            self.load_reclist(SETTINGS.get("default_reclist_path"))
 
     def open_guidebgm_dialog(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Import Guide BGM", os.path.expanduser("~"), "WAV Files (*.wav)")
         if file_path:
             self.guidebgm_path = file_path
 
+    @timed("record.update_graph")
     def update_graph(self):
         new_data_chunks = []
         while not self.data_queue.empty():
@@ -368,6 +513,15 @@ class RecordWidget(QWidget):
 
         data_buffer = b''.join(new_data_chunks)
         chunk_data = np.frombuffer(data_buffer, dtype=np.int16)
+        if self.spectrogram_mode():
+            if self.live_stft.feed(chunk_data):
+                image = self.live_stft.image()
+                x0 = self.live_stft.first_frame() * HOP
+                self.spectrogram_image.setImage(image, autoLevels=False)
+                self.spectrogram_image.setRect(QtCore.QRectF(x0, 0, len(image) * HOP, self.RATE / 2))
+                self.audio_visualizer.setXRange(x0, x0 + self.live_stft.max_frames * HOP, padding=0)
+            return
+
         self.plot_data = np.concatenate((self.plot_data, chunk_data))
         self.curve.setData(self.plot_data)
         
@@ -376,36 +530,258 @@ class RecordWidget(QWidget):
             if max_val > 0:
                 self.audio_visualizer.setYRange(-max_val * 1.05, max_val * 1.05)
 
+    def trim_plot_data(self, max_bytes):
+        # Only the live plot reads this, so a long take keeps its most recent part
+        self.plot_data = self.plot_data[-max(1, max_bytes // max(self.plot_data.itemsize, 1)):]
+        if self.currently_recording and not self.spectrogram_mode():
+            self.curve.setData(self.plot_data)
+
+    @timed("record.check_and_load_wav")
     def check_and_load_wav(self, phoneme):
         if not self.vbinfo.samples_path:
             return False
 
         wav_path = os.path.join(self.vbinfo.samples_path, f"{phoneme}.wav")
         if not os.path.exists(wav_path):
-            self.audio_visualizer.clear()
-            self.audio_visualizer.setTitle("Audio Visualizer - **File Not Found**", color="#cc0000", size="10pt")
+            self.clear_loaded_audio()
+            if self.finalizer.is_pending(self.vbinfo.samples_path, phoneme):
+                self.audio_visualizer.setTitle("Audio Visualizer - Saving...", color="#000000", size="10pt")
+            else:
+                self.audio_visualizer.setTitle("Audio Visualizer - **File Not Found**", color="#cc0000", size="10pt")
             return False
 
-        try:
+        # Decoding happens in the background; a newer selection makes older loads stale
+        self.load_generation += 1
+        generation = self.load_generation
+        run_task(self.read_sample_audio, self.get_take_store(), phoneme, wav_path, self.spectrogram_mode(),
+                 on_result=lambda result: self.sample_audio_loaded(generation, phoneme, result),
+                 on_error=lambda message: self.sample_audio_failed(generation))
+        return True
+
+    @timed("record.read_sample_audio")
+    def read_sample_audio(self, store, phoneme, wav_path, spectrogram):
+        active_take = store.active_take(phoneme)
+        if active_take:
+            audio_array = store.load_take(active_take)
+            cache_key = active_take
+        else:
             with wave.open(wav_path, 'rb') as wf:
                 n_frames = wf.getnframes()
                 audio_data = wf.readframes(n_frames)
                 audio_array = np.frombuffer(audio_data, dtype=np.int16)
-                
-                self.audio_visualizer.clear()
-                self.curve = self.audio_visualizer.plot(pen=pg.mkPen(color='b', width=1))
-                self.curve.setData(audio_array)
-                
-                max_val = np.amax(np.abs(audio_array))
-                if max_val > 0:
-                    self.audio_visualizer.setYRange(-max_val * 1.05, max_val * 1.05)
-                self.audio_visualizer.setXRange(0, len(audio_array))
-                self.audio_visualizer.setTitle(f"Audio Visualizer - Loaded: **{phoneme}.wav**", color="#000000", size="10pt")
-                return True
-        except Exception as e:
-            self.audio_visualizer.clear()
-            self.audio_visualizer.setTitle("Audio Visualizer - **Error Loading File**", color="#cc0000", size="10pt")
-            return False
+            cache_key = f"{wav_path}:{os.path.getmtime(wav_path)}"
+        audio_array, cache_key = self.apply_sample_edit(store, phoneme, audio_array, cache_key)
+        if spectrogram:
+            # Fill the tile cache here so show_audio only has to stitch tiles
+            self.spectrogram_tiles.spectrogram(cache_key, audio_array)
+        return audio_array, cache_key
+
+    def apply_sample_edit(self, store, phoneme, audio_array, cache_key):
+        edit = load_edits(store.samples_path).get(f"{phoneme}.wav")
+        if edit is None:
+            return audio_array, cache_key
+        return edit.apply(audio_array, self.RATE), f"{cache_key}:edit:{edit.mtime}"
+
+    def show_sample_edit_dialog(self):
+        if self.currently_recording or self.loaded_audio is None or not self.current_phoneme:
+            return
+        filename = f"{self.current_phoneme}.wav"
+        edits = load_edits(self.vbinfo.samples_path)
+        edit = edits.get(filename) or SampleEdit()
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle(f"Edit {filename}")
+        dlg_layout = QVBoxLayout()
+        form_layout = QFormLayout()
+        inputs = {}
+        for name, label, value, maximum, suffix in (("trim_start", "Trim start:", edit.trim_start * 1000, 600000, " ms"),
+                                                     ("trim_end", "Trim end:", edit.trim_end * 1000, 600000, " ms"),
+                                                     ("gain_db", "Gain:", edit.gain_db, 24, " dB"),
+                                                     ("fade_in", "Fade in:", edit.fade_in * 1000, 10000, " ms"),
+                                                     ("fade_out", "Fade out:", edit.fade_out * 1000, 10000, " ms")):
+            spin = QDoubleSpinBox()
+            spin.setRange(-40 if name == "gain_db" else 0, maximum)
+            spin.setDecimals(1)
+            spin.setSingleStep(0.5 if name == "gain_db" else 10)
+            spin.setSuffix(suffix)
+            spin.setValue(value)
+            form_layout.addRow(label, spin)
+            inputs[name] = spin
+
+        def trim_to_selection():
+            # The loaded audio is already trimmed, so the selection adds to the current trim
+            start, end = self.play_region.getRegion()
+            inputs["trim_start"].setValue(edit.trim_start * 1000 + start * 1000 / self.RATE)
+            inputs["trim_end"].setValue(edit.trim_end * 1000 + (len(self.loaded_audio) - end) * 1000 / self.RATE)
+
+        selection_btn = QPushButton("Trim to selection")
+        selection_btn.clicked.connect(trim_to_selection)
+        form_layout.addRow(selection_btn)
+        dlg_layout.addLayout(form_layout)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel | QDialogButtonBox.StandardButton.Reset)
+        button_box.accepted.connect(dlg.accept)
+        button_box.rejected.connect(dlg.reject)
+        button_box.button(QDialogButtonBox.StandardButton.Reset).clicked.connect(lambda: dlg.done(2))
+        dlg_layout.addWidget(button_box)
+        dlg.setLayout(dlg_layout)
+
+        result = dlg.exec()
+        if not result:
+            return
+        try:
+            if result == 2:
+                edits.remove(filename)
+            else:
+                edits.set(filename, SampleEdit(inputs["trim_start"].value() / 1000, inputs["trim_end"].value() / 1000,
+                                               inputs["gain_db"].value(), inputs["fade_in"].value() / 1000,
+                                               inputs["fade_out"].value() / 1000))
+        except OSError as e:
+            self.error_dialog(f"Could not save sample edits: {str(e)}")
+            return
+        self.check_and_load_wav(self.current_phoneme)
+
+    def sample_audio_loaded(self, generation, phoneme, result):
+        if generation != self.load_generation or self.currently_recording:
+            return
+        audio_array, cache_key = result
+        self.show_audio(audio_array, f"{phoneme}.wav", cache_key)
+
+    def sample_audio_failed(self, generation):
+        if generation != self.load_generation or self.currently_recording:
+            return
+        self.clear_loaded_audio()
+        self.audio_visualizer.setTitle("Audio Visualizer - **Error Loading File**", color="#cc0000", size="10pt")
+
+    def spectrogram_mode(self):
+        return self.view_mode_select.currentText() == "Spectrogram"
+
+    def view_mode_changed(self):
+        if self.spectrogram_mode():
+            self.audio_visualizer.setLabel('left', 'Frequency', units='Hz', color='#000000', size='14pt')
+        else:
+            self.audio_visualizer.setLabel('left', 'Amplitude', color='#000000', size='14pt')
+        if not self.currently_recording and self.current_phoneme:
+            self.check_and_load_wav(self.current_phoneme)
+
+    def add_spectrogram_image(self):
+        self.spectrogram_image = pg.ImageItem()
+        self.spectrogram_image.setLookupTable(self.spectrogram_lut)
+        self.spectrogram_image.setLevels((FLOOR_DB, CEIL_DB))
+        self.audio_visualizer.addItem(self.spectrogram_image)
+        self.audio_visualizer.setYRange(0, self.RATE / 2, padding=0)
+
+    def show_audio(self, audio_array, title, cache_key=None):
+        self.clear_loaded_audio()
+        if self.spectrogram_mode():
+            self.add_spectrogram_image()
+            image = self.spectrogram_tiles.spectrogram(cache_key, audio_array)
+            self.spectrogram_image.setImage(image, autoLevels=False)
+            self.spectrogram_image.setRect(QtCore.QRectF(0, 0, len(image) * HOP, self.RATE / 2))
+        else:
+            self.curve = self.audio_visualizer.plot(pen=pg.mkPen(color='b', width=1))
+            self.curve.setData(audio_array)
+
+            max_val = np.amax(np.abs(audio_array)) if len(audio_array) else 0
+            if max_val > 0:
+                self.audio_visualizer.setYRange(-max_val * 1.05, max_val * 1.05)
+        self.audio_visualizer.setXRange(0, len(audio_array))
+        self.audio_visualizer.setTitle(f"Audio Visualizer - Loaded: **{title}**", color="#000000", size="10pt")
+
+        self.loaded_audio = audio_array
+        self.playback.load(audio_array)
+        self.play_region = pg.LinearRegionItem(values=(0, len(audio_array)), bounds=(0, len(audio_array)), brush=pg.mkBrush(0, 0, 255, 20))
+        self.audio_visualizer.addItem(self.play_region)
+        self.playhead = pg.InfiniteLine(pos=0, angle=90, pen=pg.mkPen(color='r', width=1))
+        self.playhead.hide()
+        self.audio_visualizer.addItem(self.playhead)
+        try:
+            self.playback.open()
+        except OSError:
+            pass
+
+    def clear_loaded_audio(self):
+        self.stop_playback()
+        self.loaded_audio = None
+        self.play_region = None
+        self.playhead = None
+        self.spectrogram_image = None
+        self.audio_visualizer.clear()
+
+    def play_toggle(self):
+        if self.currently_recording or self.loaded_audio is None:
+            return
+        if self.playback.is_playing():
+            self.stop_playback()
+            return
+
+        start, end = self.play_region.getRegion()
+        try:
+            self.playback.play(start, end)
+        except OSError as e:
+            self.error_dialog(f"Could not open audio output: {str(e)}")
+            return
+        self.play_btn.setIcon(QIcon("assets/ui/stop.svg"))
+        self.playhead.setPos(start)
+        self.playhead.show()
+        self.playhead_timer.start()
+
+    def stop_playback(self):
+        self.playback.stop()
+        self.playhead_timer.stop()
+        self.play_btn.setIcon(QIcon("assets/ui/play.svg"))
+        if self.playhead is not None:
+            self.playhead.hide()
+
+    def update_playhead(self):
+        if not self.playback.is_playing():
+            self.stop_playback()
+            return
+        self.playhead.setPos(self.playback.position())
+
+    def get_take_store(self):
+        if self.take_store is None or self.take_store.samples_path != self.vbinfo.samples_path:
+            self.take_store = TakeStore(self.vbinfo.samples_path)
+        return self.take_store
+
+    def update_take_select(self):
+        self.take_select.blockSignals(True)
+        self.take_select.clear()
+        if self.vbinfo.samples_path and self.current_phoneme:
+            store = self.get_take_store()
+            active_take = store.active_take(self.current_phoneme)
+            for number, digest in enumerate(store.takes(self.current_phoneme), start=1):
+                self.take_select.addItem(f"Take {number} ({digest[:8]})", digest)
+                if digest == active_take:
+                    self.take_select.setCurrentIndex(number - 1)
+        self.take_select.setEnabled(self.take_select.count() > 1)
+        self.take_select.blockSignals(False)
+
+    def take_selected(self, index):
+        digest = self.take_select.itemData(index)
+        if self.currently_recording or not digest:
+            return
+        store = self.get_take_store()
+        try:
+            store.set_active(self.current_phoneme, digest)
+        except (OSError, KeyError) as e:
+            self.error_dialog(f"Could not switch take: {str(e)}")
+            return
+        self.load_generation += 1
+        generation = self.load_generation
+        title = f"{self.current_phoneme}.wav (take {index + 1})"
+        run_task(self.read_take_audio, store, self.current_phoneme, digest,
+                 on_result=lambda result: self.take_audio_loaded(generation, title, result),
+                 on_error=lambda message: self.error_dialog(f"Could not switch take: {message}"))
+
+    def read_take_audio(self, store, phoneme, digest):
+        return self.apply_sample_edit(store, phoneme, store.load_take(digest), digest)
+
+    def take_audio_loaded(self, generation, title, result):
+        if generation != self.load_generation or self.currently_recording:
+            return
+        audio_array, cache_key = result
+        self.show_audio(audio_array, title, cache_key)
 
     def record_toggle(self):
         if not self.vbinfo.samples_path:
@@ -414,6 +790,12 @@ class RecordWidget(QWidget):
         elif len(self.current_loaded_reclist) == 0:
             self.error_dialog("Please select a reclist")
             return
+        elif not self.devices.ready:
+            self.error_dialog("Audio devices are not ready, please try again in a moment or rescan them in the settings.")
+            return
+        if self.vad:
+            self.handsfree_btn.setChecked(False)
+            return
 
         selected_items = self.reclist_list.selectedItems()
         if selected_items:
@@ -421,64 +803,284 @@ class RecordWidget(QWidget):
             if not self.currently_recording:
                 self.start_recording()
             else:
-                self.stop_recording()
-                self.current_loaded_reclist[current_row][1] = "Yes"
-                self.update_phoneme_table()
+                # The line is marked recorded once the finalizer has written the take
+                if self.stop_recording():
+                    self.current_loaded_reclist[current_row][1] = "Saving..."
+                    self.reclist_list.item(current_row, 0).setText("Saving...")
 
     def audio_callback(self, in_data, frame_count, time_info, status):
-        self.data_queue.put(in_data)
-        self.frames.append(in_data)
+        if self.vad is not None:
+            self.handsfree_callback(in_data)
+            return (in_data, pyaudio.paContinue)
+        with self.capture_lock:
+            if self.capturing:
+                self.data_queue.put(in_data)
+                self.frames.append(in_data)
+            else:
+                self.pre_roll.write(in_data)
         return (in_data, pyaudio.paContinue)
 
+    def handsfree_callback(self, in_data):
+        # Runs on the capture thread, the GUI only hears about finished events
+        event = self.vad.feed(in_data)
+        if event == VAD_START:
+            self.handsfree_take_started.emit()
+        if self.vad.active or event == VAD_STOP:
+            self.data_queue.put(in_data)
+        if event == VAD_STOP:
+            self.handsfree_take_captured.emit(self.vad.pop_take())
+
+    def handsfree_toggled(self, checked):
+        if checked:
+            self.start_handsfree()
+        else:
+            self.stop_handsfree()
+
+    def start_handsfree(self):
+        if not self.vbinfo.samples_path or not self.current_loaded_reclist:
+            self.error_dialog("Please select a voicebank sample path and a reclist.")
+            self.handsfree_btn.setChecked(False)
+            return
+        if not self.devices.ready:
+            self.error_dialog("Audio devices are not ready, please try again in a moment or rescan them in the settings.")
+            self.handsfree_btn.setChecked(False)
+            return
+        if self.currently_recording:
+            self.stop_recording()
+        row = self.next_unrecorded_row(max(self.reclist_list.currentRow(), 0))
+        if row < 0:
+            self.info_dialog("Every line of the reclist is already recorded.")
+            self.handsfree_btn.setChecked(False)
+            return
+        self.reclist_list.selectRow(row)
+
+        self.vad = VoiceActivityDetector(self.RATE, self.CHUNK, SETTINGS.get("vad_pre_roll_ms"), SETTINGS.get("vad_post_roll_ms"))
+        # An armed stream is taken over as is
+        if self.stream is None:
+            self.stream = self.open_input_stream()
+            self.stream.start_stream()
+        self.record_line_btn.setIcon(QIcon("assets/ui/stop.svg"))
+
+    def stop_handsfree(self):
+        if self.vad is None:
+            return
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        # A take still in progress is dropped
+        self.vad = None
+        self.timer.stop()
+        self.currently_recording = False
+        self.record_line_btn.setIcon(QIcon("assets/ui/record.svg"))
+        self.arm_input()
+
+    def handsfree_started(self):
+        if self.vad is None:
+            return
+        self.currently_recording = True
+        self.plot_data = np.array([])
+        self.clear_loaded_audio()
+        if self.spectrogram_mode():
+            self.live_stft.reset()
+            self.add_spectrogram_image()
+        else:
+            self.curve = self.audio_visualizer.plot(pen=pg.mkPen(color='b', width=1))
+        self.timer.start()
+
+    def handsfree_captured(self, frames):
+        if self.vad is None:
+            return
+        self.timer.stop()
+        self.update_graph()
+        self.currently_recording = False
+
+        row = self.reclist_list.currentRow()
+        self.submit_take(self.current_phoneme, frames)
+        self.current_loaded_reclist[row][1] = "Saving..."
+        self.reclist_list.item(row, 0).setText("Saving...")
+
+        next_row = self.next_unrecorded_row(row + 1)
+        if next_row < 0:
+            self.handsfree_btn.setChecked(False)
+            self.info_dialog("Every line of the reclist is recorded.")
+            return
+        self.reclist_list.selectRow(next_row)
+
+    def next_unrecorded_row(self, start):
+        # Search forward first, then wrap around to lines that were skipped
+        n_rows = len(self.current_loaded_reclist)
+        for offset in range(n_rows):
+            row = (start + offset) % n_rows
+            if self.current_loaded_reclist[row][1] == "No":
+                return row
+        return -1
+
+    def device_index(self, setting, is_input):
+        key = SETTINGS.get(setting)
+        # Checked against the formats remembered when the device was chosen, never probed here
+        formats = SETTINGS.get("device_formats").get(key, {}).get("input" if is_input else "output")
+        if formats is not None and self.RATE not in formats:
+            return None
+        return self.devices.device_index(key, is_input)
+
+    def update_output_device(self):
+        self.playback.set_device(self.device_index("output_device", False))
+
+    def open_input_stream(self):
+        return self.p.open(format=self.FORMAT,
+                           channels=self.CHANNELS,
+                           rate=self.RATE,
+                           input=True,
+                           input_device_index=self.device_index("input_device", True),
+                           frames_per_buffer=self.CHUNK,
+                           stream_callback=self.audio_callback,
+                           start=False)
+
+    def audio_reinitialized(self, pa):
+        self.p = pa
+        self.playback.set_device(self.device_index("output_device", False), pa)
+        self.arm_input()
+
     def start_recording(self):
         self.frames = []
         self.plot_data = np.array([])
-        self.audio_visualizer.clear()
-        self.curve = self.audio_visualizer.plot(pen=pg.mkPen(color='b', width=1))
-
-        self.stream = self.p.open(format=self.FORMAT,
-                                 channels=self.CHANNELS,
-                                 rate=self.RATE,
-                                 input=True,
-                                 frames_per_buffer=self.CHUNK,
-                                 stream_callback=self.audio_callback,
-                                 start=False)
+        self.clear_loaded_audio()
+        if self.spectrogram_mode():
+            self.live_stft.reset()
+            self.add_spectrogram_image()
+        else:
+            self.curve = self.audio_visualizer.plot(pen=pg.mkPen(color='b', width=1))
 
-        self.stream.start_stream()
+        if self.stream is None:
+            self.stream = self.open_input_stream()
+            self.capturing = True
+            self.stream.start_stream()
+        else:
+            # Armed: the take starts with what the ring heard before the click
+            with self.capture_lock:
+                pre_roll = self.pre_roll.read()
+                self.pre_roll.clear()
+                if pre_roll:
+                    self.frames.append(pre_roll)
+                    self.data_queue.put(pre_roll)
+                self.capturing = True
         self.currently_recording = True
         self.record_line_btn.setIcon(QIcon("assets/ui/stop.svg"))
         self.timer.start()
 
     def stop_recording(self):
         if not self.currently_recording:
-            return
+            return False
         self.timer.stop() 
         self.currently_recording = False
         self.record_line_btn.setIcon(QIcon("assets/ui/record.svg"))
 
-        if self.stream:
+        with self.capture_lock:
+            self.capturing = False
+        if self.stream and not self.input_armed():
             self.stream.stop_stream()
             self.stream.close()
             self.stream = None
 
-        self.save_wav_file()
+        return self.save_wav_file()
+
+    def input_armed(self):
+        return SETTINGS.get("armed_input") and self.isVisible()
+
+    def arm_input(self):
+        if self.stream is not None or not self.input_armed() or not self.devices.ready:
+            return
+        self.pre_roll = PreRollBuffer(self.RATE, SETTINGS.get("pre_roll_ms"), self.CHANNELS)
+        try:
+            self.stream = self.open_input_stream()
+            self.stream.start_stream()
+        except OSError:
+            self.stream = None
+
+    def disarm_input(self):
+        # Only an idle armed stream, a take in progress keeps its stream
+        if self.stream is None or self.currently_recording or self.vad is not None:
+            return
+        self.stream.stop_stream()
+        self.stream.close()
+        self.stream = None
+        self.pre_roll.clear()
 
+    def rearm_input(self):
+        if self.stream is not None and not self.currently_recording and self.vad is None:
+            self.disarm_input()
+            self.arm_input()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.arm_input()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.disarm_input()
+
+    def devices_rescanning(self):
+        self.playback.close()
+        self.disarm_input()
+
+    @timed("record.save_wav_file")
     def save_wav_file(self):
         if not self.frames:
+            return False
+        self.submit_take(self.current_phoneme, b''.join(self.frames))
+        # The finalizer has its own copy, don't keep the chunks around until the next take
+        self.frames = []
+        return True
+
+    def submit_take(self, phoneme, frames):
+        analyzers = [self.spectrogram_tiles.spectrogram] if self.spectrogram_mode() else []
+        self.finalizer.submit(self.get_take_store(), phoneme, frames, analyzers)
+
+    def take_finalized(self, samples_path, phoneme, result):
+        level = f"Peak {result['peak_db']:.1f} dBFS"
+        if result["clipped"]:
+            level += f", {result['clipped']} clipped samples"
+        self.take_levels[phoneme] = level
+        if samples_path != self.vbinfo.samples_path:
             return
-        self.WAVE_OUTPUT_FILENAME = os.path.join(self.vbinfo.samples_path, f"{self.current_phoneme}.wav")
-        wf = wave.open(self.WAVE_OUTPUT_FILENAME, 'wb')
-        wf.setnchannels(self.CHANNELS)
-        wf.setsampwidth(self.p.get_sample_size(self.FORMAT))
-        wf.setframerate(self.RATE)
-        wf.writeframes(b''.join(self.frames))
-        wf.close()
 
-    def closeEvent(self, event):
+        for row, line in enumerate(self.current_loaded_reclist):
+            if line[0] != phoneme:
+                continue
+            line[1] = "Yes"
+            item = self.reclist_list.item(row, 0)
+            if item:
+                item.setText("Yes")
+                item.setToolTip(level)
+            if self.journal:
+                self.journal.record_take(row, "Yes")
+
+        if phoneme == self.current_phoneme and not self.currently_recording:
+            self.update_take_select()
+            self.check_and_load_wav(phoneme)
+
+    def take_failed(self, samples_path, phoneme, message):
+        if samples_path == self.vbinfo.samples_path:
+            for row, line in enumerate(self.current_loaded_reclist):
+                if line[0] == phoneme and line[1] == "Saving...":
+                    line[1] = "Yes" if os.path.exists(os.path.join(samples_path, f"{phoneme}.wav")) else "No"
+                    self.reclist_list.item(row, 0).setText(line[1])
+        self.error_dialog(f"Could not save take for {phoneme}: {message}")
+
+    def shutdown(self):
+        # A page of the stacked layout never gets a close event, so this runs on quit
+        self.stop_handsfree()
         if self.stream:
             self.stop_recording()
+        self.disarm_input()
+        self.finalizer.wait()
+        if self.journal:
+            self.journal.compact()
+            self.journal.close()
+        self.devices.timer.stop()
+        self.playback.close()
         self.p.terminate()
-        super().closeEvent(event)
 
     def next_line_btn(self):
         if self.currently_recording:
@@ -509,13 +1111,22 @@ class RecordWidget(QWidget):
                 translation = self.hiragana_to_romaji(self.current_phoneme)
                 self.reclist_line_translation.setText(f"{translation or ''}")
                 file_exists = self.check_and_load_wav(self.current_phoneme)
-                status = "Yes" if file_exists else "No"
+                if self.finalizer.is_pending(self.vbinfo.samples_path, self.current_phoneme):
+                    status = "Saving..."
+                else:
+                    status = "Yes" if file_exists else "No"
+                if self.journal:
+                    if self.current_loaded_reclist[current_row][1] != status and status != "Saving...":
+                        self.journal.record_take(current_row, status)
+                    self.journal.record_select(current_row)
                 self.current_loaded_reclist[current_row][1] = status
                 self.reclist_list.item(current_row, 0).setText(status)
+                self.update_take_select()
         else:
             self.current_phoneme = ""
+            self.update_take_select()
             self.current_reclist_line.setText("N/A")
-            self.audio_visualizer.clear()
+            self.clear_loaded_audio()
             self.audio_visualizer.setTitle("Audio Visualizer", color="#000000", size="10pt")
     
     def hiragana_to_romaji(self, hiragana):
@@ -532,27 +1143,88 @@ class RecordWidget(QWidget):
         folder_path = QFileDialog.getExistingDirectory(self, "Select Voicebank Samples Folder Path", os.path.expanduser("~"), QFileDialog.Option.ShowDirsOnly)
         if folder_path:
             self.vbinfo.samples_path = folder_path
+            if SessionJournal.exists(folder_path):
+                if self.question_dialog("Resume session", "A recording session was found in this folder. Would you like to resume it?"):
+                    self.resume_session(folder_path)
+                    return
+            self.start_journal()
+
+    def start_journal(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if not self.vbinfo.samples_path or not self.current_loaded_reclist:
+            return
+
+        self.journal = SessionJournal(self.vbinfo.samples_path)
+        self.journal.start(self.current_reclist_path, self.vbinfo.samples_path, self.current_loaded_reclist, self.reclist_list.currentRow())
+        self.remember_session(self.vbinfo.samples_path)
+
+    def resume_session(self, folder_path):
+        if self.journal:
+            self.journal.close()
+        self.journal = SessionJournal(folder_path)
+        try:
+            state = self.journal.load()
+        except OSError as e:
+            self.journal = None
+            self.error_dialog(f"Could not read session journal: {str(e)}")
+            return
+        if not state["lines"]:
+            self.journal = None
+            return
+
+        self.vbinfo.samples_path = folder_path
+        self.current_reclist_path = state["reclist_path"]
+        self.current_loaded_reclist = [[phoneme, recorded] for phoneme, recorded in state["lines"]]
+        self.update_phoneme_table()
+        self.remember_session(folder_path)
+
+        row = state["current_row"]
+        if not 0 <= row < len(self.current_loaded_reclist):
+            row = 0
+        self.reclist_list.selectRow(row)
 
+    def remember_session(self, folder_path):
+        SETTINGS.set("last_session_path", folder_path)
+
+    @timed("record.load_reclist")
     def load_reclist(self, reclist_path):
-        self.current_loaded_reclist = []
+        self.reclist_generation += 1
+        generation = self.reclist_generation
+        run_task(self.read_reclist_status, reclist_path, self.vbinfo.samples_path,
+                 on_result=lambda lines: self.reclist_loaded(generation, reclist_path, lines),
+                 on_error=lambda message: self.error_dialog(f"Could not load reclist: {message}"))
+
+    @timed("record.read_reclist_status")
+    def read_reclist_status(self, reclist_path, samples_path):
+        lines = []
         with open(reclist_path, "r", encoding="utf-8") as f:
             for line in f:
                 line = line.strip()
                 if line:
-                    self.current_loaded_reclist.append([line, "No"]) 
+                    lines.append([line, "No"])
 
-        if self.vbinfo.samples_path:
-            for item in self.current_loaded_reclist:
-                if os.path.exists(os.path.join(self.vbinfo.samples_path, f"{item[0]}.wav")):
+        if samples_path:
+            existing = {entry.name for entry in os.scandir(samples_path)}
+            for item in lines:
+                if f"{item[0]}.wav" in existing:
                     item[1] = "Yes"
+        return lines
 
+    def reclist_loaded(self, generation, reclist_path, lines):
+        if generation != self.reclist_generation:
+            return
+        self.current_reclist_path = reclist_path
+        self.current_loaded_reclist = lines
         self.update_phoneme_table()
+        self.start_journal()
         if self.current_loaded_reclist:
             self.reclist_list.selectRow(0)
         else:
             self.current_phoneme = ""
             self.current_reclist_line.setText("N/A")
-            self.audio_visualizer.clear()
+            self.clear_loaded_audio()
 
     def error_dialog(self, message):
         dlg = QMessageBox(self)
@@ -563,11 +1235,156 @@ class RecordWidget(QWidget):
         dlg.setStandardButtons(QMessageBox.StandardButton.Ok)
         dlg.exec()
 
+    def check_takes(self):
+        if not self.vbinfo.samples_path:
+            self.error_dialog("Please select a voicebank sample path.")
+            return
+
+        if self.check_task:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self.check_task = run_task(self.find_take_issues, self.vbinfo.samples_path, [phoneme for phoneme, _ in self.current_loaded_reclist],
+                                   on_result=self.show_take_issues,
+                                   on_error=lambda message: self.error_dialog(f"Error checking takes: {message}"),
+                                   on_finished=self.check_takes_finished)
+
+    def find_take_issues(self, samples_path, lines):
+        index = FingerprintIndex(samples_path)
+        _, failed = index.update()
+        return index.near_duplicates(), index.neighbor_mismatches(lines), failed
+
+    def check_takes_finished(self):
+        self.check_task = None
+        QApplication.restoreOverrideCursor()
+
+    def show_take_issues(self, result):
+        duplicates, mismatches, failed = result
+        issues = [("Duplicate", a, b, distance) for a, b, distance in duplicates]
+        issues += [("Sounds like neighbor", f"{a}.wav", f"{b}.wav", distance) for a, b, distance in mismatches]
+        issues += [("Unreadable", name, "", "") for name in failed]
+        if not issues:
+            self.info_dialog("No duplicate or mislabeled takes found.")
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Take Check")
+        dlg.resize(560, 360)
+        dlg_layout = QVBoxLayout()
+        table = QTableWidget(len(issues), 4)
+        table.setHorizontalHeaderLabels(["Issue", "Sample", "Matches", "Distance"])
+        table.horizontalHeader().setStretchLastSection(True)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        for row, issue in enumerate(issues):
+            for column, value in enumerate(issue):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
+        table.cellDoubleClicked.connect(lambda row, _: self.select_phoneme(os.path.splitext(table.item(row, 1).text())[0]))
+        dlg_layout.addWidget(table)
+        dlg.setLayout(dlg_layout)
+        dlg.exec()
+
+    def check_quality(self):
+        if not self.vbinfo.samples_path:
+            self.error_dialog("Please select a voicebank sample path.")
+            return
+
+        if self.quality_task:
+            return
+        progress_dlg = QProgressDialog("Checking sample quality...", "Cancel", 0, 100, self)
+        progress_dlg.setWindowTitle("Quality Check")
+        progress_dlg.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dlg.setMinimumDuration(500)
+        progress_dlg.setAutoClose(False)
+        progress_dlg.setAutoReset(False)
+        progress_dlg.setValue(0)
+
+        def update_progress(done, total):
+            progress_dlg.setValue(int(done * 100 / total) if total else 100)
+
+        def finished():
+            self.quality_task = None
+            progress_dlg.close()
+
+        self.quality_task = run_task(scan_bank_quality, self.vbinfo.samples_path,
+                                     on_progress=update_progress,
+                                     on_result=self.show_quality_report,
+                                     on_error=lambda message: self.error_dialog(f"Error checking sample quality: {message}"),
+                                     on_finished=finished)
+        progress_dlg.canceled.connect(self.quality_task.cancel)
+
+    def show_quality_report(self, result):
+        _, report = result
+        if not report:
+            self.info_dialog("No samples found.")
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Quality Check")
+        dlg.resize(820, 420)
+        dlg_layout = QVBoxLayout()
+        flagged = sum(1 for entry in report if entry["issues"])
+        dlg_layout.addWidget(QLabel(f"{flagged} of {len(report)} samples have issues."))
+
+        columns = [("Sample", "file"), ("Issues", "issues"), ("Length (s)", "duration"), ("Rate", "rate"), ("Channels", "channels"),
+                   ("Bits", "bits"), ("Peak (dB)", "peak_db"), ("Clipped", "clipped"), ("DC offset", "dc_offset"), ("SNR (dB)", "snr_db")]
+        table = QTableWidget(len(report), len(columns))
+        table.setHorizontalHeaderLabels([label for label, _ in columns])
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        for row, entry in enumerate(report):
+            for column, (_, key) in enumerate(columns):
+                value = entry.get(key, "")
+                item = QTableWidgetItem()
+                if key == "issues":
+                    item.setText(", ".join(value))
+                elif isinstance(value, (int, float)):
+                    # Numbers go in as data so the columns sort numerically
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(value, 3) if key == "duration" else value)
+                else:
+                    item.setText(str(value))
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+        table.sortItems(1, Qt.SortOrder.DescendingOrder)
+        table.resizeColumnsToContents()
+        table.cellDoubleClicked.connect(lambda row, _: self.select_phoneme(os.path.splitext(table.item(row, 0).text())[0]))
+        dlg_layout.addWidget(table)
+        dlg.setLayout(dlg_layout)
+        dlg.exec()
+
+    def select_phoneme(self, phoneme):
+        for row, (line, _) in enumerate(self.current_loaded_reclist):
+            if line == phoneme:
+                self.reclist_list.selectRow(row)
+                return
+
+    def info_dialog(self, message):
+        dlg = QMessageBox(self)
+        dlg.setIcon(QMessageBox.Icon.Information)
+        dlg.setWindowTitle("Info")
+        dlg.setText(f"Information: {' '*40}")
+        dlg.setInformativeText(message)
+        dlg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        dlg.exec()
+
+    def question_dialog(self, title, message):
+        dlg = QMessageBox(self)
+        dlg.setIcon(QMessageBox.Icon.Question)
+        dlg.setWindowTitle(title)
+        dlg.setText(message)
+        dlg.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return dlg.exec() == QMessageBox.StandardButton.Yes
+
 class ConfigureOtoWidget(QWidget):
     back_to_main_menu = pyqtSignal()
+    open_editor = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
+        self.destination_path = ""
+        self.oto = None
+        self.task = None
+        self.load_generation = 0
+
         oto_layout = QGridLayout()
         content_layout = QFormLayout()
         status_layout = QVBoxLayout()
@@ -588,6 +1405,21 @@ class ConfigureOtoWidget(QWidget):
         create_oto_at_btn.setFixedWidth(200)
         content_layout.addRow("Voicebank samples path:", create_oto_at_btn)
 
+        reference_layout = QHBoxLayout()
+        self.reference_path_edit = QLineEdit(SETTINGS.get("oto_reference_path"))
+        self.reference_path_edit.setReadOnly(True)
+        self.reference_path_edit.setPlaceholderText("None, place aliases by energy only")
+        self.reference_path_edit.setToolTip("Align each sample against the oto.ini of an existing voicebank")
+        reference_layout.addWidget(self.reference_path_edit)
+        select_reference_btn = QPushButton("Select...")
+        select_reference_btn.clicked.connect(self.select_reference_folder)
+        reference_layout.addWidget(select_reference_btn)
+        clear_reference_btn = QPushButton("Clear")
+        clear_reference_btn.clicked.connect(lambda: SETTINGS.set("oto_reference_path", ""))
+        reference_layout.addWidget(clear_reference_btn)
+        content_layout.addRow("Reference voicebank (optional):", reference_layout)
+        SETTINGS.subscribe("oto_reference_path", self.reference_path_edit.setText)
+
         self.oto_progress = QProgressBar()
         self.oto_progress.setRange(0, 100)
         status_layout.addWidget(self.oto_progress)
@@ -600,12 +1432,547 @@ class ConfigureOtoWidget(QWidget):
         self.oto_logs.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         status_layout.addWidget(self.oto_logs)
 
+        frq_btn = QPushButton("Generate .frq files")
+        frq_btn.clicked.connect(self.generate_frq_files)
+        button_box.addWidget(frq_btn)
+
+        edit_oto_btn = QPushButton("Edit oto.ini...")
+        edit_oto_btn.clicked.connect(self.edit_oto)
+        button_box.addWidget(edit_oto_btn)
+
         config_oto_btn = QPushButton("Configure oto.ini file")
+        config_oto_btn.clicked.connect(self.configure_oto)
         button_box.addWidget(config_oto_btn)
+
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_task)
+        self.cancel_btn.setEnabled(False)
+        button_box.addWidget(self.cancel_btn)
         self.setLayout(oto_layout)
 
     def select_oto_destination_folder(self):
         self.destination_path = QFileDialog.getExistingDirectory(self, "Select voicebank samples path", os.path.expanduser("~"), QFileDialog.Option.ShowDirsOnly)
+        if self.destination_path:
+            self.load_oto(self.destination_path)
+
+    def select_reference_folder(self):
+        folder_path = QFileDialog.getExistingDirectory(self, "Select reference voicebank samples path", os.path.expanduser("~"), QFileDialog.Option.ShowDirsOnly)
+        if not folder_path:
+            return
+        if not os.path.isfile(os.path.join(folder_path, OTO_FILENAME)):
+            self.error_dialog(f"The reference voicebank has no {OTO_FILENAME}.")
+            return
+        SETTINGS.set("oto_reference_path", folder_path)
+
+    def load_oto(self, folder_path):
+        # A newer load or a finished configure run makes older loads stale
+        self.load_generation += 1
+        generation = self.load_generation
+        self.oto_logs.setText(f"Loading {OTO_FILENAME}...")
+        run_task(OtoIni.load_folder, folder_path,
+                 on_result=lambda oto: self.oto_loaded(generation, oto),
+                 on_error=lambda message: self.oto_load_failed(generation, message))
+
+    def oto_load_failed(self, generation, message):
+        if generation != self.load_generation:
+            return
+        self.oto = None
+        self.oto_logs.setText(f"Could not read {OTO_FILENAME}: {message}")
+
+    def oto_loaded(self, generation, oto):
+        if generation != self.load_generation:
+            return
+        self.oto = oto
+        if len(self.oto):
+            self.oto_logs.setText(f"Loaded {len(self.oto)} aliases from {OTO_FILENAME} ({self.oto.encoding})")
+        else:
+            self.oto_logs.setText(f"No {OTO_FILENAME} found, a new one will be created")
+
+    def configure_oto(self):
+        if not self.destination_path:
+            self.error_dialog("Please select a voicebank samples path.")
+            return
+
+        if self.task:
+            return
+        reference_path = SETTINGS.get("oto_reference_path")
+        if reference_path and os.path.isfile(os.path.join(reference_path, OTO_FILENAME)):
+            self.oto_logs.setText(f"Aligning samples to {os.path.basename(reference_path)}...")
+            self.start_task(align_oto, self.destination_path, reference_path, HIRAGANA_ROMAJI_MAP,
+                            on_result=self.oto_generated,
+                            on_error=lambda message: self.error_dialog(f"Error configuring {OTO_FILENAME}: {message}"))
+            return
+        self.oto_logs.setText("Segmenting samples...")
+        self.start_task(generate_oto, self.destination_path, HIRAGANA_ROMAJI_MAP,
+                        on_result=self.oto_generated,
+                        on_error=lambda message: self.error_dialog(f"Error configuring {OTO_FILENAME}: {message}"))
+
+    def oto_generated(self, result):
+        self.load_generation += 1
+        self.oto, n_files, n_aliases, failed, *aligned = result
+        message = f"Wrote {n_aliases} aliases for {n_files} samples to {OTO_FILENAME}"
+        if aligned:
+            confidences = aligned[0]
+            unsure = sorted(alias for alias, score in confidences.items() if score < MIN_CONFIDENCE)
+            message += f", {len(confidences) - len(unsure)} aligned to the reference"
+            if unsure:
+                message += f", {len(unsure)} placed by energy only ({', '.join(unsure[:3])}{'...' if len(unsure) > 3 else ''})"
+        if failed:
+            message += f" ({len(failed)} could not be read: {', '.join(failed[:3])}{'...' if len(failed) > 3 else ''})"
+        self.oto_logs.setText(message)
+
+    def generate_frq_files(self):
+        if not self.destination_path:
+            self.error_dialog("Please select a voicebank samples path.")
+            return
+
+        if self.task:
+            return
+        self.oto_logs.setText("Analyzing pitch...")
+        self.start_task(generate_frq, self.destination_path,
+                        on_result=self.frq_generated,
+                        on_error=lambda message: self.error_dialog(f"Error generating .frq files: {message}"))
+
+    def frq_generated(self, result):
+        written, skipped, failed = result
+        self.oto_progress.setValue(100)
+        message = f"Wrote {written} .frq files, {skipped} already up to date"
+        if failed:
+            message += f" ({len(failed)} could not be read: {', '.join(failed[:3])}{'...' if len(failed) > 3 else ''})"
+        self.oto_logs.setText(message)
+
+    def edit_oto(self):
+        if not self.destination_path:
+            self.error_dialog("Please select a voicebank samples path.")
+            return
+        self.open_editor.emit(self.destination_path)
+
+    def start_task(self, fn, *args, on_result, on_error):
+        self.oto_progress.setValue(0)
+        self.cancel_btn.setEnabled(True)
+        self.task = run_task(fn, *args, on_result=on_result, on_error=on_error,
+                             on_progress=self.update_oto_progress,
+                             on_cancelled=lambda: self.oto_logs.setText("Cancelled"),
+                             on_finished=self.task_finished)
+
+    def cancel_task(self):
+        if self.task:
+            self.oto_logs.setText("Cancelling...")
+            self.task.cancel()
+
+    def task_finished(self):
+        self.task = None
+        self.cancel_btn.setEnabled(False)
+
+    def update_oto_progress(self, done, total):
+        self.oto_progress.setValue(int(done * 100 / total))
+
+    def error_dialog(self, message):
+        dlg = QMessageBox(self)
+        dlg.setIcon(QMessageBox.Icon.Critical)
+        dlg.setWindowTitle("Error")
+        dlg.setText(f"An Error occured: {' '*40}")
+        dlg.setInformativeText(message)
+        dlg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        dlg.exec()
+
+class OtoEditorWidget(QWidget):
+    back_to_main_menu = pyqtSignal()
+
+    MARKER_COLORS = {
+        "offset": "#0000cc",
+        "overlap": "#00aa00",
+        "preutter": "#cc0000",
+        "consonant": "#cc00cc",
+        "cutoff": "#0000cc",
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.samples_path = ""
+        self.oto = None
+        self.current_row = -1
+        self.audio = None
+        self.audio_key = None
+        self.rate = 44100
+        self.load_generation = 0
+        self.decoded = OrderedDict()
+        self.waveform_tiles = WaveformTileCache()
+        MEMORY.register("oto_editor.decoded", lambda: nbytes(self.decoded), 64 * MB, lambda max_bytes: trim_lru(self.decoded, max_bytes))
+        MEMORY.register("oto_editor.waveform_tiles", self.waveform_tiles.nbytes, 32 * MB, self.waveform_tiles.trim)
+
+        editor_layout = QVBoxLayout()
+        toolbar_layout = QHBoxLayout()
+        toolbar_layout.setContentsMargins(0, 10, 0, 10)
+        body_layout = QHBoxLayout()
+
+        title_label = QLabel("Edit oto.ini")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title_label.setStyleSheet("font-size: 20px; font-weight: bold; padding: 20px;")
+        editor_layout.addWidget(title_label)
+        editor_layout.addLayout(toolbar_layout)
+        editor_layout.addLayout(body_layout)
+
+        open_folder_btn = QPushButton("Open Samples Folder...")
+        open_folder_btn.clicked.connect(self.open_folder_dialog)
+        toolbar_layout.addWidget(open_folder_btn)
+
+        self.alias_filter = QLineEdit()
+        self.alias_filter.setPlaceholderText("Filter aliases...")
+        self.alias_filter.textChanged.connect(self.filter_aliases)
+        toolbar_layout.addWidget(self.alias_filter)
+
+        self.save_btn = QPushButton("Save")
+        self.save_btn.clicked.connect(self.save_oto)
+        self.save_btn.setEnabled(False)
+        toolbar_layout.addWidget(self.save_btn)
+
+        self.alias_list = QListWidget()
+        self.alias_list.setFixedWidth(250)
+        self.alias_list.currentItemChanged.connect(self.alias_selected)
+        body_layout.addWidget(self.alias_list)
+
+        plot_layout = QVBoxLayout()
+        body_layout.addLayout(plot_layout)
+
+        self.waveform_plot = pg.PlotWidget()
+        self.waveform_plot.setBackground('w')
+        self.waveform_plot.setLabel('bottom', 'Time', units='ms', color='#000000')
+        self.waveform_plot.getViewBox().setMouseEnabled(x=True, y=False)
+        self.waveform_plot.getViewBox().sigXRangeChanged.connect(self.render_waveform)
+        self.waveform_curve = self.waveform_plot.plot(pen=pg.mkPen(color='b', width=1))
+        plot_layout.addWidget(self.waveform_plot)
+
+        self.markers = {}
+        for name, color in self.MARKER_COLORS.items():
+            marker = pg.InfiniteLine(angle=90, movable=True, pen=pg.mkPen(color=color, width=2), label=name, labelOpts={"position": 0.9, "color": color})
+            marker.sigPositionChangeFinished.connect(self.marker_moved)
+            marker.hide()
+            self.waveform_plot.addItem(marker)
+            self.markers[name] = marker
+
+        self.param_label = QLabel("")
+        self.param_label.setStyleSheet("font-size: 14px; padding: 10px; color: gray;")
+        plot_layout.addWidget(self.param_label)
+
+        self.setLayout(editor_layout)
+
+    def open_folder_dialog(self):
+        folder_path = QFileDialog.getExistingDirectory(self, "Select voicebank samples path", os.path.expanduser("~"), QFileDialog.Option.ShowDirsOnly)
+        if folder_path:
+            self.load_folder(folder_path)
+
+    def load_folder(self, folder_path):
+        # Parsed in the background; opening another folder or alias makes older loads stale
+        self.load_generation += 1
+        generation = self.load_generation
+        self.param_label.setText(f"Loading {OTO_FILENAME}...")
+        run_task(OtoIni.load_folder, folder_path,
+                 on_result=lambda oto: self.folder_loaded(generation, folder_path, oto),
+                 on_error=lambda message: self.folder_load_failed(generation, message))
+
+    def folder_load_failed(self, generation, message):
+        if generation != self.load_generation:
+            return
+        self.param_label.setText("")
+        self.error_dialog(f"Could not read {OTO_FILENAME}: {message}")
+
+    def folder_loaded(self, generation, folder_path, oto):
+        if generation != self.load_generation:
+            return
+        self.load_generation += 1
+        self.oto = oto
+        self.param_label.setText("")
+        self.samples_path = folder_path
+        self.current_row = -1
+        self.decoded.clear()
+        self.waveform_tiles.clear()
+        self.save_btn.setEnabled(False)
+
+        self.alias_list.blockSignals(True)
+        self.alias_list.clear()
+        for row in self.oto.rows():
+            item = QListWidgetItem(f"{self.oto.alias_key(row)}  ({self.oto.files[row]})")
+            item.setData(Qt.ItemDataRole.UserRole, row)
+            self.alias_list.addItem(item)
+        self.alias_list.blockSignals(False)
+        self.filter_aliases(self.alias_filter.text())
+        if self.alias_list.count():
+            self.alias_list.setCurrentRow(0)
+
+    def filter_aliases(self, text):
+        text = text.strip().lower()
+        for i in range(self.alias_list.count()):
+            item = self.alias_list.item(i)
+            item.setHidden(bool(text) and text not in item.text().lower())
+
+    def audio_cache_key(self, filename):
+        path = os.path.join(self.samples_path, filename)
+        edit = sample_edit(path)
+        return (path, os.path.getmtime(path), edit.mtime if edit else 0.0)
+
+    def alias_selected(self, item):
+        if item is None:
+            return
+        row = item.data(Qt.ItemDataRole.UserRole)
+        self.load_generation += 1
+        generation = self.load_generation
+        try:
+            key = self.audio_cache_key(self.oto.files[row])
+        except (OSError, ValueError) as e:
+            self.alias_load_failed(generation, row, str(e))
+            return
+        if key in self.decoded:
+            self.decoded.move_to_end(key)
+            self.show_alias(row, key)
+            return
+        # Decoded in the background, the previous alias stays up until it is ready
+        self.param_label.setText(f"Loading {self.oto.files[row]}...")
+        run_task(read_edited_mono, key[0],
+                 on_result=lambda result: self.alias_audio_loaded(generation, row, key, result),
+                 on_error=lambda message: self.alias_load_failed(generation, row, message))
+
+    def alias_audio_loaded(self, generation, row, key, result):
+        self.decoded[key] = result
+        while len(self.decoded) > 16:
+            self.decoded.popitem(last=False)
+        if generation == self.load_generation:
+            self.show_alias(row, key)
+
+    def alias_load_failed(self, generation, row, message):
+        if generation != self.load_generation:
+            return
+        self.audio = None
+        self.current_row = -1
+        self.waveform_curve.setData([], [])
+        for marker in self.markers.values():
+            marker.hide()
+        self.param_label.setText(f"Could not load {self.oto.files[row]}: {message}")
+
+    def show_alias(self, row, key):
+        self.audio, self.rate = self.decoded[key]
+        self.audio_key = key
+        self.current_row = row
+        entry = self.oto.entry(row)
+        positions = self.marker_positions(entry)
+        for name, marker in self.markers.items():
+            marker.setValue(positions[name])
+            marker.show()
+        self.update_param_label(entry)
+
+        duration = len(self.audio) * 1000 / self.rate
+        self.waveform_plot.setYRange(-1, 1)
+        self.waveform_plot.setXRange(max(0, positions["offset"] - 100), min(duration, positions["cutoff"] + 100))
+        self.render_waveform()
+
+    def marker_positions(self, entry):
+        # Everything is stored relative to the offset, a positive cutoff counts
+        # from the end and a cutoff of 0 plays to the end of the file
+        offset = entry["offset"]
+        duration = len(self.audio) * 1000 / self.rate
+        if entry["cutoff"] < 0:
+            cutoff = offset - entry["cutoff"]
+        else:
+            cutoff = duration - entry["cutoff"]
+        return {
+            "offset": offset,
+            "overlap": offset + entry["overlap"],
+            "preutter": offset + entry["preutter"],
+            "consonant": offset + entry["consonant"],
+            "cutoff": cutoff,
+        }
+
+    def marker_moved(self):
+        if self.current_row < 0:
+            return
+        positions = {name: marker.value() for name, marker in self.markers.items()}
+        offset = positions["offset"]
+        duration = len(self.audio) * 1000 / self.rate
+        old_cutoff = self.oto.columns["cutoff"][self.current_row]
+        if old_cutoff > 0 or (old_cutoff == 0 and round(duration - positions["cutoff"], 1) == 0):
+            # Stays counted from the end, so an untouched "to the end" cutoff keeps its 0
+            cutoff = duration - positions["cutoff"]
+        else:
+            cutoff = offset - positions["cutoff"]
+        self.oto.set(self.current_row,
+                     offset=round(offset, 1),
+                     overlap=round(positions["overlap"] - offset, 1),
+                     preutter=round(positions["preutter"] - offset, 1),
+                     consonant=round(positions["consonant"] - offset, 1),
+                     cutoff=round(cutoff, 1))
+        self.update_param_label(self.oto.entry(self.current_row))
+        self.save_btn.setEnabled(True)
+
+    def update_param_label(self, entry):
+        self.param_label.setText("  ".join(f"{name}: {entry[name]:g}" for name in PARAM_NAMES))
+
+    def render_waveform(self):
+        if self.audio is None:
+            return
+        x_min, x_max = self.waveform_plot.getViewBox().viewRange()[0]
+        width = max(1, int(self.waveform_plot.getViewBox().width()))
+        x, y = self.waveform_tiles.envelope(self.audio_key, self.audio, x_min * self.rate / 1000, x_max * self.rate / 1000, width)
+        self.waveform_curve.setData(x * 1000 / self.rate, y)
+
+    def save_oto(self):
+        if not self.oto:
+            return
+        try:
+            self.oto.save()
+            self.save_btn.setEnabled(False)
+        except (OSError, ValueError) as e:
+            self.error_dialog(f"Could not save {OTO_FILENAME}: {str(e)}")
+
+    def error_dialog(self, message):
+        dlg = QMessageBox(self)
+        dlg.setIcon(QMessageBox.Icon.Critical)
+        dlg.setWindowTitle("Error")
+        dlg.setText(f"An Error occured: {' '*40}")
+        dlg.setInformativeText(message)
+        dlg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        dlg.exec()
+
+class WorkspaceDashboardWidget(QWidget):
+    back_to_main_menu = pyqtSignal()
+    open_bank = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.catalog_path = os.path.join(SCRIPT_DIR, "config", CATALOG_FILENAME)
+        self.catalog = WorkspaceCatalog(self.catalog_path)
+        self.banks = []
+        self.scan_task = None
+        self.cover_icons = {}
+        self.pending_covers = set()
+
+        dashboard_layout = QVBoxLayout()
+        toolbar_layout = QHBoxLayout()
+        toolbar_layout.setContentsMargins(0, 10, 0, 10)
+
+        title_label = QLabel("Workspace Dashboard")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title_label.setStyleSheet("font-size: 20px; font-weight: bold; padding: 20px;")
+        dashboard_layout.addWidget(title_label)
+        dashboard_layout.addLayout(toolbar_layout)
+
+        choose_workspace_btn = QPushButton("Choose Workspace Folder...")
+        choose_workspace_btn.clicked.connect(self.open_workspace_dialog)
+        toolbar_layout.addWidget(choose_workspace_btn)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search banks, authors or samples...")
+        self.search_input.textChanged.connect(self.update_bank_table)
+        toolbar_layout.addWidget(self.search_input)
+
+        rescan_btn = QPushButton("Rescan")
+        rescan_btn.clicked.connect(lambda: self.scan_workspace())
+        toolbar_layout.addWidget(rescan_btn)
+
+        self.summary_label = QLabel("No workspace selected")
+        self.summary_label.setStyleSheet("font-size: 14px; padding: 10px; color: gray;")
+        dashboard_layout.addWidget(self.summary_label)
+
+        self.scan_progress = QProgressBar()
+        self.scan_progress.setRange(0, 100)
+        self.scan_progress.hide()
+        dashboard_layout.addWidget(self.scan_progress)
+
+        self.bank_table = QTableWidget()
+        self.bank_table.setColumnCount(6)
+        self.bank_table.setHorizontalHeaderLabels(["Name", "Author", "Pitches", "Samples", "Duration", "Status"])
+        self.bank_table.horizontalHeader().setStretchLastSection(True)
+        self.bank_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.bank_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.bank_table.cellDoubleClicked.connect(self.bank_double_clicked)
+        dashboard_layout.addWidget(self.bank_table)
+
+        self.setLayout(dashboard_layout)
+
+        SETTINGS.subscribe("workspace_path", lambda folder_path: self.update_bank_table())
+        if os.path.isdir(SETTINGS.get("workspace_path")):
+            self.update_bank_table()
+
+    def open_workspace_dialog(self):
+        folder_path = QFileDialog.getExistingDirectory(self, "Select workspace folder", SETTINGS.get("workspace_path") or os.path.expanduser("~"), QFileDialog.Option.ShowDirsOnly)
+        if folder_path:
+            self.remember_workspace(folder_path)
+            self.scan_workspace()
+
+    def remember_workspace(self, folder_path):
+        SETTINGS.set("workspace_path", folder_path)
+
+    def scan_workspace(self, force=False):
+        workspace_path = SETTINGS.get("workspace_path")
+        if not workspace_path or not os.path.isdir(workspace_path):
+            self.error_dialog("No workspace folder selected.")
+            return
+
+        if self.scan_task:
+            return
+        self.scan_progress.setValue(0)
+        self.scan_progress.show()
+        self.scan_task = run_task(scan_workspace, self.catalog_path, workspace_path, force=force,
+                                  on_result=lambda result: self.update_bank_table(),
+                                  on_error=lambda message: self.error_dialog(f"Could not scan workspace: {message}"),
+                                  on_progress=self.update_scan_progress,
+                                  on_finished=self.scan_finished)
+
+    def scan_finished(self):
+        self.scan_task = None
+        self.scan_progress.hide()
+
+    def update_scan_progress(self, done, total):
+        self.scan_progress.setValue(int(done * 100 / total))
+
+    def update_bank_table(self):
+        workspace_path = SETTINGS.get("workspace_path")
+        if not workspace_path:
+            return
+        self.banks = self.catalog.banks(workspace_path, self.search_input.text().strip())
+        self.bank_table.setRowCount(len(self.banks))
+        for row, bank in enumerate(self.banks):
+            minutes, seconds = divmod(int(bank.duration), 60)
+            values = [bank.name, bank.author, bank.pitches, str(bank.sample_count), f"{minutes}:{seconds:02d}", bank.status]
+            for column, value in enumerate(values):
+                self.bank_table.setItem(row, column, QTableWidgetItem(value))
+            if bank.cover_path in self.cover_icons:
+                self.bank_table.item(row, 0).setIcon(self.cover_icons[bank.cover_path])
+        self.load_cover_icons()
+
+        total_samples = sum(bank.sample_count for bank in self.banks)
+        total_minutes = sum(bank.duration for bank in self.banks) / 60
+        self.summary_label.setText(f"{os.path.basename(workspace_path)}: {len(self.banks)} banks, {total_samples} samples, {total_minutes:.1f} minutes recorded")
+
+    def load_cover_icons(self):
+        paths = [bank.cover_path for bank in self.banks
+                 if bank.cover_path and bank.cover_path not in self.cover_icons and bank.cover_path not in self.pending_covers]
+        if not paths:
+            return
+        self.pending_covers.update(paths)
+        run_task(make_covers, paths, COVER_CACHE_DIR,
+                 on_result=self.cover_icons_loaded,
+                 on_finished=lambda: self.pending_covers.difference_update(paths))
+
+    def cover_icons_loaded(self, covers):
+        for cover_path, icon_path in covers.items():
+            self.cover_icons[cover_path] = QIcon(icon_path)
+        for row, bank in enumerate(self.banks):
+            if bank.cover_path in covers and self.bank_table.item(row, 0):
+                self.bank_table.item(row, 0).setIcon(self.cover_icons[bank.cover_path])
+
+    def bank_double_clicked(self, row, column):
+        bank = self.banks[row]
+        pitches = [pitch for pitch in bank.pitches.split(", ") if pitch]
+        self.open_bank.emit(os.path.join(bank.path, pitches[0]) if pitches else bank.path)
+
+    def error_dialog(self, message):
+        dlg = QMessageBox(self)
+        dlg.setIcon(QMessageBox.Icon.Critical)
+        dlg.setWindowTitle("Error")
+        dlg.setText(f"An Error occured: {' '*40}")
+        dlg.setInformativeText(message)
+        dlg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        dlg.exec()
 
 class PackageVoicebankWidget(QWidget):
     back_to_main_menu = pyqtSignal()
@@ -614,13 +1981,17 @@ class PackageVoicebankWidget(QWidget):
         super().__init__()
         self.vbinfo = VoicebankInfo()
         self.zip_destination = ""
+        self.task = None
 
         package_layout = QGridLayout()
         content_layout = QFormLayout()
+        status_layout = QVBoxLayout()
+        status_layout.setContentsMargins(0, 20, 0, 20)
         button_box = QHBoxLayout()
 
         package_layout.addLayout(content_layout, 0, 0, 1, 0)
-        package_layout.addLayout(button_box, 1, 1)
+        package_layout.addLayout(status_layout, 1, 0, 1, 0)
+        package_layout.addLayout(button_box, 2, 1)
 
         title_label = QLabel("Package a voicebank folder")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -637,9 +2008,18 @@ class PackageVoicebankWidget(QWidget):
         final_zip_loc_btn.setFixedWidth(200)
         content_layout.addRow("Zip destination path:", final_zip_loc_btn)
 
-        create_button = QPushButton("Create zip of voicebank folder")
-        create_button.clicked.connect(self.create_voicebank_zip)
-        button_box.addWidget(create_button)
+        self.package_progress = QProgressBar()
+        self.package_progress.setRange(0, 100)
+        status_layout.addWidget(self.package_progress)
+
+        self.create_button = QPushButton("Create zip of voicebank folder")
+        self.create_button.clicked.connect(self.create_voicebank_zip)
+        button_box.addWidget(self.create_button)
+
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(lambda: self.task and self.task.cancel())
+        self.cancel_btn.setEnabled(False)
+        button_box.addWidget(self.cancel_btn)
 
         self.setLayout(package_layout)
     
@@ -662,13 +2042,28 @@ class PackageVoicebankWidget(QWidget):
             self.error_dialog("Paths not set.")
             return
 
-        try:
-            output_path = os.path.join(self.zip_destination, os.path.basename(self.vbinfo.folder_path))
-            shutil.make_archive(output_path, "zip", self.vbinfo.folder_path)
-            self.back_to_main_menu.emit()
-            self.info_dialog(f"Zip created at {self.zip_destination}")
-        except Exception as e:
-            self.error_dialog(f"Error: {str(e)}")
+        if self.task:
+            return
+
+        output_path = os.path.join(self.zip_destination, os.path.basename(self.vbinfo.folder_path) + ".zip")
+        self.package_progress.setValue(0)
+        self.create_button.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.task = run_task(zip_voicebank, self.vbinfo.folder_path, output_path,
+                             on_result=self.zip_created,
+                             on_error=lambda message: self.error_dialog(f"Error: {message}"),
+                             on_progress=lambda done, total: self.package_progress.setValue(int(done * 100 / total)),
+                             on_cancelled=lambda: self.package_progress.setValue(0),
+                             on_finished=self.task_finished)
+
+    def zip_created(self, output_path):
+        self.back_to_main_menu.emit()
+        self.info_dialog(f"Zip created at {self.zip_destination}")
+
+    def task_finished(self):
+        self.task = None
+        self.create_button.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
 
     def error_dialog(self, message):
         dlg = QMessageBox(self)
@@ -688,6 +2083,40 @@ class PackageVoicebankWidget(QWidget):
         dlg.setStandardButtons(QMessageBox.StandardButton.Ok)
         dlg.exec()
 
+class MetricsOverlay(QLabel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 180); color: #ffffff; font-family: monospace; font-size: 11px; padding: 6px;")
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.refresh)
+        self.timer.setInterval(500)
+        self.hide()
+
+    def set_active(self, active):
+        if active:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def refresh(self):
+        lines = [f"{'probe':<30}{'n':>6}{'p50':>9}{'p95':>9}{'max':>9}"]
+        for name, summary in METRICS.snapshot().items():
+            lines.append(f"{name:<30}{summary['count']:>6}{summary['p50_ms']:>9.2f}{summary['p95_ms']:>9.2f}{summary['max_ms']:>9.2f}")
+        if len(lines) == 1:
+            lines.append("No samples yet")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.reposition()
+
+    def reposition(self):
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 10, parent.menuBar().height() + 10)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -712,20 +2141,28 @@ class MainWindow(QMainWindow):
         self.create_base_folder_widget = CreateBaseFolderWidget()
         self.create_base_folder_widget.back_to_main_menu.connect(self.go_home)
         self.configure_oto_widget = ConfigureOtoWidget()
+        self.configure_oto_widget.open_editor.connect(self.edit_oto)
+        self.oto_editor_widget = OtoEditorWidget()
         self.package_widget = PackageVoicebankWidget()
         self.package_widget.back_to_main_menu.connect(self.go_home)
+        self.dashboard_widget = WorkspaceDashboardWidget()
+        self.dashboard_widget.open_bank.connect(self.edit_oto)
 
         self.layout.addWidget(self.main_widget)
         self.layout.addWidget(self.record_widget)
         self.layout.addWidget(self.create_base_folder_widget)
         self.layout.addWidget(self.configure_oto_widget)
+        self.layout.addWidget(self.oto_editor_widget)
         self.layout.addWidget(self.package_widget)
+        self.layout.addWidget(self.dashboard_widget)
 
         self.layout.setCurrentWidget(self.main_widget)
 
         menubar = self.menuBar()
         fileMenu = menubar.addMenu("File")
+        toolsMenu = menubar.addMenu("Tools")
         setttingsMenu = menubar.addMenu("Settings")
+        debugMenu = menubar.addMenu("Debug")
         helpMenu = menubar.addMenu("Help")
 
         newBfolderAction = QAction("Create base voicebank folder", self)
@@ -740,20 +2177,69 @@ class MainWindow(QMainWindow):
         newOtoAction.triggered.connect(self.configure_oto)
         fileMenu.addAction(newOtoAction)
 
+        editOtoAction = QAction("Edit oto.ini", self)
+        editOtoAction.triggered.connect(lambda: self.layout.setCurrentWidget(self.oto_editor_widget))
+        fileMenu.addAction(editOtoAction)
+
         newPackageAction = QAction("Package voicebank to zip", self)
         newPackageAction.triggered.connect(self.package_voicebank)
         fileMenu.addAction(newPackageAction)
 
+        dashboardAction = QAction("Workspace dashboard", self)
+        dashboardAction.triggered.connect(self.show_dashboard)
+        fileMenu.addAction(dashboardAction)
+
+        installAction = QAction("Install voicebank zip...", self)
+        installAction.triggered.connect(self.install_voicebank_dialog)
+        fileMenu.addAction(installAction)
+
         fileMenu.addSeparator()
 
         quitAction = QAction("Quit", self)
         quitAction.triggered.connect(lambda: QApplication.quit())
         fileMenu.addAction(quitAction)
 
+        coverageAction = QAction("Analyze reclist coverage", self)
+        coverageAction.triggered.connect(self.show_coverage_dialog)
+        toolsMenu.addAction(coverageAction)
+
+        generateReclistAction = QAction("Generate reclist", self)
+        generateReclistAction.triggered.connect(self.show_generate_reclist_dialog)
+        toolsMenu.addAction(generateReclistAction)
+
         settingsAction = QAction("Program Settings", self)
         settingsAction.triggered.connect(self.show_settings_dialog)
         setttingsMenu.addAction(settingsAction)
 
+        self.probesAction = QAction("Enable timing probes", self)
+        self.probesAction.setCheckable(True)
+        self.probesAction.setChecked(METRICS.enabled)
+        self.probesAction.toggled.connect(self.toggle_probes)
+        debugMenu.addAction(self.probesAction)
+
+        self.overlayAction = QAction("Show metrics overlay", self)
+        self.overlayAction.setCheckable(True)
+        self.overlayAction.toggled.connect(self.toggle_metrics_overlay)
+        debugMenu.addAction(self.overlayAction)
+
+        exportMetricsAction = QAction("Export metrics...", self)
+        exportMetricsAction.triggered.connect(self.export_metrics)
+        debugMenu.addAction(exportMetricsAction)
+
+        resetMetricsAction = QAction("Reset metrics", self)
+        resetMetricsAction.triggered.connect(METRICS.reset)
+        debugMenu.addAction(resetMetricsAction)
+
+        debugMenu.addSeparator()
+
+        memoryAction = QAction("Memory usage...", self)
+        memoryAction.triggered.connect(self.show_memory_dialog)
+        debugMenu.addAction(memoryAction)
+
+        snapshotAction = QAction("Take allocation snapshot...", self)
+        snapshotAction.triggered.connect(self.show_allocation_snapshot)
+        debugMenu.addAction(snapshotAction)
+
         documentationAction = QAction("Project Page", self)
         documentationAction.triggered.connect(lambda: webbrowser.open("https://github.com/FlipArtYT/Silk-Vocal-Studio/"))
         helpMenu.addAction(documentationAction)
@@ -780,7 +2266,6 @@ class MainWindow(QMainWindow):
         self.button_box.addWidget(self.new_record_btn, alignment=Qt.AlignmentFlag.AlignHCenter)
 
         self.new_oto_btn = QPushButton("Configure oto.ini")
-        self.new_oto_btn.setEnabled(False)
         self.new_oto_btn.setFixedWidth(500)
         self.new_oto_btn.clicked.connect(self.configure_oto)
         self.button_box.addWidget(self.new_oto_btn, alignment=Qt.AlignmentFlag.AlignHCenter)
@@ -789,14 +2274,128 @@ class MainWindow(QMainWindow):
         self.new_package_btn.setFixedWidth(500)
         self.new_package_btn.clicked.connect(self.package_voicebank)
         self.button_box.addWidget(self.new_package_btn, alignment=Qt.AlignmentFlag.AlignHCenter)
+
+        self.dashboard_btn = QPushButton("Workspace dashboard")
+        self.dashboard_btn.setFixedWidth(500)
+        self.dashboard_btn.clicked.connect(self.show_dashboard)
+        self.button_box.addWidget(self.dashboard_btn, alignment=Qt.AlignmentFlag.AlignHCenter)
                
         widget = QWidget()
         widget.setLayout(self.layout)
         self.setCentralWidget(widget)
+
+        self.metrics_overlay = MetricsOverlay(self)
+
+        self.memory_timer = QtCore.QTimer()
+        self.memory_timer.timeout.connect(MEMORY.enforce)
+        self.memory_timer.start(5000)
     
     def go_home(self):
         self.layout.setCurrentWidget(self.main_widget)
 
+    def toggle_probes(self, checked):
+        METRICS.enabled = checked
+
+    def toggle_metrics_overlay(self, checked):
+        if checked and not METRICS.enabled:
+            self.probesAction.setChecked(True)
+        self.metrics_overlay.set_active(checked)
+
+    def export_metrics(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", os.path.join(os.path.expanduser("~"), "svs_metrics.json"), "JSON Files (*.json);;CSV Files (*.csv)")
+        if not file_path:
+            return
+        try:
+            METRICS.export(file_path)
+        except OSError as e:
+            self.info_dialog(f"Could not export metrics: {str(e)}")
+
+    def show_memory_dialog(self):
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Memory Usage")
+        dlg.resize(520, 400)
+        dlg_layout = QVBoxLayout()
+        total_label = QLabel()
+        table = QTableWidget(0, 3)
+        table.setHorizontalHeaderLabels(["Buffer", "Used (MB)", "Budget (MB)"])
+        table.horizontalHeader().setStretchLastSection(True)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        def refresh():
+            report = MEMORY.report()
+            table.setRowCount(len(report))
+            for row, (name, used, budget) in enumerate(report):
+                table.setItem(row, 0, QTableWidgetItem(name))
+                table.setItem(row, 1, QTableWidgetItem(f"{used / MB:.2f}"))
+                if budget is None:
+                    table.setItem(row, 2, QTableWidgetItem("-"))
+                elif table.cellWidget(row, 2) is None:
+                    budget_input = QSpinBox()
+                    budget_input.setRange(1, 4096)
+                    budget_input.setValue(budget // MB)
+                    budget_input.valueChanged.connect(lambda value, name=name: MEMORY.set_budget(name, value * MB))
+                    table.setCellWidget(row, 2, budget_input)
+            total_label.setText(f"Total tracked: {sum(used for _, used, _ in report) / MB:.2f} MB")
+
+        def enforce():
+            MEMORY.enforce()
+            refresh()
+
+        button_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(refresh)
+        enforce_btn = QPushButton("Enforce budgets now")
+        enforce_btn.clicked.connect(enforce)
+        button_layout.addWidget(refresh_btn)
+        button_layout.addWidget(enforce_btn)
+
+        dlg_layout.addWidget(total_label)
+        dlg_layout.addWidget(table)
+        dlg_layout.addLayout(button_layout)
+        dlg.setLayout(dlg_layout)
+        refresh()
+        dlg.exec()
+
+    def show_allocation_snapshot(self):
+        first = not MEMORY.tracing() or MEMORY.snapshot is None
+        snapshot, lines = MEMORY.take_snapshot()
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Allocation Snapshot")
+        dlg.resize(720, 420)
+        dlg_layout = QVBoxLayout()
+        if first:
+            header = "Largest allocation sites. Take another snapshot later to see what grew in between."
+        else:
+            header = "Growth since the previous snapshot:"
+        dlg_layout.addWidget(QLabel(header))
+        lines_list = QListWidget()
+        lines_list.addItems(lines)
+        dlg_layout.addWidget(lines_list)
+
+        def save_snapshot():
+            file_path, _ = QFileDialog.getSaveFileName(dlg, "Save Snapshot", os.path.join(os.path.expanduser("~"), "svs_snapshot.tracemalloc"), "tracemalloc Snapshots (*.tracemalloc)")
+            if file_path:
+                try:
+                    snapshot.dump(file_path)
+                except OSError as e:
+                    self.info_dialog(f"Could not save snapshot: {str(e)}")
+
+        button_layout = QHBoxLayout()
+        save_btn = QPushButton("Save snapshot...")
+        save_btn.clicked.connect(save_snapshot)
+        stop_btn = QPushButton("Stop tracing")
+        stop_btn.clicked.connect(lambda: (MEMORY.stop_tracing(), dlg.accept()))
+        button_layout.addWidget(save_btn)
+        button_layout.addWidget(stop_btn)
+        dlg_layout.addLayout(button_layout)
+        dlg.setLayout(dlg_layout)
+        dlg.exec()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.metrics_overlay.reposition()
+
     def create_base_folder(self):
         self.layout.setCurrentWidget(self.create_base_folder_widget)
     
@@ -807,13 +2406,182 @@ class MainWindow(QMainWindow):
     def configure_oto(self):
         self.layout.setCurrentWidget(self.configure_oto_widget)
 
+    def edit_oto(self, folder_path):
+        self.layout.setCurrentWidget(self.oto_editor_widget)
+        self.oto_editor_widget.load_folder(folder_path)
+
     def package_voicebank(self):
         self.layout.setCurrentWidget(self.package_widget)
 
+    def show_dashboard(self):
+        self.layout.setCurrentWidget(self.dashboard_widget)
+        if SETTINGS.get("workspace_path"):
+            self.dashboard_widget.scan_workspace()
+
+    def install_voicebank_dialog(self):
+        zip_path, _ = QFileDialog.getOpenFileName(self, "Select Voicebank Zip", os.path.expanduser("~"), "Zip Files (*.zip)")
+        if not zip_path:
+            return
+        workspace_path = SETTINGS.get("workspace_path")
+        dest_root = workspace_path if workspace_path and os.path.isdir(workspace_path) else ""
+        if not dest_root:
+            dest_root = QFileDialog.getExistingDirectory(self, "Select install folder", os.path.expanduser("~"), QFileDialog.Option.ShowDirsOnly)
+            if not dest_root:
+                return
+
+        progress_dlg = QProgressDialog(f"Installing {os.path.basename(zip_path)}...", "Cancel", 0, 100, self)
+        progress_dlg.setWindowTitle("Install voicebank")
+        progress_dlg.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dlg.setMinimumDuration(0)
+        progress_dlg.setAutoClose(False)
+        progress_dlg.setAutoReset(False)
+        progress_dlg.setValue(0)
+
+        def update_progress(done, total):
+            progress_dlg.setValue(int(done * 100 / total) if total else 100)
+
+        task = run_task(self.install_and_register, zip_path, dest_root,
+                        on_progress=update_progress,
+                        on_result=self.voicebank_installed,
+                        on_error=lambda message: self.info_dialog(f"Could not install voicebank: {message}"),
+                        on_cancelled=lambda: self.info_dialog("Installation cancelled, files extracted so far were kept."),
+                        on_finished=progress_dlg.close)
+        progress_dlg.canceled.connect(task.cancel)
+
+    def install_and_register(self, zip_path, dest_root, progress=None):
+        result = install_voicebank(zip_path, dest_root, progress=progress)
+        if result["has_character"]:
+            register_bank(self.dashboard_widget.catalog_path, dest_root, result["bank_path"])
+        return result
+
+    def voicebank_installed(self, result):
+        samples_path = result["samples_path"]
+        # Hand the bank to the recording and oto pages right away
+        if not self.record_widget.stream:
+            self.record_widget.vbinfo.samples_path = samples_path
+        self.configure_oto_widget.destination_path = samples_path
+        self.configure_oto_widget.load_oto(samples_path)
+        workspace_path = SETTINGS.get("workspace_path")
+        if workspace_path and os.path.abspath(workspace_path) == os.path.dirname(os.path.abspath(result["bank_path"])):
+            self.dashboard_widget.update_bank_table()
+
+        message = f"Installed {result['files']} files to {result['bank_path']} (filenames: {result['encoding']})."
+        if result["failed"]:
+            message += f" {len(result['failed'])} files failed their CRC check or could not be written: {', '.join(result['failed'][:3])}{'...' if len(result['failed']) > 3 else ''}"
+        if result["skipped"]:
+            message += f" {len(result['skipped'])} entries with unsafe paths were skipped."
+        question = QMessageBox(self)
+        question.setIcon(QMessageBox.Icon.Question)
+        question.setWindowTitle("Voicebank installed")
+        question.setText(f"{message}\nWould you like to open it in the oto editor?")
+        question.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if question.exec() == QMessageBox.StandardButton.Yes:
+            self.edit_oto(samples_path)
+
+    def show_coverage_dialog(self):
+        lines = [phoneme for phoneme, _ in self.record_widget.current_loaded_reclist]
+        if not lines:
+            file_path, _ = QFileDialog.getOpenFileName(self, "Select Reclist", os.path.expanduser("~"), "Text Files (*.txt)")
+            if not file_path:
+                return
+            try:
+                lines = read_reclist(file_path)
+            except (OSError, UnicodeDecodeError) as e:
+                self.info_dialog(f"Could not read reclist: {str(e)}")
+                return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Reclist Coverage")
+        dlg.resize(560, 420)
+        dlg_layout = QVBoxLayout()
+        form_layout = QFormLayout()
+        lists_layout = QHBoxLayout()
+
+        style_input = QComboBox()
+        style_input.addItems(STYLES)
+        style_input.setCurrentText("VCV")
+        form_layout.addRow("Reclist style:", style_input)
+        summary_label = QLabel()
+        summary_label.setWordWrap(True)
+        form_layout.addRow(summary_label)
+
+        missing_list = QListWidget()
+        redundant_list = QListWidget()
+        missing_layout = QVBoxLayout()
+        missing_layout.addWidget(QLabel("Missing transitions"))
+        missing_layout.addWidget(missing_list)
+        redundant_layout = QVBoxLayout()
+        redundant_layout.addWidget(QLabel("Redundant lines"))
+        redundant_layout.addWidget(redundant_list)
+        lists_layout.addLayout(missing_layout)
+        lists_layout.addLayout(redundant_layout)
+
+        def update_report():
+            report = analyze_reclist(lines, HIRAGANA_ROMAJI_MAP, style_input.currentText())
+            summary_label.setText(report.summary())
+            missing_list.clear()
+            missing_list.addItems(report.missing)
+            redundant_list.clear()
+            redundant_list.addItems([lines[i] for i in report.redundant_lines + report.duplicate_lines])
+
+        style_input.currentIndexChanged.connect(update_report)
+        update_report()
+
+        dlg_layout.addLayout(form_layout)
+        dlg_layout.addLayout(lists_layout)
+        dlg.setLayout(dlg_layout)
+        dlg.exec()
+
+    def show_generate_reclist_dialog(self):
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Generate Reclist")
+        dlg_layout = QFormLayout()
+        style_input = QComboBox()
+        style_input.addItems(STYLES)
+        style_input.setCurrentText("VCV")
+        dlg_layout.addRow("Reclist style:", style_input)
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(dlg.accept)
+        button_box.rejected.connect(dlg.reject)
+        dlg_layout.addRow(button_box)
+        dlg.setLayout(dlg_layout)
+        if not dlg.exec():
+            return
+
+        style = style_input.currentText()
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Reclist", os.path.join(os.path.expanduser("~"), f"reclist_{style.lower()}.txt"), "Text Files (*.txt)")
+        if not file_path:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        run_task(self.generate_reclist_file, file_path, style,
+                 on_result=lambda result: self.reclist_generated(file_path, style, result),
+                 on_error=lambda message: self.info_dialog(f"Could not write reclist: {message}"),
+                 on_finished=QApplication.restoreOverrideCursor)
+
+    def generate_reclist_file(self, file_path, style):
+        lines, missing = generate_reclist(HIRAGANA_ROMAJI_MAP, style)
+        write_reclist(file_path, lines)
+        return lines, missing
+
+    def reclist_generated(self, file_path, style, result):
+        lines, missing = result
+        message = f"Generated {len(lines)} lines covering every {style} transition."
+        if missing:
+            message = f"Generated {len(lines)} lines, {len(missing)} transitions could not be covered."
+        question = QMessageBox(self)
+        question.setIcon(QMessageBox.Icon.Question)
+        question.setWindowTitle("Reclist generated")
+        question.setText(f"{message}\nWould you like to record it now?")
+        question.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if question.exec() == QMessageBox.StandardButton.Yes:
+            self.layout.setCurrentWidget(self.record_widget)
+            self.record_widget.load_reclist(file_path)
+
     def show_settings_dialog(self):
         dlg = QDialog(self)
         dlg.setWindowTitle("Program Settings")
-        dlg.setFixedSize(QSize(480, 360))
+        dlg.setFixedSize(QSize(480, 540))
 
         main_layout = QVBoxLayout()
         settings_layout = QFormLayout()
@@ -826,6 +2594,9 @@ class MainWindow(QMainWindow):
         self.title_label.setStyleSheet("font-size: 20px; font-weight: bold; padding: 20px")
         settings_layout.addRow(self.title_label)
 
+        self.pending_settings = {}
+        default_reclist_path = SETTINGS.get("default_reclist_path")
+        default_guidebgm_path = SETTINGS.get("default_guidebgm_path")
         self.default_reclist_path_label = QLabel(f"Default reclist path: {default_reclist_path[:5] + '...' if default_reclist_path else 'None'}")
         self.default_reclist_path_button = QPushButton("Select...")
         self.default_reclist_path_button.clicked.connect(self.reclist_select_dialog)
@@ -839,12 +2610,64 @@ class MainWindow(QMainWindow):
         self.default_vb_pitch_input = QComboBox()
         pitches = [f"{note}{octave}" for octave in range(2, 6) for note in ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']]
         self.default_vb_pitch_input.addItems(pitches)
-        self.default_vb_pitch_input.setCurrentText(default_vb_pitch)
+        self.default_vb_pitch_input.setCurrentText(SETTINGS.get("default_vb_pitch"))
 
         settings_layout.addRow(self.default_reclist_path_label, self.default_reclist_path_button)
         settings_layout.addRow(self.default_guidebgm_path_label, self.default_guidebgm_path_button)
         settings_layout.addRow("Default voicebank pitch: ", self.default_vb_pitch_input)
 
+        self.vad_pre_roll_input = QSpinBox()
+        self.vad_pre_roll_input.setRange(0, 2000)
+        self.vad_pre_roll_input.setSingleStep(50)
+        self.vad_pre_roll_input.setSuffix(" ms")
+        self.vad_pre_roll_input.setValue(SETTINGS.get("vad_pre_roll_ms"))
+        settings_layout.addRow("Hands-free pre-roll: ", self.vad_pre_roll_input)
+
+        self.vad_post_roll_input = QSpinBox()
+        self.vad_post_roll_input.setRange(0, 2000)
+        self.vad_post_roll_input.setSingleStep(50)
+        self.vad_post_roll_input.setSuffix(" ms")
+        self.vad_post_roll_input.setValue(SETTINGS.get("vad_post_roll_ms"))
+        settings_layout.addRow("Hands-free post-roll: ", self.vad_post_roll_input)
+
+        # Filled from the cached device list, opening the dialog never scans
+        devices = self.record_widget.devices
+        self.input_device_input = QComboBox()
+        self.output_device_input = QComboBox()
+
+        def fill_device_inputs():
+            for combo, device_list, key in ((self.input_device_input, devices.inputs(), "input_device"),
+                                            (self.output_device_input, devices.outputs(), "output_device")):
+                selected = combo.currentData() if combo.count() else SETTINGS.get(key)
+                combo.clear()
+                combo.addItem("System default", "")
+                for device in device_list:
+                    combo.addItem(device.key, device.key)
+                if selected and combo.findData(selected) < 0:
+                    combo.addItem(f"{selected} (not connected)", selected)
+                combo.setCurrentIndex(max(0, combo.findData(selected)))
+
+        fill_device_inputs()
+        devices.devices_changed.connect(fill_device_inputs)
+        dlg.finished.connect(lambda: devices.devices_changed.disconnect(fill_device_inputs))
+        self.armed_input_input = QCheckBox("Keep the input open between takes")
+        self.armed_input_input.setToolTip("Takes start instantly and include the audio from just before record was pressed")
+        self.armed_input_input.setChecked(SETTINGS.get("armed_input"))
+        settings_layout.addRow("Pre-roll: ", self.armed_input_input)
+
+        self.pre_roll_input = QSpinBox()
+        self.pre_roll_input.setRange(0, 2000)
+        self.pre_roll_input.setSingleStep(50)
+        self.pre_roll_input.setSuffix(" ms")
+        self.pre_roll_input.setValue(SETTINGS.get("pre_roll_ms"))
+        settings_layout.addRow("Pre-roll length: ", self.pre_roll_input)
+
+        refresh_devices_btn = QPushButton("Rescan devices")
+        refresh_devices_btn.clicked.connect(lambda: devices.rescan() or self.info_dialog("Devices can't be rescanned while recording or playing."))
+        settings_layout.addRow("Input device: ", self.input_device_input)
+        settings_layout.addRow("Output device: ", self.output_device_input)
+        settings_layout.addRow("", refresh_devices_btn)
+
         main_layout.addLayout(settings_layout)
         main_layout.addWidget(button_box)
         dlg.setLayout(main_layout)
@@ -853,29 +2676,37 @@ class MainWindow(QMainWindow):
             self.save_settings()
 
     def save_settings(self):
-        global default_vb_pitch
-        default_vb_pitch = self.default_vb_pitch_input.currentText()
-        settings = {
-            "default_reclist_path": default_reclist_path,
-            "default_guidebgm_path": default_guidebgm_path,
-            "default_vb_pitch": default_vb_pitch
-        }
-        with open(settings_path, "w") as f:
-            json.dump(settings, f, indent=4)
-        self.info_dialog("Settings saved. Please restart for full effect.")
+        # Subscribers update right away, the file is written once things settle
+        for key, value in self.pending_settings.items():
+            SETTINGS.set(key, value)
+        SETTINGS.set("default_vb_pitch", self.default_vb_pitch_input.currentText())
+        SETTINGS.set("vad_pre_roll_ms", self.vad_pre_roll_input.value())
+        SETTINGS.set("vad_post_roll_ms", self.vad_post_roll_input.value())
+        SETTINGS.set("pre_roll_ms", self.pre_roll_input.value())
+        SETTINGS.set("armed_input", self.armed_input_input.isChecked())
+        SETTINGS.set("input_device", self.input_device_input.currentData())
+        SETTINGS.set("output_device", self.output_device_input.currentData())
+        for key, is_input in ((SETTINGS.get("input_device"), True), (SETTINGS.get("output_device"), False)):
+            if key and ("input" if is_input else "output") not in SETTINGS.get("device_formats").get(key, {}):
+                self.record_widget.devices.probe(key, is_input, on_result=lambda rates, key=key, is_input=is_input: self.remember_device_formats(key, is_input, rates))
+
+    def remember_device_formats(self, key, is_input, rates):
+        formats = dict(SETTINGS.get("device_formats"))
+        formats[key] = {**formats.get(key, {}), ("input" if is_input else "output"): rates}
+        SETTINGS.set("device_formats", formats)
+        if self.record_widget.RATE not in rates:
+            self.info_dialog(f"{key} does not support {self.record_widget.RATE} Hz, the system default device will be used instead.")
 
     def reclist_select_dialog(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Reclist Path", os.path.expanduser("~"), "Text Files (*.txt)")
         if file_path:
-            global default_reclist_path
-            default_reclist_path = file_path
+            self.pending_settings["default_reclist_path"] = file_path
             self.default_reclist_path_label.setText(f"Path: {os.path.basename(file_path)}")
 
     def guidebgm_select_dialog(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Guide BGM", os.path.expanduser("~"), "Audio Files (*.wav)")
         if file_path:
-            global default_guidebgm_path
-            default_guidebgm_path = file_path
+            self.pending_settings["default_guidebgm_path"] = file_path
             self.default_guidebgm_path_label.setText(f"Path: {os.path.basename(file_path)}")
 
     def info_dialog(self, message):
@@ -925,5 +2756,7 @@ if __name__ == "__main__":
     app.setApplicationName("Silk Vocal Studio")
     load_stylesheet(app)
     window = MainWindow()
+    app.aboutToQuit.connect(window.record_widget.shutdown)
+    app.aboutToQuit.connect(SETTINGS.flush)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,111 @@
+import threading
+import tracemalloc
+import numpy as np
+
+# Byte accounting for the audio buffers and caches. Every buffer registers a
+# function that reports its current size and, if it can give memory back, an
+# evict function that shrinks it to a given number of bytes. enforce() is
+# called periodically and evicts whatever is over its budget.
+MB = 1024 * 1024
+SNAPSHOT_FRAMES = 10
+
+
+def nbytes(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(nbytes(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes(item) for item in obj)
+    return 0
+
+
+def trim_lru(cache, max_bytes):
+    # Drops the least recently used entries of an OrderedDict until it fits
+    size = nbytes(cache)
+    while cache and size > max_bytes:
+        _, value = cache.popitem(last=False)
+        size -= nbytes(value)
+    return size
+
+
+class MemorySource:
+    def __init__(self, name, size, budget=None, evict=None):
+        self.name = name
+        self.size = size
+        self.budget = budget
+        self.evict = evict
+
+
+class MemoryAccount:
+    def __init__(self):
+        self.sources = {}
+        self.snapshot = None
+        self._lock = threading.Lock()
+
+    def register(self, name, size, budget=None, evict=None):
+        with self._lock:
+            self.sources[name] = MemorySource(name, size, budget, evict)
+
+    def unregister(self, name):
+        with self._lock:
+            self.sources.pop(name, None)
+
+    def set_budget(self, name, budget):
+        self.sources[name].budget = budget
+
+    def report(self):
+        with self._lock:
+            sources = list(self.sources.values())
+        return [(source.name, source.size(), source.budget) for source in sources]
+
+    def total(self):
+        return sum(used for _, used, _ in self.report())
+
+    def enforce(self):
+        evicted = []
+        with self._lock:
+            sources = list(self.sources.values())
+        for source in sources:
+            if source.budget is None or source.evict is None:
+                continue
+            used = source.size()
+            if used > source.budget:
+                source.evict(source.budget)
+                evicted.append((source.name, used - source.size()))
+        return evicted
+
+    @staticmethod
+    def tracing():
+        return tracemalloc.is_tracing()
+
+    @staticmethod
+    def start_tracing():
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(SNAPSHOT_FRAMES)
+
+    def stop_tracing(self):
+        tracemalloc.stop()
+        self.snapshot = None
+
+    def take_snapshot(self, limit=20):
+        # Compared against the previous snapshot, so growth between two
+        # snapshots points at the allocation sites that keep memory alive
+        self.start_tracing()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self.snapshot is None:
+            stats = snapshot.statistics("lineno")[:limit]
+            lines = [f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {stat.traceback}" for stat in stats]
+        else:
+            stats = snapshot.compare_to(self.snapshot, "lineno")[:limit]
+            lines = [f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  {stat.traceback}" for stat in stats]
+        self.snapshot = snapshot
+        return snapshot, lines
+
+
+MEMORY = MemoryAccount()
@@ -0,0 +1,103 @@
+import os
+import csv
+import json
+import math
+import time
+import threading
+import functools
+
+# Timing probes for hot paths. Every probe feeds a fixed log-scale histogram
+# (8 buckets per octave from 1 us up), so memory stays constant however long
+# the session runs and percentiles are read straight off the buckets. While
+# disabled a probe costs one attribute check.
+BUCKETS_PER_OCTAVE = 8
+MIN_SECONDS = 1e-6
+N_BUCKETS = BUCKETS_PER_OCTAVE * 28
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        index = int(math.log2(max(seconds, MIN_SECONDS) / MIN_SECONDS) * BUCKETS_PER_OCTAVE)
+        self.counts[min(index, N_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                # Upper edge of the bucket, never more than the largest value seen
+                return min(MIN_SECONDS * 2 ** ((index + 1) / BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+            "total_ms": self.total * 1000,
+        }
+
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def timed(self, name):
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def export(self, path):
+        snapshot = self.snapshot()
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["probe", "count", "p50_ms", "p95_ms", "max_ms", "total_ms"])
+                for name, summary in snapshot.items():
+                    writer.writerow([name] + [round(summary[key], 3) for key in ("count", "p50_ms", "p95_ms", "max_ms", "total_ms")])
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=4)
+
+
+METRICS = Metrics(enabled=os.environ.get("SVS_METRICS") == "1")
+timed = METRICS.timed
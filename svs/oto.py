@@ -0,0 +1,217 @@
+import os
+from array import array
+from bisect import insort
+
+# oto.ini lines look like "file.wav=alias,offset,consonant,cutoff,preutter,overlap".
+# Entries are kept in column arrays with an alias and a file index. The
+# original text of every line is kept too, so saving only re-serializes
+# edited lines and everything else is written back untouched.
+OTO_FILENAME = "oto.ini"
+PARAM_NAMES = ("offset", "consonant", "cutoff", "preutter", "overlap")
+
+
+def detect_encoding(data):
+    if data.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if data.isascii():
+        # Plain ASCII files stay in UTAU's default encoding
+        return "cp932"
+    try:
+        data.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp932"
+
+
+def format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def parse_value(text):
+    text = text.strip()
+    return float(text) if text else 0.0
+
+
+class OtoIni:
+    def __init__(self, path="", encoding="cp932"):
+        self.path = path
+        self.encoding = encoding
+        self.files = []
+        self.aliases = []
+        self.columns = {name: array("d") for name in PARAM_NAMES}
+        self.alias_index = {}
+        # Every live row of an alias in file order, so the next definition is at hand
+        self.alias_rows = {}
+        self.file_index = {}
+        self._lines = []
+        self._raw = []
+        self._dirty = set()
+        self._deleted = set()
+        self._removed_since_save = False
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        encoding = detect_encoding(data)
+        oto = cls(path, encoding)
+
+        for line in data.decode(encoding).splitlines():
+            filename, sep, values = line.partition("=")
+            if not sep or not filename.strip():
+                oto._lines.append(line)
+                continue
+            fields = values.split(",")
+            fields += [""] * (6 - len(fields))
+            try:
+                params = [parse_value(field) for field in fields[1:6]]
+            except ValueError:
+                oto._lines.append(line)
+                continue
+            row = oto._append_row(filename.strip(), fields[0].strip(), params)
+            oto._raw[row] = line
+            oto._lines.append(row)
+        oto._dirty.clear()
+        return oto
+
+    @classmethod
+    def load_folder(cls, folder_path):
+        path = os.path.join(folder_path, OTO_FILENAME)
+        if os.path.isfile(path):
+            return cls.load(path)
+        return cls(path)
+
+    def __len__(self):
+        return len(self.files) - len(self._deleted)
+
+    def __contains__(self, alias):
+        return alias in self.alias_index
+
+    def is_modified(self):
+        return bool(self._dirty or self._removed_since_save)
+
+    def alias_key(self, row):
+        return self.aliases[row] or os.path.splitext(self.files[row])[0]
+
+    def find(self, alias):
+        return self.alias_index.get(alias, -1)
+
+    def rows_for_file(self, filename):
+        return [row for row in self.file_index.get(filename, []) if row not in self._deleted]
+
+    def rows(self):
+        return [row for row in range(len(self.files)) if row not in self._deleted]
+
+    def entry(self, row):
+        values = {name: self.columns[name][row] for name in PARAM_NAMES}
+        values["file"] = self.files[row]
+        values["alias"] = self.aliases[row]
+        return values
+
+    def add(self, filename, alias, offset=0.0, consonant=0.0, cutoff=0.0, preutter=0.0, overlap=0.0):
+        row = self._append_row(filename, alias, [offset, consonant, cutoff, preutter, overlap])
+        self._lines.append(row)
+        return row
+
+    def set(self, row, **params):
+        for name, value in params.items():
+            if name == "alias":
+                self._unindex_alias(row)
+                self.aliases[row] = value
+                self._index_alias(row)
+            elif name in self.columns:
+                self.columns[name][row] = float(value)
+            else:
+                raise KeyError(f"Unknown oto parameter: {name}")
+        self._dirty.add(row)
+
+    def remove(self, row):
+        if row in self._deleted:
+            return
+        self._unindex_alias(row)
+        self.file_index[self.files[row]].remove(row)
+        self._deleted.add(row)
+        self._dirty.discard(row)
+        self._removed_since_save = True
+
+    def remove_file(self, filename):
+        for row in self.rows_for_file(filename):
+            self.remove(row)
+
+    def format_row(self, row):
+        values = ",".join(format_value(self.columns[name][row]) for name in PARAM_NAMES)
+        return f"{self.files[row]}={self.aliases[row]},{values}"
+
+    def save(self, path=""):
+        path = path or self.path
+        if path == self.path and os.path.isfile(path) and not self.is_modified():
+            return False
+
+        out_lines = []
+        for line in self._lines:
+            if isinstance(line, str):
+                out_lines.append(line)
+            elif line in self._deleted:
+                continue
+            elif line in self._dirty or self._raw[line] is None:
+                out_lines.append(self.format_row(line))
+            else:
+                out_lines.append(self._raw[line])
+
+        # Checked before anything is written, a character the encoding can't
+        # hold would otherwise end up as "?" in the saved file
+        for line in out_lines:
+            try:
+                line.encode(self.encoding)
+            except UnicodeEncodeError as e:
+                raise ValueError(f"{line!r} can't be saved as {self.encoding}: {e.reason} {line[e.start:e.end]!r}") from e
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding=self.encoding, newline="\r\n") as f:
+            f.write("\n".join(out_lines) + "\n")
+        os.replace(tmp_path, path)
+
+        self.path = path
+        for row in self._dirty:
+            self._raw[row] = self.format_row(row)
+        self._dirty.clear()
+        if self._removed_since_save:
+            self._lines = [line for line in self._lines if isinstance(line, str) or line not in self._deleted]
+            self._removed_since_save = False
+        return True
+
+    def _append_row(self, filename, alias, params):
+        row = len(self.files)
+        self.files.append(filename)
+        self.aliases.append(alias)
+        for name, value in zip(PARAM_NAMES, params):
+            self.columns[name].append(float(value))
+        self._raw.append(None)
+        self.file_index.setdefault(filename, []).append(row)
+        self._index_alias(row)
+        self._dirty.add(row)
+        return row
+
+    def _index_alias(self, row):
+        # UTAU uses the first entry when an alias is defined twice
+        key = self.alias_key(row)
+        rows = self.alias_rows.setdefault(key, [])
+        if not rows or row > rows[-1]:
+            rows.append(row)
+        else:
+            insort(rows, row)
+        self.alias_index[key] = rows[0]
+
+    def _unindex_alias(self, row):
+        key = self.alias_key(row)
+        rows = self.alias_rows.get(key)
+        if not rows or row not in rows:
+            return
+        rows.remove(row)
+        if rows:
+            self.alias_index[key] = rows[0]
+        else:
+            del self.alias_rows[key]
+            del self.alias_index[key]
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import as_completed
+from take_store import TAKES_DIRNAME
+from session_journal import JOURNAL_FILENAME
+from fingerprint import FINGERPRINT_FILENAME
+from edl import EDITS_FILENAME, load_edits, render_edited_wav
+from bank_qa import QA_FILENAME
+from metrics import timed
+from process_pool import process_pool
+
+# Bank-internal files that are never packaged
+PACKAGE_EXCLUDES = {TAKES_DIRNAME, JOURNAL_FILENAME, FINGERPRINT_FILENAME, EDITS_FILENAME, QA_FILENAME}
+
+
+def package_files(folder_path, excludes=PACKAGE_EXCLUDES):
+    paths = []
+    for root, dirs, files in os.walk(folder_path):
+        dirs[:] = [d for d in dirs if d not in excludes]
+        paths += [os.path.join(root, name) for name in files if name not in excludes]
+    return paths
+
+
+def edited_files(file_paths):
+    # Files with a sample edit, mapped to the edit to bake in
+    edits = {}
+    for file_path in file_paths:
+        if file_path.lower().endswith(".wav"):
+            edit = load_edits(os.path.dirname(file_path)).get(os.path.basename(file_path))
+            if edit and not edit.is_identity():
+                edits[file_path] = edit.to_dict()
+    return edits
+
+
+@timed("package.zip_voicebank")
+def zip_voicebank(folder_path, output_path, progress=None, excludes=PACKAGE_EXCLUDES, workers=None):
+    # Written next to the destination and renamed at the end, so a cancelled
+    # or failed run never leaves a half written zip behind. Samples with
+    # edits are rendered to temporary files on a process pool while the rest
+    # is copied as is, and each render is added once it is done.
+    file_paths = package_files(folder_path, excludes)
+    edits = edited_files(file_paths)
+    tmp_path = output_path + ".tmp"
+    render_dir = tempfile.mkdtemp(prefix=".render-", dir=os.path.dirname(os.path.abspath(output_path))) if edits else None
+    done = 0
+    try:
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf, process_pool(workers) as executor:
+            futures = {executor.submit(render_edited_wav, path, edit, os.path.join(render_dir, f"{i}.wav")): path
+                       for i, (path, edit) in enumerate(edits.items())}
+            try:
+                for file_path in file_paths:
+                    if file_path in edits:
+                        continue
+                    zf.write(file_path, os.path.relpath(file_path, folder_path))
+                    done += 1
+                    if progress:
+                        progress(done, len(file_paths))
+                for future in as_completed(futures):
+                    rendered_path = future.result()
+                    zf.write(rendered_path, os.path.relpath(futures[future], folder_path))
+                    os.remove(rendered_path)
+                    done += 1
+                    if progress:
+                        progress(done, len(file_paths))
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if render_dir:
+            shutil.rmtree(render_dir, ignore_errors=True)
+    return output_path
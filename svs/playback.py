@@ -0,0 +1,98 @@
+import threading
+import numpy as np
+import pyaudio
+
+# Output stream that is opened once and kept running. While idle it feeds
+# silence, so starting playback is only a buffer swap, not a device open.
+
+
+class PlaybackEngine:
+    def __init__(self, pa, rate=44100, channels=1, chunk=512, device_index=None):
+        self.pa = pa
+        self.device_index = device_index
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.stream = None
+        self._lock = threading.Lock()
+        self._buffer = np.zeros(0, dtype=np.int16)
+        self._start = 0
+        self._position = 0
+        self._end = 0
+        self._playing = False
+        self._silence = bytes(chunk * channels * 2)
+
+    def open(self):
+        if self.stream is not None:
+            return
+        self.stream = self.pa.open(format=pyaudio.paInt16,
+                                   channels=self.channels,
+                                   rate=self.rate,
+                                   output=True,
+                                   output_device_index=self.device_index,
+                                   frames_per_buffer=self.chunk,
+                                   stream_callback=self._callback,
+                                   start=False)
+        self.stream.start_stream()
+
+    def close(self):
+        self.stop()
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+    def set_device(self, device_index, pa=None):
+        # The stream is reopened on the new device the next time it is needed
+        self.close()
+        self.device_index = device_index
+        if pa is not None:
+            self.pa = pa
+
+    def load(self, audio_array):
+        audio_array = np.ascontiguousarray(audio_array, dtype=np.int16)
+        with self._lock:
+            self._playing = False
+            self._buffer = audio_array
+            self._start = self._position = 0
+            self._end = len(audio_array)
+
+    def play(self, start=0, end=None):
+        self.open()
+        with self._lock:
+            end = len(self._buffer) if end is None else min(int(end), len(self._buffer))
+            start = max(0, min(int(start), end))
+            self._start = self._position = start
+            self._end = end
+            self._playing = start < end
+
+    def stop(self):
+        with self._lock:
+            self._playing = False
+
+    def is_playing(self):
+        return self._playing
+
+    def position(self):
+        return self._position
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        with self._lock:
+            if not self._playing:
+                chunk = None
+            else:
+                pos = self._position
+                chunk = self._buffer[pos:min(pos + frame_count * self.channels, self._end)]
+                self._position = pos + len(chunk)
+                if self._position >= self._end:
+                    self._playing = False
+
+        if chunk is None:
+            if frame_count == self.chunk:
+                return (self._silence, pyaudio.paContinue)
+            return (bytes(frame_count * self.channels * 2), pyaudio.paContinue)
+        if len(chunk) < frame_count * self.channels:
+            padded = np.zeros(frame_count * self.channels, dtype=np.int16)
+            padded[:len(chunk)] = chunk
+            chunk = padded
+        return (chunk.tobytes(), pyaudio.paContinue)
@@ -0,0 +1,50 @@
+import threading
+import numpy as np
+
+# Ring of the most recent input samples, written by the capture callback
+# while the input is armed but not recording. read() returns exactly the last
+# pre_roll_ms of audio, oldest first, so a take started from it begins at a
+# fixed, sample-accurate distance before the record click.
+
+
+class PreRollBuffer:
+    def __init__(self, rate, pre_roll_ms, channels=1, dtype=np.int16):
+        self.dtype = dtype
+        self.capacity = max(1, round(rate * pre_roll_ms / 1000)) * channels
+        self.buffer = np.zeros(self.capacity, dtype=dtype)
+        self.write_pos = 0
+        self.filled = 0
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        samples = np.frombuffer(data, dtype=self.dtype)
+        n = len(samples)
+        with self._lock:
+            if n >= self.capacity:
+                self.buffer[:] = samples[-self.capacity:]
+                self.write_pos = 0
+                self.filled = self.capacity
+                return
+            end = self.write_pos + n
+            if end <= self.capacity:
+                self.buffer[self.write_pos:end] = samples
+            else:
+                first = self.capacity - self.write_pos
+                self.buffer[self.write_pos:] = samples[:first]
+                self.buffer[:n - first] = samples[first:]
+            self.write_pos = end % self.capacity
+            self.filled = min(self.capacity, self.filled + n)
+
+    def read(self):
+        with self._lock:
+            if self.filled < self.capacity:
+                return self.buffer[:self.filled].tobytes()
+            return np.concatenate((self.buffer[self.write_pos:], self.buffer[:self.write_pos])).tobytes()
+
+    def clear(self):
+        with self._lock:
+            self.write_pos = 0
+            self.filled = 0
+
+    def nbytes(self):
+        return self.buffer.nbytes
@@ -0,0 +1,25 @@
+import sys
+import multiprocessing
+from importlib.machinery import ModuleSpec
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pools for the analysis modules. They are started from QThreadPool
+# workers while Qt and PortAudio threads are running, and forking such a
+# process can deadlock the child on a lock another thread held, so workers
+# are always spawned.
+_spawn = multiprocessing.get_context("spawn")
+
+
+def _skip_parent_main():
+    # A spawned child runs the parent's script again as __mp_main__ unless the
+    # main module's spec is named "__main__". For the GUI that would mean Qt,
+    # pyqtgraph, PortAudio and the settings in every child, while everything
+    # the pools run lives in importable modules.
+    main = sys.modules["__main__"]
+    if getattr(main, "__spec__", None) is None:
+        main.__spec__ = ModuleSpec("__main__", None)
+
+
+def process_pool(workers=None, **kwargs):
+    _skip_parent_main()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_spawn, **kwargs)
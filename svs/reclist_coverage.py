@@ -0,0 +1,127 @@
+from kana import tokenize, vowel_of, consonant_of, VOWELS
+
+# Coverage of a reclist in CV, VCV or CVVC terms. Every unit a style needs
+# gets one bit, so a line is a single int and coverage checks are bit ops.
+STYLES = ("CV", "VCV", "CVVC")
+ENDINGS = VOWELS + ("n",)
+
+
+def required_units(kana_map, style):
+    kana = list(kana_map)
+    if style == "CV":
+        return kana
+    if style == "VCV":
+        return [f"- {k}" for k in kana] + [f"{v} {k}" for v in ENDINGS for k in kana]
+    if style == "CVVC":
+        consonants = sorted({consonant_of(romaji) for romaji in kana_map.values() if consonant_of(romaji) and romaji != "n"})
+        return ([f"- {k}" for k in kana] + kana
+                + [f"{v} {c}" for v in ENDINGS for c in consonants]
+                + [f"{v} -" for v in ENDINGS])
+    raise ValueError(f"Unknown reclist style: {style}")
+
+
+def line_units(tokens, kana_map, style):
+    if not tokens:
+        return []
+    if style == "CV":
+        return list(tokens)
+
+    units = [f"- {tokens[0]}"]
+    if style == "VCV":
+        units += [f"{vowel_of(kana_map[a])} {b}" for a, b in zip(tokens, tokens[1:])]
+    else:
+        units += tokens
+        units += [f"{vowel_of(kana_map[a])} {consonant_of(kana_map[b])}" for a, b in zip(tokens, tokens[1:])]
+        units.append(f"{vowel_of(kana_map[tokens[-1]])} -")
+    return units
+
+
+def unit_bits(mask):
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low.bit_length() - 1)
+        mask ^= low
+    return bits
+
+
+class CoverageReport:
+    def __init__(self, style, units, lines, masks, unknown_lines, duplicate_lines):
+        self.style = style
+        self.units = units
+        self.lines = lines
+        self.masks = masks
+        self.unknown_lines = unknown_lines
+        self.duplicate_lines = duplicate_lines
+
+        # How many of the kept lines record each unit; duplicates are cut anyway
+        duplicates = set(duplicate_lines)
+        self.covered_mask = 0
+        counts = [0] * len(units)
+        for i, mask in enumerate(masks):
+            self.covered_mask |= mask
+            if i not in duplicates:
+                for bit in unit_bits(mask):
+                    counts[bit] += 1
+
+        # A line is redundant when every unit it records is still recorded by
+        # a line that stays. Lines are cut one at a time from the end, so the
+        # first recording of a unit is the one that is kept.
+        self.redundant_lines = []
+        kept_mask = 0
+        for i in reversed(range(len(masks))):
+            mask = masks[i]
+            if i in duplicates:
+                continue
+            bits = unit_bits(mask)
+            if mask and all(counts[bit] > 1 for bit in bits):
+                for bit in bits:
+                    counts[bit] -= 1
+                self.redundant_lines.append(i)
+            else:
+                kept_mask |= mask
+        self.redundant_lines.reverse()
+        # Cutting every listed line must never lose a unit
+        assert kept_mask == self.covered_mask
+
+    @property
+    def covered(self):
+        return self.covered_mask.bit_count()
+
+    @property
+    def missing(self):
+        return [unit for i, unit in enumerate(self.units) if not self.covered_mask >> i & 1]
+
+    def summary(self):
+        total = len(self.units)
+        return (f"{self.style}: {self.covered}/{total} units covered ({self.covered * 100 / max(total, 1):.1f}%), "
+                f"{len(self.missing)} missing, {len(self.redundant_lines)} redundant lines, "
+                f"{len(self.duplicate_lines)} duplicate lines")
+
+
+def analyze_reclist(lines, kana_map, style):
+    units = required_units(kana_map, style)
+    bit_of = {unit: i for i, unit in enumerate(units)}
+
+    masks = []
+    unknown_lines = []
+    duplicate_lines = []
+    seen = set()
+    for i, line in enumerate(lines):
+        if line in seen:
+            duplicate_lines.append(i)
+        seen.add(line)
+        tokens = tokenize(line, kana_map)
+        if not tokens:
+            unknown_lines.append(i)
+        mask = 0
+        for unit in line_units(tokens, kana_map, style):
+            if unit in bit_of:
+                mask |= 1 << bit_of[unit]
+        masks.append(mask)
+    return CoverageReport(style, units, list(lines), masks, unknown_lines, duplicate_lines)
+
+
+def read_reclist(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
@@ -0,0 +1,75 @@
+import heapq
+from kana import consonant_of
+from reclist_coverage import required_units, line_units
+
+# Near-minimal reclists by lazy greedy set cover. Candidate lines follow the
+# usual VCV pattern "_<start><pivot><r1><pivot><r2>..." for every consonant
+# row, plus two-mora lines to pick up whatever the long lines leave over.
+LINE_OVERHEAD = 4
+
+
+def consonant_rows(kana_map):
+    rows = {}
+    for kana, romaji in kana_map.items():
+        rows.setdefault(consonant_of(romaji), []).append(kana)
+    return list(rows.values())
+
+
+def candidate_lines(kana_map, style):
+    kana = list(kana_map)
+    if style == "CV":
+        return [[k] for k in kana]
+
+    candidates = [[s] for s in kana]
+    candidates += [[s, k] for s in kana for k in kana]
+    for row in consonant_rows(kana_map):
+        for pivot in row:
+            body = [token for member in row for token in (pivot, member)]
+            candidates += [[s] + body for s in kana]
+    return candidates
+
+
+def generate_reclist(kana_map, style):
+    units = required_units(kana_map, style)
+    bit_of = {unit: i for i, unit in enumerate(units)}
+    universe = (1 << len(units)) - 1
+
+    candidates = candidate_lines(kana_map, style)
+    masks = []
+    for tokens in candidates:
+        mask = 0
+        for unit in line_units(tokens, kana_map, style):
+            if unit in bit_of:
+                mask |= 1 << bit_of[unit]
+        masks.append(mask)
+
+    # Score is new units per unit of recording cost; scores only ever go
+    # down as coverage grows, so a popped entry whose score is still current
+    # is the best choice without rescoring everything else
+    costs = [LINE_OVERHEAD + len(tokens) for tokens in candidates]
+    heap = [(-mask.bit_count() / cost, i) for i, (mask, cost) in enumerate(zip(masks, costs)) if mask]
+    heapq.heapify(heap)
+
+    covered = 0
+    chosen = []
+    while heap and covered != universe:
+        score, i = heapq.heappop(heap)
+        gain = (masks[i] & ~covered).bit_count()
+        if gain == 0:
+            continue
+        current = -gain / costs[i]
+        if heap and current > heap[0][0]:
+            heapq.heappush(heap, (current, i))
+            continue
+        chosen.append(i)
+        covered |= masks[i]
+
+    prefix = "" if style == "CV" else "_"
+    lines = [prefix + "".join(candidates[i]) for i in chosen]
+    missing = [unit for i, unit in enumerate(units) if not covered >> i & 1]
+    return lines, missing
+
+
+def write_reclist(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
@@ -0,0 +1,105 @@
+import os
+import json
+
+# Append-only journal of a recording session, kept next to the samples.
+# Every event is one JSON line; the file is periodically compacted into a
+# single snapshot line so replaying it stays cheap.
+JOURNAL_FILENAME = ".svs_session.jsonl"
+COMPACT_EVERY = 200
+
+
+def empty_session_state():
+    return {
+        "reclist_path": "",
+        "samples_path": "",
+        "lines": [],
+        "current_row": -1,
+    }
+
+
+class SessionJournal:
+    def __init__(self, folder_path):
+        self.path = os.path.join(folder_path, JOURNAL_FILENAME)
+        self.state = empty_session_state()
+        self.event_count = 0
+        self._file = None
+
+    @staticmethod
+    def exists(folder_path):
+        return os.path.isfile(os.path.join(folder_path, JOURNAL_FILENAME))
+
+    def load(self):
+        self.state = empty_session_state()
+        self.event_count = 0
+        if not os.path.isfile(self.path):
+            return self.state
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves a truncated last line, skip it
+                    continue
+                self._apply(event)
+                self.event_count += 1
+        return self.state
+
+    def start(self, reclist_path, samples_path, lines, current_row=-1):
+        self.state = {
+            "reclist_path": reclist_path,
+            "samples_path": samples_path,
+            "lines": [[phoneme, recorded] for phoneme, recorded in lines],
+            "current_row": current_row,
+        }
+        self.compact()
+
+    def record_take(self, row, recorded="Yes"):
+        self._append({"e": "take", "row": row, "recorded": recorded})
+
+    def record_select(self, row):
+        if row == self.state["current_row"]:
+            return
+        self._append({"e": "select", "row": row})
+
+    def compact(self):
+        self.close()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(dict(self.state, e="snapshot"), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.event_count = 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _append(self, event):
+        if not self.state["lines"]:
+            return
+        self._apply(event)
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.event_count += 1
+        if self.event_count >= COMPACT_EVERY:
+            self.compact()
+
+    def _apply(self, event):
+        kind = event.get("e")
+        if kind == "snapshot":
+            self.state = {key: event.get(key, value) for key, value in empty_session_state().items()}
+        elif kind == "take":
+            row = event["row"]
+            if 0 <= row < len(self.state["lines"]):
+                self.state["lines"][row][1] = event["recorded"]
+        elif kind == "select":
+            self.state["current_row"] = event["row"]
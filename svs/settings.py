@@ -0,0 +1,92 @@
+import os
+import json
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Program settings. Values live in memory and are typed by SETTINGS_SCHEMA;
+# set() emits changed(key, value) so widgets pick a change up at once, and
+# the file is written once the changes settle, to a temp file that then
+# replaces settings.json. flush() writes anything still pending on exit.
+SAVE_DELAY_MS = 500
+
+SETTINGS_SCHEMA = {
+    "default_reclist_path": (str, ""),
+    "default_guidebgm_path": (str, ""),
+    "default_vb_pitch": (str, "A4"),
+    "last_session_path": (str, ""),
+    "workspace_path": (str, ""),
+    "vad_pre_roll_ms": (int, 300),
+    "vad_post_roll_ms": (int, 300),
+    "input_device": (str, ""),
+    "output_device": (str, ""),
+    "device_formats": (dict, {}),
+    "armed_input": (bool, False),
+    "pre_roll_ms": (int, 300),
+    "oto_reference_path": (str, ""),
+}
+
+
+class Settings(QObject):
+    changed = pyqtSignal(str, object)
+
+    def __init__(self, path, schema=SETTINGS_SCHEMA, delay_ms=SAVE_DELAY_MS):
+        super().__init__()
+        self.path = path
+        self.schema = schema
+        self.values = {key: default for key, (_, default) in schema.items()}
+        # Keys this version doesn't know are kept so they survive a save
+        self.extra = {}
+        self.dirty = False
+        self.save_timer = QTimer()
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(delay_ms)
+        self.save_timer.timeout.connect(self.flush)
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                d = json.load(f)
+        except FileNotFoundError:
+            self.dirty = True
+            self.flush()
+            return
+        except (OSError, ValueError):
+            return
+        for key, value in d.items():
+            if key not in self.schema:
+                self.extra[key] = value
+                continue
+            kind, _ = self.schema[key]
+            # A value of the wrong type keeps the default instead of breaking startup
+            if isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+                self.values[key] = value
+
+    def get(self, key):
+        return self.values[key]
+
+    def set(self, key, value):
+        kind, _ = self.schema[key]
+        if not isinstance(value, kind):
+            raise TypeError(f"Setting {key} expects {kind.__name__}, got {type(value).__name__}")
+        if self.values[key] == value:
+            return
+        self.values[key] = value
+        self.dirty = True
+        self.save_timer.start()
+        self.changed.emit(key, value)
+
+    def subscribe(self, key, slot):
+        self.changed.connect(lambda changed_key, value: changed_key == key and slot(value))
+
+    def flush(self):
+        self.save_timer.stop()
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({**self.extra, **self.values}, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return
+        self.dirty = False
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+import threading
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from memstats import nbytes, trim_lru
+
+N_FFT = 1024
+HOP = 512
+FLOOR_DB = -20.0
+CEIL_DB = 100.0
+
+
+def stft_db(samples, window, hop):
+    # One vectorized rfft over every complete frame in samples
+    frames = sliding_window_view(samples, len(window))[::hop]
+    spectrum = np.abs(np.fft.rfft(frames * window, axis=1))
+    return (20 * np.log10(spectrum + 1e-6)).astype(np.float32)
+
+
+class IncrementalSTFT:
+    def __init__(self, max_frames, n_fft=N_FFT, hop=HOP):
+        self.n_fft = n_fft
+        self.hop = hop
+        self.max_frames = max_frames
+        self.window = np.hanning(n_fft).astype(np.float32)
+        self.n_bins = n_fft // 2 + 1
+        self.reset()
+
+    def reset(self):
+        # Every frame is written twice, so the last max_frames frames are
+        # always one contiguous slice of the ring and never need a copy
+        self._ring = np.full((2 * self.max_frames, self.n_bins), FLOOR_DB, dtype=np.float32)
+        self._write = 0
+        self._tail = np.zeros(0, dtype=np.float32)
+        self.frames_total = 0
+
+    def nbytes(self):
+        return self._ring.nbytes + self._tail.nbytes
+
+    def feed(self, samples):
+        buffer = np.concatenate((self._tail, np.asarray(samples, dtype=np.float32)))
+        n_new = (len(buffer) - self.n_fft) // self.hop + 1 if len(buffer) >= self.n_fft else 0
+        if n_new <= 0:
+            self._tail = buffer
+            return 0
+
+        frames_db = stft_db(buffer[:(n_new - 1) * self.hop + self.n_fft], self.window, self.hop)
+        frames_db = frames_db[-self.max_frames:]
+        rows = (self._write + np.arange(len(frames_db))) % self.max_frames
+        self._ring[rows] = frames_db
+        self._ring[rows + self.max_frames] = frames_db
+        self._write = (self._write + len(frames_db)) % self.max_frames
+        self.frames_total += n_new
+        self._tail = buffer[n_new * self.hop:]
+        return n_new
+
+    def image(self):
+        count = min(self.frames_total, self.max_frames)
+        end = self._write + self.max_frames
+        return self._ring[end - count:end]
+
+    def first_frame(self):
+        return max(0, self.frames_total - self.max_frames)
+
+
+class SpectrogramTileCache:
+    def __init__(self, tile_frames=256, max_tiles=256, n_fft=N_FFT, hop=HOP):
+        self.tile_frames = tile_frames
+        self.max_tiles = max_tiles
+        self.n_fft = n_fft
+        self.hop = hop
+        self.window = np.hanning(n_fft).astype(np.float32)
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tile(self, key, audio_array, index):
+        # Tiles are only cached under a key naming the audio's content; a
+        # None key is computed every time
+        cache_key = (key, index)
+        with self._lock:
+            if key is not None and cache_key in self._tiles:
+                self._tiles.move_to_end(cache_key)
+                return self._tiles[cache_key]
+
+        start = index * self.tile_frames * self.hop
+        end = start + (self.tile_frames - 1) * self.hop + self.n_fft
+        segment = np.asarray(audio_array[start:end], dtype=np.float32)
+        if len(segment) < self.n_fft:
+            segment = np.pad(segment, (0, self.n_fft - len(segment)))
+        tile = stft_db(segment, self.window, self.hop)
+        if key is None:
+            return tile
+
+        with self._lock:
+            self._tiles[cache_key] = tile
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def spectrogram(self, key, audio_array):
+        n_frames = max(1, (len(audio_array) - self.n_fft) // self.hop + 1)
+        n_tiles = -(-n_frames // self.tile_frames)
+        return np.concatenate([self.tile(key, audio_array, i) for i in range(n_tiles)])[:n_frames]
+
+    def nbytes(self):
+        with self._lock:
+            return nbytes(self._tiles)
+
+    def trim(self, max_bytes):
+        with self._lock:
+            trim_lru(self._tiles, max_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
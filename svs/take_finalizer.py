@@ -0,0 +1,70 @@
+import numpy as np
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+from take_store import encode_wav
+from workers import run_task
+from metrics import timed
+
+# Write-behind queue for finished takes. Encoding, the atomic write into the
+# take store and any analysis happen on a single background thread, in the
+# order the takes were recorded, so the singer can start the next line
+# straight away. finalized fires on the GUI thread once a take is on disk.
+CLIP_LEVEL = 32767
+
+
+@timed("record.finalize_take")
+def finalize_take(store, phoneme, frames, channels, sample_width, rate, analyzers=()):
+    audio_array = np.frombuffer(frames, dtype=np.int16)
+    wav_bytes = encode_wav(frames, channels, sample_width, rate)
+    store.import_existing(phoneme)
+    digest = store.add_take(phoneme, wav_bytes)
+    store.cache_decoded(digest, audio_array)
+
+    peak = int(np.abs(audio_array.astype(np.int32)).max()) if len(audio_array) else 0
+    for analyze in analyzers:
+        analyze(digest, audio_array)
+    return {
+        "digest": digest,
+        "peak_db": 20 * np.log10(max(peak, 1) / 32768),
+        "clipped": int(np.count_nonzero(np.abs(audio_array.astype(np.int32)) >= CLIP_LEVEL)),
+    }
+
+
+class TakeFinalizer(QObject):
+    finalized = pyqtSignal(str, str, object)
+    failed = pyqtSignal(str, str, str)
+
+    def __init__(self, channels, sample_width, rate):
+        super().__init__()
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+        self.pending = {}
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+
+    def submit(self, store, phoneme, frames, analyzers=()):
+        key = (store.samples_path, phoneme)
+        self.pending[key] = self.pending.get(key, 0) + 1
+        run_task(finalize_take, store, phoneme, frames, self.channels, self.sample_width, self.rate, analyzers,
+                 on_result=lambda result: self.take_done(key, result),
+                 on_error=lambda message: self.take_failed(key, message),
+                 pool=self.pool)
+
+    def is_pending(self, samples_path, phoneme):
+        return self.pending.get((samples_path, phoneme), 0) > 0
+
+    def take_done(self, key, result):
+        self.release(key)
+        self.finalized.emit(key[0], key[1], result)
+
+    def take_failed(self, key, message):
+        self.release(key)
+        self.failed.emit(key[0], key[1], message)
+
+    def release(self, key):
+        self.pending[key] -= 1
+        if not self.pending[key]:
+            del self.pending[key]
+
+    def wait(self):
+        self.pool.waitForDone()
@@ -0,0 +1,167 @@
+import os
+import io
+import json
+import wave
+import shutil
+import threading
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from memstats import nbytes, trim_lru
+from edl import load_edits
+
+# Every take is kept under <samples>/.takes/objects, named by the sha256 of
+# its WAV bytes, so identical takes are only stored once. index.json holds
+# the list of takes per line and which one is active; the active take is
+# published to <samples>/<phoneme>.wav. Publishing another take drops a sample
+# edit made on the previous one.
+TAKES_DIRNAME = ".takes"
+INDEX_FILENAME = "index.json"
+FICLONE = 0x40049409
+
+
+def encode_wav(frames, channels, sample_width, rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        wf.writeframes(frames)
+    return buffer.getvalue()
+
+
+def decode_wav(path):
+    with wave.open(path, "rb") as wf:
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+def clone_file(src, dst):
+    # Prefer a copy-on-write clone where the filesystem supports it
+    try:
+        import fcntl
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(src, dst)
+
+
+class TakeStore:
+    def __init__(self, samples_path, cache_size=8):
+        self.samples_path = samples_path
+        self.root = os.path.join(samples_path, TAKES_DIRNAME)
+        self.index_path = os.path.join(self.root, INDEX_FILENAME)
+        self.cache_size = cache_size
+        self.index = {}
+        self._decoded = OrderedDict()
+        self._lock = threading.RLock()
+
+        if os.path.isfile(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+
+    def object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.wav")
+
+    def sample_path(self, phoneme):
+        return os.path.join(self.samples_path, f"{phoneme}.wav")
+
+    def takes(self, phoneme):
+        return list(self.index.get(phoneme, {}).get("takes", []))
+
+    def active_take(self, phoneme):
+        return self.index.get(phoneme, {}).get("active", "")
+
+    def add_take(self, phoneme, wav_bytes, activate=True):
+        digest = hashlib.sha256(wav_bytes).hexdigest()
+        obj_path = self.object_path(digest)
+        if not os.path.exists(obj_path):
+            os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+            tmp_path = obj_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(wav_bytes)
+            os.replace(tmp_path, obj_path)
+
+        # Takes are written from a background thread while the GUI may be switching takes
+        with self._lock:
+            entry = self.index.setdefault(phoneme, {"takes": [], "active": ""})
+            if digest not in entry["takes"]:
+                entry["takes"].append(digest)
+            if activate:
+                self.set_active(phoneme, digest)
+            else:
+                self.save_index()
+        return digest
+
+    def import_existing(self, phoneme):
+        # Keep a sample recorded before the store existed as its first take
+        if self.takes(phoneme):
+            return ""
+        path = self.sample_path(phoneme)
+        if not os.path.isfile(path):
+            return ""
+        with open(path, "rb") as f:
+            return self.add_take(phoneme, f.read(), activate=False)
+
+    def set_active(self, phoneme, digest):
+        with self._lock:
+            entry = self.index.get(phoneme)
+            if not entry or digest not in entry["takes"]:
+                raise KeyError(f"No take {digest[:8]} for {phoneme}")
+            entry["active"] = digest
+            self.publish(phoneme)
+            self.save_index()
+
+    def publish(self, phoneme):
+        digest = self.active_take(phoneme)
+        if not digest:
+            return
+        dest_path = self.sample_path(phoneme)
+        tmp_path = dest_path + ".tmp"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(self.object_path(digest), tmp_path)
+        except OSError:
+            clone_file(self.object_path(digest), tmp_path)
+        os.replace(tmp_path, dest_path)
+        # A hardlink keeps the object's old mtime, touch it so mtime based
+        # caches (.frq files and the like) see the switch
+        os.utime(dest_path)
+        load_edits(self.samples_path).drop_stale(os.path.basename(dest_path), digest)
+
+    def cache_decoded(self, digest, audio_array):
+        with self._lock:
+            self._decoded[digest] = audio_array
+            self._decoded.move_to_end(digest)
+            while len(self._decoded) > self.cache_size:
+                self._decoded.popitem(last=False)
+
+    def load_take(self, digest):
+        with self._lock:
+            if digest in self._decoded:
+                self._decoded.move_to_end(digest)
+                return self._decoded[digest]
+        audio_array = decode_wav(self.object_path(digest))
+        self.cache_decoded(digest, audio_array)
+        return audio_array
+
+    def nbytes(self):
+        with self._lock:
+            return nbytes(self._decoded)
+
+    def trim(self, max_bytes):
+        with self._lock:
+            trim_lru(self._decoded, max_bytes)
+
+    def save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.index_path)
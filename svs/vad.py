@@ -0,0 +1,91 @@
+import math
+from collections import deque
+import numpy as np
+
+# Streaming energy based voice activity detection for hands-free recording.
+# It runs on the audio callback thread, so each chunk costs one RMS value.
+# The noise floor follows the quiet chunks between takes; a take starts once
+# the level stays START_MARGIN_DB above it for MIN_SPEECH_MS and ends after
+# HANGOVER_MS below STOP_MARGIN_DB. Pre-roll comes from a ring of the chunks
+# seen before the start, post-roll is what is kept of the closing silence.
+START_MARGIN_DB = 15.0
+STOP_MARGIN_DB = 8.0
+MIN_SPEECH_MS = 80
+HANGOVER_MS = 700
+FLOOR_MIN_DB = -80.0
+FLOOR_RISE = 0.02
+
+VAD_START = "start"
+VAD_STOP = "stop"
+
+
+def level_db(chunk):
+    samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+    if not len(samples):
+        return FLOOR_MIN_DB
+    rms = math.sqrt(float(np.dot(samples, samples)) / len(samples))
+    return 20 * math.log10(max(rms, 1.0) / 32768)
+
+
+class VoiceActivityDetector:
+    def __init__(self, rate, chunk, pre_roll_ms=300, post_roll_ms=300, hangover_ms=HANGOVER_MS):
+        chunk_ms = chunk * 1000 / rate
+        self.min_speech_chunks = max(1, math.ceil(MIN_SPEECH_MS / chunk_ms))
+        self.post_roll_chunks = math.ceil(post_roll_ms / chunk_ms)
+        self.hangover_chunks = max(self.post_roll_chunks, math.ceil(hangover_ms / chunk_ms))
+        # The chunks that confirmed the start are part of the take, not the pre-roll
+        self.ring = deque(maxlen=math.ceil(pre_roll_ms / chunk_ms) + self.min_speech_chunks)
+        self.noise_floor = None
+        self.active = False
+        self.take = []
+        self.loud_run = 0
+        self.quiet_run = 0
+        self.finished_take = b""
+
+    def reset(self):
+        self.ring.clear()
+        self.active = False
+        self.take = []
+        self.loud_run = 0
+        self.quiet_run = 0
+
+    def update_floor(self, level):
+        if self.noise_floor is None or level < self.noise_floor:
+            self.noise_floor = max(level, FLOOR_MIN_DB)
+        else:
+            self.noise_floor += FLOOR_RISE * (level - self.noise_floor)
+
+    def feed(self, chunk):
+        level = level_db(chunk)
+        if not self.active:
+            self.ring.append(chunk)
+            if self.noise_floor is not None and level > self.noise_floor + START_MARGIN_DB:
+                self.loud_run += 1
+            else:
+                self.loud_run = 0
+                self.update_floor(level)
+            if self.loud_run >= self.min_speech_chunks:
+                self.active = True
+                self.take = list(self.ring)
+                self.ring.clear()
+                self.quiet_run = 0
+                return VAD_START
+            return None
+
+        self.take.append(chunk)
+        if level < self.noise_floor + STOP_MARGIN_DB:
+            self.quiet_run += 1
+        else:
+            self.quiet_run = 0
+        if self.quiet_run >= self.hangover_chunks:
+            keep = len(self.take) - self.quiet_run + self.post_roll_chunks
+            self.finished_take = b"".join(self.take[:keep])
+            self.active = False
+            self.take = []
+            self.loud_run = 0
+            return VAD_STOP
+        return None
+
+    def pop_take(self):
+        take, self.finished_take = self.finished_take, b""
+        return take
@@ -0,0 +1,159 @@
+import os
+from concurrent.futures import as_completed
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from edl import read_edited_mono
+from kana import tokenize, vowel_of
+from oto import OtoIni
+from process_pool import process_pool
+
+FRAME_MS = 25
+HOP_MS = 5
+SILENCE_DB = -35.0
+LEAD_IN_MS = 50
+
+
+def frame_features(audio, rate):
+    # Frame energy (dB) and half-wave rectified spectral flux, all frames at once
+    frame = int(rate * FRAME_MS / 1000)
+    hop = int(rate * HOP_MS / 1000)
+    if len(audio) < frame:
+        audio = np.pad(audio, (0, frame - len(audio)))
+    frames = sliding_window_view(audio, frame)[::hop] * np.hanning(frame).astype(np.float32)
+
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    log_spectrum = np.log1p(np.abs(np.fft.rfft(frames, axis=1)))
+    flux = np.zeros(len(frames), dtype=np.float32)
+    flux[1:] = np.maximum(np.diff(log_spectrum, axis=0), 0).sum(axis=1)
+    return energy_db, flux
+
+
+def novelty_curve(energy_db, flux):
+    rise = np.zeros_like(energy_db)
+    rise[1:] = np.maximum(np.diff(energy_db), 0)
+    novelty = flux / (flux.max() + 1e-10) + rise / (rise.max() + 1e-10)
+    return np.convolve(novelty, np.ones(5) / 5, mode="same")
+
+
+def pick_peaks(novelty, count, start, end, min_distance):
+    # Strongest local maxima first, suppressing anything too close to a kept peak
+    region = novelty[start:end]
+    if count <= 0 or len(region) < 3:
+        return []
+    is_peak = (region[1:-1] > region[:-2]) & (region[1:-1] >= region[2:])
+    candidates = np.flatnonzero(is_peak) + 1 + start
+    candidates = candidates[np.argsort(novelty[candidates])[::-1]]
+
+    peaks = []
+    for candidate in candidates:
+        if all(abs(candidate - peak) >= min_distance for peak in peaks):
+            peaks.append(candidate)
+            if len(peaks) == count:
+                break
+    return sorted(peaks)
+
+
+def find_mora_onsets(audio, rate, n_morae):
+    energy_db, flux = frame_features(audio, rate)
+    voiced = np.flatnonzero(energy_db > energy_db.max() + SILENCE_DB)
+    if len(voiced) == 0 or n_morae == 0:
+        return [], energy_db, len(energy_db)
+    voice_start, voice_end = voiced[0], voiced[-1] + 1
+
+    # Each mora after the first starts at one of the strongest novelty peaks;
+    # missing peaks are filled in by spacing the remaining morae evenly
+    expected = (voice_end - voice_start) / n_morae
+    peaks = pick_peaks(novelty_curve(energy_db, flux), n_morae - 1, int(voice_start + expected / 2), voice_end, max(1, int(expected * 0.5)))
+    onsets = [int(voice_start)] + peaks
+    while len(onsets) < n_morae:
+        gaps = np.diff(onsets + [voice_end])
+        widest = int(np.argmax(gaps))
+        onsets.insert(widest + 1, onsets[widest] + int(gaps[widest] // 2))
+    return onsets, energy_db, int(voice_end)
+
+
+def segment_file(path, kana_map):
+    filename = os.path.basename(path)
+    tokens = tokenize(os.path.splitext(filename)[0], kana_map)
+    if not tokens:
+        return filename, []
+    audio, rate = read_edited_mono(path)
+    return filename, segment_audio(filename, tokens, audio, rate, kana_map)
+
+
+def segment_audio(filename, tokens, audio, rate, kana_map):
+    onsets, energy_db, voice_end = find_mora_onsets(audio, rate, len(tokens))
+    if not onsets:
+        return []
+
+    # The consonant of a mora starts at the energy dip around its onset and
+    # its vowel starts where the energy gets close to the mora's peak
+    starts = [onsets[0]]
+    for i in range(1, len(onsets)):
+        lo = (onsets[i - 1] + onsets[i]) // 2
+        hi = min(onsets[i] + 4, voice_end)
+        starts.append(lo + int(np.argmin(energy_db[lo:hi])))
+    starts.append(voice_end)
+    vowels = []
+    for i in range(len(onsets)):
+        segment = energy_db[starts[i]:max(starts[i + 1], starts[i] + 1)]
+        vowels.append(starts[i] + int(np.argmax(segment >= segment.max() - 6)))
+
+    c_ms = [start * HOP_MS for start in starts]
+    v_ms = [vowel * HOP_MS for vowel in vowels]
+    entries = []
+    is_vcv = filename.startswith("_") or len(tokens) > 1
+    for i, kana in enumerate(tokens):
+        if i == 0:
+            alias = f"- {kana}" if is_vcv else kana
+            offset = max(0, c_ms[0] - LEAD_IN_MS)
+        else:
+            alias = f"{vowel_of(kana_map[tokens[i - 1]])} {kana}"
+            offset = c_ms[i] - min(100, (c_ms[i] - v_ms[i - 1]) / 2)
+        overlap = c_ms[i] - offset
+        preutter = v_ms[i] - offset
+        consonant = preutter + min(100, (c_ms[i + 1] - v_ms[i]) / 2)
+        cutoff = -(c_ms[i + 1] - offset)
+        entries.append((alias, offset, consonant, cutoff, preutter, overlap))
+    return entries
+
+
+def generate_oto(samples_path, kana_map, workers=None, progress=None):
+    wav_files = sorted(name for name in os.listdir(samples_path) if name.lower().endswith(".wav"))
+    oto = OtoIni.load_folder(samples_path)
+
+    results = {}
+    failed = []
+    with process_pool(workers) as executor:
+        futures = {executor.submit(segment_file, os.path.join(samples_path, name), kana_map): name for name in wav_files}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    filename, entries = future.result()
+                    results[filename] = entries
+                except Exception:
+                    failed.append(futures[future])
+                if progress:
+                    progress(done, len(wav_files))
+        except BaseException:
+            # Drop the queued files instead of finishing them when the caller gives up
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    n_aliases = write_entries(oto, wav_files, results)
+    return oto, len(wav_files), n_aliases, failed
+
+
+def write_entries(oto, wav_files, results):
+    # Apply in file order so the generated oto.ini is stable between runs
+    n_aliases = 0
+    for filename in results:
+        oto.remove_file(filename)
+    for filename in wav_files:
+        for alias, *params in results.get(filename, []):
+            if alias in oto:
+                continue
+            oto.add(filename, alias, *params)
+            n_aliases += 1
+    oto.save()
+    return n_aliases
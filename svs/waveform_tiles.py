@@ -0,0 +1,67 @@
+from collections import OrderedDict
+import numpy as np
+from memstats import nbytes, trim_lru
+
+# Min/max envelopes of a waveform, computed per tile and zoom level on first
+# use. A zoom level is a power of two samples per point, so panning and
+# zooming mostly hit tiles that were already computed.
+TILE_POINTS = 1024
+
+
+class WaveformTileCache:
+    def __init__(self, max_tiles=512):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+
+    def tile(self, key, audio, level, index):
+        cache_key = (key, level, index)
+        if cache_key in self._tiles:
+            self._tiles.move_to_end(cache_key)
+            return self._tiles[cache_key]
+
+        span = TILE_POINTS * level
+        segment = audio[index * span:(index + 1) * span]
+        usable = len(segment) - len(segment) % level
+        blocks = segment[:usable].reshape(-1, level)
+        tile = np.empty((len(blocks), 2), dtype=audio.dtype)
+        tile[:, 0] = blocks.min(axis=1)
+        tile[:, 1] = blocks.max(axis=1)
+
+        self._tiles[cache_key] = tile
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def envelope(self, key, audio, start, end, width):
+        # Returns x (sample positions) and y for the visible range, with at
+        # most about two points per pixel
+        start = max(0, int(start))
+        end = min(len(audio), int(end))
+        if end <= start or width <= 0:
+            return np.zeros(0), np.zeros(0)
+
+        samples_per_point = (end - start) / width
+        if samples_per_point <= 2:
+            x = np.arange(start, end)
+            return x, audio[start:end]
+
+        level = 1 << int(np.ceil(np.log2(samples_per_point)))
+        span = TILE_POINTS * level
+        first, last = start // span, (end - 1) // span
+        tiles = np.concatenate([self.tile(key, audio, level, i) for i in range(first, last + 1)])
+        offset = first * TILE_POINTS
+        lo = max(0, start // level - offset)
+        hi = min(len(tiles), -(-end // level) - offset)
+        tiles = tiles[lo:hi]
+
+        x = np.repeat((np.arange(lo, lo + len(tiles)) + offset) * level, 2)
+        return x, tiles.reshape(-1)
+
+    def nbytes(self):
+        return nbytes(self._tiles)
+
+    def trim(self, max_bytes):
+        trim_lru(self._tiles, max_bytes)
+
+    def clear(self):
+        self._tiles.clear()
@@ -0,0 +1,91 @@
+import inspect
+import threading
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Background tasks on a QThreadPool. A task is a plain function; if it takes
+# a "progress" or "token" argument the worker passes its own, so the
+# progress(done, total) callbacks used across svs report through Qt signals
+# and double as cancellation points. Signals are delivered on the GUI thread.
+
+# Workers are kept alive here until they finish so their signals are
+# always delivered
+_active = set()
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int, int)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = CancelToken()
+        self.signals = WorkerSignals()
+
+        params = inspect.signature(fn).parameters
+        if "progress" in params:
+            self.kwargs.setdefault("progress", self.report_progress)
+        if "token" in params:
+            self.kwargs.setdefault("token", self.token)
+
+    def report_progress(self, done, total):
+        self.token.check()
+        self.signals.progress.emit(done, total)
+
+    def cancel(self):
+        self.token.cancel()
+
+    def run(self):
+        try:
+            self.token.check()
+            result = self.fn(*self.args, **self.kwargs)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+def run_task(fn, *args, on_result=None, on_error=None, on_progress=None, on_cancelled=None, on_finished=None, pool=None, **kwargs):
+    worker = Worker(fn, *args, **kwargs)
+    for signal, slot in ((worker.signals.result, on_result), (worker.signals.error, on_error),
+                         (worker.signals.progress, on_progress), (worker.signals.cancelled, on_cancelled),
+                         (worker.signals.finished, on_finished)):
+        if slot:
+            signal.connect(slot)
+    _active.add(worker)
+    worker.signals.finished.connect(lambda: _active.discard(worker))
+    (pool or QThreadPool.globalInstance()).start(worker)
+    return worker
@@ -0,0 +1,231 @@
+import os
+import wave
+import sqlite3
+from oto import OTO_FILENAME, detect_encoding
+from session_journal import SessionJournal, JOURNAL_FILENAME
+
+# SQLite catalog of every voicebank below a workspace folder. A bank is any
+# folder with a character.txt; its pitch subfolders hold the samples. Rescans
+# only reopen folders whose mtime changed, and inside those only the WAVs
+# whose size or mtime changed, so a rescan of an unchanged workspace is just
+# a stat per folder.
+CATALOG_FILENAME = "catalog.sqlite3"
+CHARACTER_FILENAME = "character.txt"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS banks (
+    path TEXT PRIMARY KEY,
+    workspace TEXT NOT NULL,
+    name TEXT, author TEXT, voice TEXT, version TEXT, cover TEXT,
+    mtime REAL, char_mtime REAL
+);
+CREATE TABLE IF NOT EXISTS sample_dirs (
+    path TEXT PRIMARY KEY,
+    bank_path TEXT NOT NULL,
+    pitch TEXT,
+    mtime REAL, journal_mtime REAL,
+    sample_count INTEGER, duration REAL, has_oto INTEGER,
+    reclist_total INTEGER, reclist_recorded INTEGER
+);
+CREATE TABLE IF NOT EXISTS samples (
+    dir_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER, mtime REAL, duration REAL,
+    PRIMARY KEY (dir_path, name)
+);
+CREATE INDEX IF NOT EXISTS sample_dirs_bank ON sample_dirs (bank_path);
+CREATE INDEX IF NOT EXISTS samples_name ON samples (name);
+"""
+
+BANK_QUERY = """
+SELECT b.path, b.name, b.author, b.voice, b.version,
+       group_concat(nullif(d.pitch, ''), ', '), coalesce(sum(d.sample_count), 0), coalesce(sum(d.duration), 0),
+       coalesce(max(d.has_oto), 0), coalesce(sum(d.reclist_total), 0), coalesce(sum(d.reclist_recorded), 0), b.cover
+FROM banks b LEFT JOIN sample_dirs d ON d.bank_path = b.path
+WHERE b.workspace = ? AND (? = '' OR b.name LIKE ? OR b.author LIKE ? OR b.voice LIKE ?
+      OR EXISTS (SELECT 1 FROM samples s JOIN sample_dirs sd ON sd.path = s.dir_path
+                 WHERE sd.bank_path = b.path AND s.name LIKE ?))
+GROUP BY b.path
+ORDER BY b.name COLLATE NOCASE
+"""
+
+
+def read_character_txt(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    info = {}
+    for line in data.decode(detect_encoding(data), errors="replace").splitlines():
+        # UTAU writes "name=...", base folders created here use "name: ..."
+        for separator in ("=", ":"):
+            key, found, value = line.partition(separator)
+            if found:
+                info.setdefault(key.strip().lower(), value.strip())
+                break
+    return info
+
+
+def wav_duration(path):
+    try:
+        with wave.open(path, "rb") as wf:
+            return wf.getnframes() / wf.getframerate()
+    except (OSError, EOFError, wave.Error, ZeroDivisionError):
+        return 0.0
+
+
+def recording_status(sample_count, has_oto, reclist_total, reclist_recorded):
+    if reclist_total and reclist_recorded < reclist_total:
+        return f"Recording {reclist_recorded}/{reclist_total}"
+    if has_oto:
+        return "Configured"
+    if sample_count:
+        return "Recorded"
+    return "Empty"
+
+
+class BankSummary:
+    def __init__(self, row):
+        (self.path, self.name, self.author, self.voice, self.version, pitches,
+         self.sample_count, self.duration, has_oto, self.reclist_total, self.reclist_recorded, cover) = row
+        self.pitches = pitches or ""
+        self.has_oto = bool(has_oto)
+        self.cover_path = os.path.join(self.path, cover) if cover else ""
+
+    @property
+    def status(self):
+        return recording_status(self.sample_count, self.has_oto, self.reclist_total, self.reclist_recorded)
+
+
+class WorkspaceCatalog:
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        # Lets the dashboard read while a background scan writes
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def find_banks(self, workspace_path):
+        banks = []
+        if os.path.isfile(os.path.join(workspace_path, CHARACTER_FILENAME)):
+            banks.append(workspace_path)
+        for entry in os.scandir(workspace_path):
+            if entry.is_dir() and not entry.name.startswith(".") and os.path.isfile(os.path.join(entry.path, CHARACTER_FILENAME)):
+                banks.append(entry.path)
+        return sorted(banks)
+
+    def scan(self, workspace_path, progress=None, force=False):
+        workspace_path = os.path.abspath(workspace_path)
+        bank_paths = self.find_banks(workspace_path)
+        rescanned = 0
+        with self.db:
+            known = {row[0] for row in self.db.execute("SELECT path FROM banks WHERE workspace = ?", (workspace_path,))}
+            for gone in known - set(bank_paths):
+                self.remove_bank(gone)
+            for done, bank_path in enumerate(bank_paths, start=1):
+                rescanned += self.scan_bank(workspace_path, bank_path, force)
+                if progress:
+                    progress(done, len(bank_paths))
+        return len(bank_paths), rescanned
+
+    def scan_bank(self, workspace_path, bank_path, force=False):
+        bank_mtime = os.stat(bank_path).st_mtime
+        char_path = os.path.join(bank_path, CHARACTER_FILENAME)
+        char_mtime = os.stat(char_path).st_mtime
+        row = self.db.execute("SELECT mtime, char_mtime FROM banks WHERE path = ?", (bank_path,)).fetchone()
+
+        if force or row is None or row[1] != char_mtime:
+            info = read_character_txt(char_path)
+            self.db.execute(
+                "INSERT OR REPLACE INTO banks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (bank_path, workspace_path, info.get("name") or os.path.basename(bank_path), info.get("author", ""),
+                 info.get("voice", ""), info.get("version", ""), info.get("cover") or info.get("image", ""),
+                 bank_mtime, char_mtime))
+        elif row[0] != bank_mtime:
+            self.db.execute("UPDATE banks SET mtime = ? WHERE path = ?", (bank_mtime, bank_path))
+
+        dir_paths = [bank_path] + sorted(entry.path for entry in os.scandir(bank_path)
+                                         if entry.is_dir() and not entry.name.startswith("."))
+        known = {row[0] for row in self.db.execute("SELECT path FROM sample_dirs WHERE bank_path = ?", (bank_path,))}
+        for gone in known - set(dir_paths):
+            self.db.execute("DELETE FROM samples WHERE dir_path = ?", (gone,))
+            self.db.execute("DELETE FROM sample_dirs WHERE path = ?", (gone,))
+
+        rescanned = 0
+        for dir_path in dir_paths:
+            rescanned += self.scan_sample_dir(bank_path, dir_path, force)
+        return rescanned
+
+    def scan_sample_dir(self, bank_path, dir_path, force=False):
+        dir_mtime = os.stat(dir_path).st_mtime
+        journal_path = os.path.join(dir_path, JOURNAL_FILENAME)
+        # Journal appends don't touch the folder's mtime, so it is checked on its own
+        journal_mtime = os.stat(journal_path).st_mtime if os.path.isfile(journal_path) else 0.0
+        row = self.db.execute("SELECT mtime, journal_mtime FROM sample_dirs WHERE path = ?", (dir_path,)).fetchone()
+        if not force and row is not None and tuple(row) == (dir_mtime, journal_mtime):
+            return 0
+
+        old = {name: (size, mtime, duration) for name, size, mtime, duration
+               in self.db.execute("SELECT name, size, mtime, duration FROM samples WHERE dir_path = ?", (dir_path,))}
+        samples = []
+        has_oto = False
+        for entry in os.scandir(dir_path):
+            if not entry.is_file():
+                continue
+            if entry.name == OTO_FILENAME:
+                has_oto = True
+            if not entry.name.lower().endswith(".wav"):
+                continue
+            stat = entry.stat()
+            cached = old.get(entry.name)
+            if not force and cached and cached[:2] == (stat.st_size, stat.st_mtime):
+                duration = cached[2]
+            else:
+                duration = wav_duration(entry.path)
+            samples.append((dir_path, entry.name, stat.st_size, stat.st_mtime, duration))
+
+        reclist_total = reclist_recorded = 0
+        if journal_mtime:
+            lines = SessionJournal(dir_path).load()["lines"]
+            reclist_total = len(lines)
+            reclist_recorded = sum(1 for _, recorded in lines if recorded == "Yes")
+
+        self.db.execute("DELETE FROM samples WHERE dir_path = ?", (dir_path,))
+        self.db.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?)", samples)
+        self.db.execute(
+            "INSERT OR REPLACE INTO sample_dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (dir_path, bank_path, os.path.relpath(dir_path, bank_path) if dir_path != bank_path else "",
+             dir_mtime, journal_mtime, len(samples), sum(sample[4] for sample in samples), int(has_oto),
+             reclist_total, reclist_recorded))
+        return 1
+
+    def remove_bank(self, bank_path):
+        self.db.execute("DELETE FROM samples WHERE dir_path IN (SELECT path FROM sample_dirs WHERE bank_path = ?)", (bank_path,))
+        self.db.execute("DELETE FROM sample_dirs WHERE bank_path = ?", (bank_path,))
+        self.db.execute("DELETE FROM banks WHERE path = ?", (bank_path,))
+
+    def banks(self, workspace_path, query=""):
+        pattern = f"%{query}%"
+        rows = self.db.execute(BANK_QUERY, (os.path.abspath(workspace_path), query, pattern, pattern, pattern, pattern))
+        return [BankSummary(row) for row in rows]
+
+
+def scan_workspace(db_path, workspace_path, progress=None, force=False):
+    # Scans on its own connection, sqlite connections can't be shared between threads
+    catalog = WorkspaceCatalog(db_path)
+    try:
+        return catalog.scan(workspace_path, progress=progress, force=force)
+    finally:
+        catalog.close()
+
+
+def register_bank(db_path, workspace_path, bank_path):
+    # Adds a single bank, e.g. right after it was installed, without walking
+    # the rest of the workspace
+    catalog = WorkspaceCatalog(db_path)
+    try:
+        with catalog.db:
+            return catalog.scan_bank(os.path.abspath(workspace_path), os.path.abspath(bank_path))
+    finally:
+        catalog.close()